@@ -0,0 +1,63 @@
+"""
+Benchmark for expression evaluation backends.
+
+Evaluates every expression in the default events.yaml against a populated
+VariableStore with the AST-walking 'tree' backend and the 'closure'
+backend, and reports evaluations/sec for each.
+
+Run with: python benchmarks/bench_expressions.py
+"""
+
+from __future__ import annotations
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import yaml
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench_tokenizer import EVENTS_PATH, collect_expressions
+from gradquest.core.expression_parser import create_parser
+from gradquest.core.variable_store import VariableStore
+
+
+def make_store() -> VariableStore:
+    """Build a store resembling a mid-game state."""
+    vs = VariableStore()
+    for name, value in [('player.hope', 40), ('year', 2), ('month', 9),
+                        ('player.qualifyLevel', 2), ('equipment.brokenMonths', 1)]:
+        vs.set_var(name, value)
+    vs.add_item('paper', 1)
+    vs.add_status('exhaustion')
+    return vs
+
+
+def run(backend: str, corpus: List[str], rounds: int) -> float:
+    """Return evaluations/sec for a backend over the corpus."""
+    parser = create_parser(variable_store=make_store(), random_seed=0, backend=backend)
+    evaluate = parser.evaluate
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for expression in corpus:
+            evaluate(expression)
+    return rounds * len(corpus) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    with open(EVENTS_PATH, 'r', encoding='utf-8') as f:
+        corpus = collect_expressions(yaml.safe_load(f), [])
+    
+    rounds = 5000
+    tree = run('tree', corpus, rounds)
+    closure = run('closure', corpus, rounds)
+    
+    print(f"Corpus: {len(corpus)} expressions from {EVENTS_PATH.name}")
+    print(f"  tree backend:    {tree:>12,.0f} evals/sec")
+    print(f"  closure backend: {closure:>12,.0f} evals/sec ({closure / tree:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark for save formats.
+
+Plays a seeded game into its second year, then saves and restores the
+full game state 10,000 times with the JSON path (VariableStore.to_json plus
+the engine state as JSON) and with the binary save_format, with and
+without zlib, and reports size and saves/loads per second.
+
+Run with: python benchmarks/bench_save_formats.py
+"""
+
+from __future__ import annotations
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Tuple
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gradquest.core import save_format
+from gradquest.core.event_engine import TriggerEntry
+from gradquest.core.game_engine import GameEngine, EndGameState
+
+DATA_PATH = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+SAVES = 10_000
+
+
+def make_engine(months: int = 16) -> GameEngine:
+    """Load the default ruleset and play a seeded game for a while."""
+    engine = GameEngine(DATA_PATH)
+    engine.set_random_seed(42)
+    engine.load_game_data()
+    engine.start(new_seed=False)
+    for _ in range(months):
+        while engine.tick():
+            pass
+        engine.advance_month()
+    return engine
+
+
+def json_dumps(engine: GameEngine) -> bytes:
+    """Save the same state as save_format.dumps, using the JSON path."""
+    remaining, running, ended, end_state = engine._export_state()
+    occurred, disabled, queue, sequence = engine.event_engine._export_state()
+    data = {
+        'store': engine.variable_store.to_json(),
+        'active': remaining,
+        'occurred': sorted(occurred),
+        'disabled': sorted(disabled),
+        'triggers': [[entry.trigger_id, entry.probability, entry.priority, entry.sequence]
+                     for entry in queue],
+        'sequence': sequence,
+        'running': running,
+        'ended': ended,
+        'end': [end_state.won, end_state.reason, end_state.message] if end_state else None,
+        'rng': engine.rng.getstate(),
+    }
+    return json.dumps(data).encode('utf-8')
+
+
+def json_loads(engine: GameEngine, raw: bytes) -> None:
+    """Restore a save written by json_dumps."""
+    data = json.loads(raw)
+    engine.variable_store.from_json(data['store'])
+    end_state = EndGameState(*data['end']) if data['end'] else None
+    engine._import_state(data['active'], data['running'], data['ended'], end_state)
+    engine.event_engine._import_state(
+        data['occurred'], data['disabled'],
+        [TriggerEntry(*entry) for entry in data['triggers']], data['sequence'],
+    )
+    engine.rng.setstate(data['rng'])
+
+
+def run(engine: GameEngine, dumps: Callable[[GameEngine], bytes],
+        loads: Callable[[GameEngine, bytes], None]) -> Tuple[int, float, float]:
+    """Return (size in bytes, saves/sec, loads/sec)."""
+    start = time.perf_counter()
+    for _ in range(SAVES):
+        raw = dumps(engine)
+    save_rate = SAVES / (time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    for _ in range(SAVES):
+        loads(engine, raw)
+    load_rate = SAVES / (time.perf_counter() - start)
+    return len(raw), save_rate, load_rate
+
+
+def main() -> None:
+    engine = make_engine()
+    formats = [
+        ('json', json_dumps, json_loads),
+        ('binary', save_format.dumps, save_format.loads),
+        ('binary+zlib', lambda e: save_format.dumps(e, compress=True), save_format.loads),
+    ]
+    
+    print(f"{SAVES:,} saves and loads of a game in year {int(engine.variable_store.get_var('year'))}")
+    base = None
+    for name, dumps, loads in formats:
+        size, save_rate, load_rate = run(engine, dumps, loads)
+        base = base or (size, save_rate, load_rate)
+        print(f"  {name:<12} {size:>6,} bytes ({size / base[0]:.2f}x)  "
+              f"{save_rate:>9,.0f} saves/sec ({save_rate / base[1]:.1f}x)  "
+              f"{load_rate:>9,.0f} loads/sec ({load_rate / base[2]:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
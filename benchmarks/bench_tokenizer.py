@@ -0,0 +1,98 @@
+"""
+Micro-benchmark for the expression tokenizer.
+
+Tokenizes every expression in the default events.yaml and reports
+tokens/sec for the precompiled master scanner against the previous
+per-pattern loop.
+
+Run with: python benchmarks/bench_tokenizer.py
+"""
+
+from __future__ import annotations
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, List
+
+import yaml
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gradquest.core.expression_parser import ExpressionParser, Token, TokenType, tokenize
+
+EVENTS_PATH = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default' / 'events.yaml'
+
+
+def collect_expressions(data: Any, found: List[str]) -> List[str]:
+    """Recursively collect condition and value expressions from event data."""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key in ('expression', 'condition') or (key == 'value' and 'variable' in data):
+                found.append(str(value))
+            else:
+                collect_expressions(value, found)
+    elif isinstance(data, list):
+        for entry in data:
+            collect_expressions(entry, found)
+    return found
+
+
+def legacy_tokenize(expression: str) -> List[Token]:
+    """The original tokenizer: one re.compile per pattern per position."""
+    tokens = []
+    pos = 0
+    
+    while pos < len(expression):
+        match = None
+        for pattern, token_type in ExpressionParser.TOKEN_PATTERNS:
+            regex = re.compile(pattern)
+            match = regex.match(expression, pos)
+            if match:
+                if token_type is not None:
+                    value = match.group()
+                    if token_type == TokenType.NUMBER:
+                        value = float(value)
+                    elif token_type == TokenType.STRING:
+                        value = value[1:-1]
+                    tokens.append(Token(token_type, value, pos))
+                pos = match.end()
+                break
+        
+        if not match:
+            raise ValueError(f"Unexpected character at position {pos}: {expression[pos]}")
+    
+    tokens.append(Token(TokenType.EOF, None, pos))
+    return tokens
+
+
+def run(tokenizer, corpus: List[str], rounds: int) -> float:
+    """Return tokens/sec for a tokenizer over the corpus."""
+    count = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for expression in corpus:
+            count += len(tokenizer(expression))
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    with open(EVENTS_PATH, 'r', encoding='utf-8') as f:
+        corpus = collect_expressions(yaml.safe_load(f), [])
+    
+    # Both tokenizers must produce the same stream
+    for expression in corpus:
+        assert tokenize(expression) == legacy_tokenize(expression), expression
+    
+    rounds = 2000
+    legacy = run(legacy_tokenize, corpus, rounds)
+    scanner = run(tokenize, corpus, rounds)
+    
+    print(f"Corpus: {len(corpus)} expressions from {EVENTS_PATH.name}")
+    print(f"  legacy loop:    {legacy:>12,.0f} tokens/sec")
+    print(f"  master scanner: {scanner:>12,.0f} tokens/sec ({scanner / legacy:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,26 @@
 """Core engine components for GradQuest."""
 
 from gradquest.core.variable_store import VariableStore
+from gradquest.core.slot_store import SlotVariableStore
 from gradquest.core.expression_parser import ExpressionParser
 from gradquest.core.event_engine import EventEngine, GameEvent
 from gradquest.core.game_engine import GameEngine
+from gradquest.core.ruleset import Ruleset
+from gradquest.core.player_actions import PlayerActions
 from gradquest.core.registries import AttributeRegistry, ItemRegistry, StatusRegistry
+from gradquest.core.rng import RandomService
 
 __all__ = [
     "VariableStore",
+    "SlotVariableStore",
     "ExpressionParser", 
     "EventEngine",
     "GameEvent",
     "GameEngine",
+    "Ruleset",
+    "PlayerActions",
     "AttributeRegistry",
     "ItemRegistry",
     "StatusRegistry",
+    "RandomService",
 ]
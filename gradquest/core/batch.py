@@ -0,0 +1,515 @@
+"""
+Batch - Vectorized expression evaluation across many game states.
+
+Evaluates one compiled expression over a structure-of-arrays batch of
+game states (one NumPy column per variable, item, status and event) and
+returns one result per game. BatchVariableStore adds clamped, masked
+updates so a simulator can advance every game in the batch at once.
+Requires NumPy, which is an optional dependency of GradQuest.
+"""
+
+from __future__ import annotations
+from typing import Dict, Tuple, Any, Optional, Callable, Mapping, Sequence, TYPE_CHECKING
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without NumPy
+    np = None
+
+from gradquest.core.expression_parser import (
+    Node, Literal, Variable, UnaryOp, BinaryOp, FunctionCall, FunctionSpec, get_function,
+)
+from gradquest.core.rng import GOLDEN_GAMMA, MIX_1, MIX_2
+
+if TYPE_CHECKING:
+    from gradquest.core.variable_store import VariableStore
+
+
+def _require_numpy() -> None:
+    """Raise a helpful error if NumPy is not installed."""
+    if np is None:
+        raise ImportError("Batch evaluation requires NumPy: pip install numpy")
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    """Apply the SplitMix64 finalizer to an array of uint64 values."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(MIX_1)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(MIX_2)
+    return x ^ (x >> np.uint64(31))
+
+
+class BatchState:
+    """
+    A batch of independent game states stored as NumPy columns.
+    
+    Each lane (index along the columns) is one game. Missing variables
+    read as 0, missing items as 0 and missing statuses/events as False,
+    matching VariableStore. Every lane has its own counter-based random
+    stream, so a lane's draws do not depend on the other lanes.
+    """
+    
+    def __init__(self, size: int, seed: int = 0):
+        _require_numpy()
+        self.size = size
+        self.variables: Dict[str, np.ndarray] = {}
+        self.items: Dict[str, np.ndarray] = {}
+        self.statuses: Dict[str, np.ndarray] = {}
+        self.events: Dict[str, np.ndarray] = {}
+        
+        # Per-lane random streams: a key per lane and a draw counter
+        lanes = np.arange(size, dtype=np.uint64)
+        self._rng_keys = _splitmix64(np.uint64(seed & 0xFFFFFFFFFFFFFFFF) + lanes * np.uint64(GOLDEN_GAMMA))
+        self._rng_counters = np.zeros(size, dtype=np.uint64)
+    
+    @classmethod
+    def from_stores(cls, stores: Sequence[VariableStore], seed: int = 0) -> BatchState:
+        """Build a batch from the current state of several VariableStores."""
+        state = cls(len(stores), seed)
+        
+        var_names = set().union(*(vs.get_all_vars() for vs in stores))
+        item_names = set().union(*(vs.get_all_items() for vs in stores))
+        status_names = set().union(*(vs.get_all_status() for vs in stores))
+        
+        for name in var_names:
+            state.variables[name] = np.array([vs.get_var(name) for vs in stores], dtype=np.float64)
+        for name in item_names:
+            state.items[name] = np.array([vs.get_item_count(name) for vs in stores], dtype=np.int64)
+        state.statuses = {
+            name: np.array([vs.has_status(name) for vs in stores], dtype=bool) for name in status_names
+        }
+        return state
+    
+    # ==================== Column Access ====================
+    
+    def get_var_column(self, name: str) -> np.ndarray:
+        """Get a variable column (zeros if the variable is unset)."""
+        column = self.variables.get(name)
+        return column if column is not None else np.zeros(self.size)
+    
+    def get_item_column(self, name: str) -> np.ndarray:
+        """Get an item count column (zeros if no lane has the item)."""
+        column = self.items.get(name)
+        return column if column is not None else np.zeros(self.size, dtype=np.int64)
+    
+    def get_status_column(self, name: str) -> np.ndarray:
+        """Get a status column (False if no lane has the status)."""
+        column = self.statuses.get(name)
+        return column if column is not None else np.zeros(self.size, dtype=bool)
+    
+    def get_event_column(self, name: str) -> np.ndarray:
+        """Get an event-occurred column (False if the event never fired)."""
+        column = self.events.get(name)
+        return column if column is not None else np.zeros(self.size, dtype=bool)
+    
+    # ==================== Random ====================
+    
+    def random(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Draw one float in [0, 1) per lane.
+        
+        Only lanes selected by mask advance their stream; the values for
+        other lanes are drawn without being consumed.
+        """
+        bits = _splitmix64(self._rng_keys + self._rng_counters * np.uint64(GOLDEN_GAMMA))
+        if mask is None:
+            self._rng_counters += np.uint64(1)
+        else:
+            self._rng_counters += mask.astype(np.uint64)
+        return (bits >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+def _masked(mask: Optional[np.ndarray], new: np.ndarray, old: np.ndarray) -> np.ndarray:
+    """Take new values in the lanes selected by mask and old values elsewhere."""
+    if mask is None:
+        return new
+    return np.where(mask, new, old)
+
+
+class BatchVariableStore(BatchState):
+    """
+    Mutable batch of game states for vectorized simulation.
+    
+    Variables and items are one column each; statuses are rows of a
+    boolean matrix (status x lane). Limits apply to every lane and clamp
+    exactly as VariableStore.set_var does. Every update accepts a lane
+    mask: lanes outside it keep their values.
+    """
+    
+    def __init__(self, size: int, seed: int = 0):
+        # Statuses: name -> row of a (status x lane) matrix, set up by BatchState.__init__
+        self._status_index: Dict[str, int]
+        self._status_matrix: np.ndarray
+        super().__init__(size, seed)
+        self._limits: Dict[str, Tuple[float, float]] = {}
+    
+    @classmethod
+    def from_stores(cls, stores: Sequence[VariableStore], seed: int = 0) -> BatchVariableStore:
+        """Build a batch from several VariableStores, taking limits from the first."""
+        state = super().from_stores(stores, seed)
+        if stores:
+            for name, (low, high) in stores[0]._export_state()[3].items():
+                state.set_var_limits(name, low, high)
+        return state
+    
+    # ==================== Variables ====================
+    
+    def set_var_limits(self, name: str, min_val: float, max_val: float) -> None:
+        """Set min/max limits for a variable and clamp its existing values."""
+        self._limits[name] = (min_val, max_val)
+        if name in self.variables:
+            self.variables[name] = np.clip(self.variables[name], min_val, max_val)
+    
+    def set_var(self, name: str, values: Any, mask: Optional[np.ndarray] = None) -> None:
+        """
+        Set a variable in every lane (or the masked lanes), with clamping.
+        
+        Args:
+            name: Variable name
+            values: Scalar or one value per lane
+            mask: Lanes to update (all lanes if None)
+        """
+        new = np.broadcast_to(np.asarray(values, dtype=np.float64), (self.size,))
+        limits = self._limits.get(name)
+        if limits is not None:
+            new = np.clip(new, *limits)
+        self.variables[name] = _masked(mask, new, self.get_var_column(name)).copy()
+    
+    def add_var(self, name: str, deltas: Any, mask: Optional[np.ndarray] = None) -> None:
+        """Add a scalar or per-lane delta to a variable."""
+        self.set_var(name, self.get_var_column(name) + deltas, mask)
+    
+    def get_limits(self, name: str) -> Optional[Tuple[float, float]]:
+        """Get (min, max) for a variable, or None if unlimited."""
+        return self._limits.get(name)
+    
+    # ==================== Items ====================
+    
+    def add_item(self, name: str, counts: Any = 1, mask: Optional[np.ndarray] = None) -> None:
+        """Add a scalar or per-lane count of an item (counts never go below 0)."""
+        old = self.get_item_column(name)
+        new = np.maximum(0, old + np.asarray(counts, dtype=np.int64))
+        self.items[name] = _masked(mask, new, old)
+    
+    def remove_item(self, name: str, counts: Any = 1, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Remove items in every lane that has enough of them.
+        
+        Args:
+            name: Item name
+            counts: Scalar or per-lane count to remove
+            mask: Lanes to update (all lanes if None)
+        
+        Returns:
+            Boolean column of the lanes the items were removed from
+        """
+        old = self.get_item_column(name)
+        removed = old >= counts
+        if mask is not None:
+            removed &= mask
+        self.items[name] = np.where(removed, old - counts, old)
+        return removed
+    
+    def has_item(self, name: str, count: int = 1) -> np.ndarray:
+        """Check which lanes hold at least count of an item."""
+        return self.get_item_column(name) >= count
+    
+    def clear_items(self, name: str, mask: Optional[np.ndarray] = None) -> None:
+        """Remove all of an item in every lane (or the masked lanes)."""
+        self.items[name] = _masked(mask, np.zeros(self.size, dtype=np.int64), self.get_item_column(name))
+    
+    # ==================== Statuses ====================
+    
+    @property
+    def statuses(self) -> Dict[str, np.ndarray]:
+        """Status columns, as views of the rows of the status matrix."""
+        return {name: self._status_matrix[row] for name, row in self._status_index.items()}
+    
+    @statuses.setter
+    def statuses(self, columns: Dict[str, np.ndarray]) -> None:
+        self._status_index = {name: row for row, name in enumerate(columns)}
+        self._status_matrix = np.zeros((len(columns), self.size), dtype=bool)
+        for row, column in enumerate(columns.values()):
+            self._status_matrix[row] = column
+    
+    def _status_row(self, name: str) -> int:
+        """Get a status's matrix row, adding a row if the status is new."""
+        row = self._status_index.get(name)
+        if row is None:
+            row = len(self._status_index)
+            self._status_index[name] = row
+            self._status_matrix = np.vstack([self._status_matrix, np.zeros((1, self.size), dtype=bool)])
+        return row
+    
+    def get_status_column(self, name: str) -> np.ndarray:
+        """Get a status column (False if no lane has the status)."""
+        row = self._status_index.get(name)
+        return self._status_matrix[row] if row is not None else np.zeros(self.size, dtype=bool)
+    
+    def add_status(self, name: str, mask: Optional[np.ndarray] = None) -> None:
+        """Add a status in every lane (or the masked lanes)."""
+        row = self._status_row(name)
+        self._status_matrix[row] = True if mask is None else self._status_matrix[row] | mask
+    
+    def remove_status(self, name: str, mask: Optional[np.ndarray] = None) -> None:
+        """Remove a status in every lane (or the masked lanes)."""
+        row = self._status_index.get(name)
+        if row is not None:
+            self._status_matrix[row] = False if mask is None else self._status_matrix[row] & ~mask
+    
+    def has_status(self, name: str) -> np.ndarray:
+        """Check which lanes have a status."""
+        return self.get_status_column(name).copy()
+    
+    # ==================== Lanes ====================
+    
+    def to_store(self, lane: int) -> VariableStore:
+        """Copy one lane's state into a VariableStore."""
+        from gradquest.core.variable_store import VariableStore
+        
+        vs = VariableStore()
+        for name, (low, high) in self._limits.items():
+            vs.set_var_limits(name, low, high)
+        for name, column in self.variables.items():
+            vs.set_var(name, float(column[lane]))
+        for name, column in self.items.items():
+            if column[lane]:
+                vs.add_item(name, int(column[lane]))
+        for name, row in self._status_index.items():
+            if self._status_matrix[row, lane]:
+                vs.add_status(name)
+        return vs
+
+
+# A vectorized evaluator: (state, live lanes) -> scalar or column
+BatchEvaluator = Callable[[BatchState, 'np.ndarray'], Any]
+
+
+def _as_float(value: Any) -> Any:
+    """Convert a scalar or column to float, like float() in the scalar parser."""
+    if isinstance(value, np.ndarray):
+        return value.astype(np.float64, copy=False)
+    return float(value)
+
+
+def _as_bool(value: Any) -> Any:
+    """Convert a scalar or column to bool, like bool() in the scalar parser."""
+    if isinstance(value, np.ndarray):
+        return value.astype(bool, copy=False)
+    return bool(value)
+
+
+_ARITHMETIC = {
+    '+': lambda l, r: l + r,
+    '-': lambda l, r: l - r,
+    '*': lambda l, r: l * r,
+    '<': lambda l, r: l < r,
+    '>': lambda l, r: l > r,
+    '<=': lambda l, r: l <= r,
+    '>=': lambda l, r: l >= r,
+}
+
+
+def compile_batch(
+    node: Node,
+    short_circuit: bool = True,
+    functions: Optional[Mapping[str, FunctionSpec]] = None,
+) -> BatchEvaluator:
+    """
+    Compile an expression tree into a vectorized evaluator.
+    
+    Short-circuiting is applied per lane: the right operand of && / || is
+    evaluated only for lanes the left operand did not decide, so randi()
+    draws match scalar evaluation of each lane. Calls go to each
+    function's batch implementation.
+    
+    Args:
+        node: Root node of the (optimized) expression tree
+        short_circuit: Whether && / || skip their right operand
+        functions: Callable functions by name, e.g. a parser's (the
+            global registry if None)
+    
+    Returns:
+        Callable taking (state, live lane mask)
+    """
+    if isinstance(node, Literal):
+        value = node.value
+        return lambda state, mask: value
+    
+    if isinstance(node, Variable):
+        name = node.name
+        return lambda state, mask: state.get_var_column(name)
+    
+    if isinstance(node, UnaryOp):
+        operand = compile_batch(node.operand, short_circuit, functions)
+        if node.op == '!':
+            return lambda state, mask: np.logical_not(_as_bool(operand(state, mask)))
+        return lambda state, mask: -_as_float(operand(state, mask))
+    
+    if isinstance(node, BinaryOp):
+        return _compile_binary(node, short_circuit, functions)
+    
+    if isinstance(node, FunctionCall):
+        return _compile_call(node, short_circuit, functions)
+    
+    raise TypeError(f"Cannot compile node: {node!r}")
+
+
+def _compile_binary(
+    node: BinaryOp,
+    short_circuit: bool,
+    functions: Optional[Mapping[str, FunctionSpec]],
+) -> BatchEvaluator:
+    """Compile a binary operator over columns."""
+    op = node.op
+    left = compile_batch(node.left, short_circuit, functions)
+    right = compile_batch(node.right, short_circuit, functions)
+    
+    if op in ('&&', '||'):
+        decides = op == '||'
+        
+        def logical(state: BatchState, mask: np.ndarray) -> np.ndarray:
+            left_value = np.broadcast_to(_as_bool(left(state, mask)), (state.size,))
+            undecided = mask & (left_value != decides) if short_circuit else mask
+            right_value = _as_bool(right(state, undecided))
+            if decides:
+                return left_value | right_value
+            return left_value & right_value
+        return logical
+    
+    if op in _ARITHMETIC:
+        func = _ARITHMETIC[op]
+        return lambda state, mask: func(_as_float(left(state, mask)), _as_float(right(state, mask)))
+    
+    if op in ('/', '%'):
+        ufunc = np.divide if op == '/' else np.mod
+        
+        def divide(state: BatchState, mask: np.ndarray) -> np.ndarray:
+            numerator = np.broadcast_to(_as_float(left(state, mask)), (state.size,))
+            denominator = np.broadcast_to(_as_float(right(state, mask)), (state.size,))
+            # x / 0 and x % 0 evaluate to 0, as in the scalar parser
+            return ufunc(numerator, denominator, out=np.zeros(state.size), where=denominator != 0)
+        return divide
+    
+    if op == '===':
+        return lambda state, mask: left(state, mask) == right(state, mask)
+    if op == '!==':
+        return lambda state, mask: left(state, mask) != right(state, mask)
+    
+    raise ValueError(f"Unknown operator: {op}")
+
+
+def _compile_call(
+    node: FunctionCall,
+    short_circuit: bool,
+    functions: Optional[Mapping[str, FunctionSpec]],
+) -> BatchEvaluator:
+    """Compile a function call over columns through the function's batch implementation."""
+    name = node.name
+    spec = functions.get(name) if functions is not None else get_function(name)
+    if spec is None:
+        raise ValueError(f"Unknown function: {name}")
+    if spec.batch is None:
+        raise ValueError(f"{name}() has no batch implementation")
+    
+    batch_func = spec.batch
+    args = [compile_batch(arg, short_circuit, functions) for arg in node.args]
+    return lambda state, mask: batch_func(state, mask, *[arg(state, mask) for arg in args])
+
+
+# ==================== Built-in Functions ====================
+#
+# Vectorized counterparts of the built-in expression functions, called as
+# batch(state, mask, *arguments) where each argument is a scalar or column.
+
+
+def _state_query(name: str, column: str) -> Callable[..., Any]:
+    """Build a query of a state column named by a literal argument."""
+    def query(state: BatchState, mask: np.ndarray, *args: Any) -> np.ndarray:
+        if not args or isinstance(args[0], np.ndarray):
+            raise ValueError(f"{name}() needs a literal argument in batch mode")
+        return getattr(state, column)(str(args[0]))
+    return query
+
+
+def _batch_randi(state: BatchState, mask: np.ndarray, *args: Any) -> np.ndarray:
+    max_val = np.trunc(_as_float(args[0])) if args else 10
+    return np.trunc(state.random(mask) * max_val).astype(np.int64)
+
+
+def _extreme(ufunc: str) -> Callable[..., Any]:
+    """Build min() or max() from the name of a NumPy ufunc."""
+    def extreme(state: BatchState, mask: np.ndarray, *args: Any) -> Any:
+        if len(args) >= 2:
+            return getattr(np, ufunc)(_as_float(args[0]), _as_float(args[1]))
+        return _as_float(args[0]) if args else 0
+    return extreme
+
+
+def _batch_floor(state: BatchState, mask: np.ndarray, *args: Any) -> Any:
+    # The scalar parser truncates toward zero with int()
+    return np.trunc(_as_float(args[0])) if args else 0
+
+
+def _batch_clip(state: BatchState, mask: np.ndarray, *args: Any) -> Any:
+    if len(args) >= 3:
+        value, low, high = (_as_float(arg) for arg in args[:3])
+        return np.maximum(low, np.minimum(high, value))
+    return _as_float(args[0]) if args else 0
+
+
+# Batch implementations of the built-ins, by name (see FunctionSpec.batch)
+BUILTIN_BATCH_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    'itemCount': _state_query('itemCount', 'get_item_column'),
+    'hasStatus': _state_query('hasStatus', 'get_status_column'),
+    'eventOccurred': _state_query('eventOccurred', 'get_event_column'),
+    'getAttributeValue': _state_query('getAttributeValue', 'get_var_column'),
+    'randi': _batch_randi,
+    'min': _extreme('minimum'),
+    'max': _extreme('maximum'),
+    'floor': _batch_floor,
+    'clip': _batch_clip,
+}
+
+
+def evaluate_batch(
+    node: Node,
+    state: BatchState,
+    short_circuit: bool = True,
+    mask: Optional[np.ndarray] = None,
+    functions: Optional[Mapping[str, FunctionSpec]] = None,
+) -> np.ndarray:
+    """
+    Evaluate an expression tree for every lane of a batch.
+    
+    Args:
+        node: Root node of the expression tree
+        state: Batch of game states
+        short_circuit: Whether && / || skip their right operand
+        mask: Lanes that are actually evaluated; other lanes do not
+            consume random draws. Defaults to all lanes.
+        functions: Callable functions by name (the global registry if None)
+    
+    Returns:
+        Array with one result per lane
+    """
+    _require_numpy()
+    return run_batch(compile_batch(node, short_circuit, functions), state, mask)
+
+
+def run_batch(evaluator: BatchEvaluator, state: BatchState, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Run a compiled evaluator for every lane of a batch.
+    
+    Args:
+        evaluator: Evaluator from compile_batch()
+        state: Batch of game states
+        mask: Lanes that are actually evaluated (all lanes if None)
+    
+    Returns:
+        Array with one result per lane
+    """
+    _require_numpy()
+    if mask is None:
+        mask = np.ones(state.size, dtype=bool)
+    result = evaluator(state, mask)
+    return np.broadcast_to(np.asarray(result), (state.size,)).copy()
@@ -0,0 +1,203 @@
+"""
+ChangeBus - Publish/subscribe notifications for game state changes.
+
+Any number of subscribers can listen for variable, item and status
+changes, optionally filtered by key. Changes published inside a batch()
+block are coalesced into a single ChangeBatch of net deltas, delivered
+once when the outermost block ends to the subscribers registered when it
+began.
+"""
+
+from __future__ import annotations
+from typing import Dict, Tuple, List, Callable, Optional, Any, Iterable, FrozenSet
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ChangeBatch:
+    """
+    Net changes over a batch.
+    
+    Each entry maps a key to (value before the batch, value after it);
+    keys that ended where they started are left out. Statuses map to
+    (was active, is active).
+    """
+    variables: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    items: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    statuses: Dict[str, Tuple[bool, bool]] = field(default_factory=dict)
+    reset: bool = False  # The whole state was replaced; refresh everything
+    
+    def __bool__(self) -> bool:
+        return bool(self.variables or self.items or self.statuses or self.reset)
+
+
+# Receives the batched changes that match its filters
+ChangeCallback = Callable[[ChangeBatch], None]
+
+
+@dataclass
+class Subscription:
+    """A registered subscriber and its key filters (None means every key)."""
+    callback: ChangeCallback
+    variables: Optional[FrozenSet[str]] = None
+    items: Optional[FrozenSet[str]] = None
+    statuses: Optional[FrozenSet[str]] = None
+    
+    def select(self, batch: ChangeBatch) -> ChangeBatch:
+        """Return the part of a batch this subscriber is interested in."""
+        return ChangeBatch(
+            variables=_select(batch.variables, self.variables),
+            items=_select(batch.items, self.items),
+            statuses=_select(batch.statuses, self.statuses),
+            reset=batch.reset,
+        )
+
+
+def _select(changes: Dict[str, Any], keys: Optional[FrozenSet[str]]) -> Dict[str, Any]:
+    """Filter a change map by a key set."""
+    if keys is None:
+        return changes
+    return {key: change for key, change in changes.items() if key in keys}
+
+
+def _keys(names: Optional[Iterable[str]]) -> Optional[FrozenSet[str]]:
+    """Freeze a key filter, keeping None as 'every key'."""
+    return None if names is None else frozenset(names)
+
+
+class ChangeBus:
+    """
+    Change notifications with many subscribers and batched delivery.
+    
+    Outside a batch every change is delivered right away as a batch of
+    one. A batch goes to the subscribers registered when its outermost
+    block began, less any that unsubscribed since; one that subscribes
+    mid-batch starts with the next change after the batch. VariableStore
+    publishes to the bus assigned to its 'bus' attribute.
+    """
+    
+    def __init__(self):
+        self._subscriptions: List[Subscription] = []
+        self._depth = 0
+        
+        # Subscribers of the open batch; outside one, _subscriptions itself
+        self._receivers = self._subscriptions
+        
+        # Net changes of the open batch: key -> [old, new]
+        self._pending: Dict[str, Dict[str, List[Any]]] = {'var': {}, 'item': {}, 'status': {}}
+        self._pending_reset = False
+    
+    def subscribe(
+        self,
+        callback: ChangeCallback,
+        variables: Optional[Iterable[str]] = None,
+        items: Optional[Iterable[str]] = None,
+        statuses: Optional[Iterable[str]] = None,
+    ) -> Subscription:
+        """
+        Register a subscriber.
+        
+        Args:
+            callback: Called with a ChangeBatch of the matching changes
+            variables: Variable names to receive (None for all, () for none)
+            items: Item names to receive (None for all, () for none)
+            statuses: Status names to receive (None for all, () for none)
+        
+        Returns:
+            Handle for unsubscribe()
+        """
+        subscription = Subscription(callback, _keys(variables), _keys(items), _keys(statuses))
+        self._subscriptions.append(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber."""
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+        if subscription in self._receivers:
+            self._receivers.remove(subscription)
+    
+    def publish(self, kind: str, key: str, old: Any, new: Any) -> None:
+        """
+        Report one change.
+        
+        Args:
+            kind: 'var', 'item' or 'status'
+            key: Name of the changed variable, item or status
+            old: Previous value (for statuses, whether it was active)
+            new: New value
+        """
+        if not self._receivers:
+            return
+        pending = self._pending[kind]
+        entry = pending.get(key)
+        if entry is None:
+            pending[key] = [old, new]
+        else:
+            entry[1] = new
+        if not self._depth:
+            self.flush()
+    
+    def publish_reset(self) -> None:
+        """Report that the whole state was replaced."""
+        if not self._receivers:
+            return
+        self._pending_reset = True
+        if not self._depth:
+            self.flush()
+    
+    def batch(self) -> ChangeBus:
+        """
+        Coalesce changes until the outermost batch block ends.
+        
+        Use as 'with bus.batch():'. The bus is its own context manager,
+        which keeps entering a batch cheap on hot paths.
+        """
+        return self
+    
+    def __enter__(self) -> ChangeBus:
+        if not self._depth:
+            self._receivers = list(self._subscriptions)
+        self._depth += 1
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self._depth -= 1
+        if not self._depth:
+            receivers = self._receivers
+            self._receivers = self._subscriptions
+            self._deliver(receivers)
+    
+    def flush(self) -> None:
+        """Deliver the pending net changes to every interested subscriber."""
+        self._deliver(self._receivers)
+    
+    def _deliver(self, receivers: List[Subscription]) -> None:
+        """Send the pending net changes to the given subscribers."""
+        if not receivers:
+            # Drop what was published for subscribers that left mid-batch
+            if self._pending_reset or any(self._pending.values()):
+                self._pending = {'var': {}, 'item': {}, 'status': {}}
+                self._pending_reset = False
+            return
+        pending = self._pending
+        batch = ChangeBatch(
+            variables=_net(pending['var']),
+            items=_net(pending['item']),
+            statuses=_net(pending['status']),
+            reset=self._pending_reset,
+        )
+        self._pending = {'var': {}, 'item': {}, 'status': {}}
+        self._pending_reset = False
+        if not batch:
+            return
+        
+        for subscription in list(receivers):
+            selected = subscription.select(batch)
+            if selected:
+                subscription.callback(selected)
+
+
+def _net(changes: Dict[str, List[Any]]) -> Dict[str, Tuple[Any, Any]]:
+    """Drop keys whose value ended where it started."""
+    return {key: (old, new) for key, (old, new) in changes.items() if old != new}
@@ -0,0 +1,46 @@
+"""
+Copy-on-write support for forkable game state.
+
+A fork starts out sharing every mutable container with its parent. Each
+side copies a container the first time it writes to it, so forking is
+O(1) and a fork only pays for the structures it actually changes.
+"""
+
+from __future__ import annotations
+from typing import Any, FrozenSet, Tuple
+import copy
+
+
+class CopyOnWrite:
+    """
+    Mixin for objects whose containers can be shared between forks.
+    
+    Subclasses list their forkable containers in _COW_FIELDS and call
+    _own(name) (guarded by 'if self._shared:') before mutating one in
+    place. Containers that are replaced wholesale should be released
+    with _unshare(name) instead.
+    """
+    
+    # Attribute names of the containers shared with forks
+    _COW_FIELDS: Tuple[str, ...] = ()
+    
+    # Containers currently shared with a parent or fork
+    _shared: FrozenSet[str] = frozenset()
+    
+    def _share_with(self, clone: CopyOnWrite) -> None:
+        """Mark every forkable container as shared by self and clone."""
+        self._shared = clone._shared = frozenset(self._COW_FIELDS)
+    
+    def _own(self, name: str) -> None:
+        """Give this object a private copy of a container before writing to it."""
+        if name in self._shared:
+            setattr(self, name, self._copy_shared(name, getattr(self, name)))
+            self._shared = self._shared - {name}
+    
+    def _unshare(self, *names: str) -> None:
+        """Stop tracking containers that were replaced rather than mutated."""
+        self._shared = self._shared.difference(names)
+    
+    def _copy_shared(self, name: str, value: Any) -> Any:
+        """Copy a shared container (shallow by default)."""
+        return copy.copy(value)
@@ -6,13 +6,20 @@ probability-based execution, and action handling.
 """
 
 from __future__ import annotations
-from typing import Dict, List, Optional, Any, Set, Callable, TYPE_CHECKING
+from typing import Dict, List, Optional, Any, Set, Callable, Tuple, Iterator, TYPE_CHECKING
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import partial
+import copy
 import heapq
+import time
+
+from gradquest.core.cow import CopyOnWrite
+from gradquest.core.rng import RandomService, EVENT_STREAM
 
 if TYPE_CHECKING:
-    from gradquest.core.expression_parser import ExpressionParser
+    from gradquest.core.batch import BatchState
+    from gradquest.core.expression_parser import ExpressionParser, ReadSet
 
 
 class ActionResult(Enum):
@@ -27,6 +34,7 @@ class EventCondition:
     """A condition that must be met for an event to fire."""
     id: str
     expression: str
+    reads: Optional[ReadSet] = None  # State the expression depends on
     
     def evaluate(self, parser: ExpressionParser) -> bool:
         """Evaluate the condition using the expression parser."""
@@ -60,11 +68,76 @@ class GameEvent:
     once: bool = False  # Fire only once per game
     priority: int = 0  # Higher priority events execute first
     exclusions: List[str] = field(default_factory=list)  # Events to disable after firing
-    enabled: bool = True
+    enabled: bool = True  # Initial state; runtime state lives in the EventEngine
     
     def check_conditions(self, parser: ExpressionParser) -> bool:
         """Check if all conditions are met."""
         return all(cond.evaluate(parser) for cond in self.conditions)
+    
+    def check_conditions_batch(self, parser: ExpressionParser, state: BatchState) -> Any:
+        """
+        Check the conditions for every game in a batch (requires NumPy).
+        
+        Like check_conditions, later conditions are only evaluated for games
+        that passed the earlier ones, and a failing expression counts as
+        not met.
+        
+        Returns:
+            Boolean NumPy array with one entry per game
+        """
+        import numpy as np
+        
+        met = np.ones(state.size, dtype=bool)
+        for cond in self.conditions:
+            try:
+                met &= parser.evaluate_batch(cond.expression, state, mask=met).astype(bool)
+            except Exception:
+                met[:] = False
+        return met
+    
+    def condition_reads(self) -> Optional[ReadSet]:
+        """Get the combined reads of all conditions, or None if any is unknown."""
+        if not self.conditions:
+            return None
+        reads = self.conditions[0].reads
+        for cond in self.conditions[1:]:
+            if reads is None or cond.reads is None:
+                return None
+            reads = reads.union(cond.reads)
+        return reads
+
+
+# A compiled action: runs one action against an execution context. Steps
+# with nested actions return an iterator (see EventEngine.run_steps) that
+# runs them and yields the context whenever the player must respond.
+ActionStep = Callable[['EventActionContext'], Optional[Iterator['EventActionContext']]]
+
+# Builds an ActionStep from an action's params (everything but 'id')
+ActionCompiler = Callable[[Dict[str, Any]], ActionStep]
+
+
+class ActionCompileError(ValueError):
+    """An action that could not be compiled, with where it sits in its event."""
+    
+    def __init__(self, message: str, path: List[str], event_id: Optional[str] = None):
+        """
+        Args:
+            message: What went wrong
+            path: The action and the actions it is nested in, outermost first
+            event_id: The event the actions belong to, once known
+        """
+        self.message = message
+        self.path = path
+        self.event_id = event_id
+        where = ' > '.join(path)
+        if event_id is not None:
+            where = f"event '{event_id}', {where}"
+        super().__init__(f"Cannot compile {where}: {message}")
+
+
+def _never() -> bool:
+    """Evaluator of a condition that cannot be parsed: never met."""
+    return False
 
 
 @dataclass
@@ -82,6 +155,15 @@ class TriggerEntry:
         return self.sequence < other.sequence
 
 
+@dataclass
+class DrainResult:
+    """Outcome of EventEngine.drain()."""
+    messages: List[str] = field(default_factory=list)  # Messages shown along the way, in order
+    context: Optional[EventActionContext] = None  # Event waiting for the player, if draining stopped at one
+    triggers: int = 0  # Triggers processed (a trigger resumed after a wait counts again)
+    exhausted: bool = False  # The budget ran out with triggers still pending
+
+
 class EventActionContext:
     """Context passed to action handlers during execution."""
     
@@ -96,6 +178,10 @@ class EventActionContext:
         self.pending_message: Optional[str] = None
         self.pending_choices: List[Dict[str, Any]] = []
         self.user_choice: Optional[int] = None
+        
+        # Set while the event is paused because drain() ran out of time,
+        # not to wait for the player
+        self.preempted = False
     
     def display_message(self, message: str, confirm_key: str = "OK") -> None:
         """Queue a message to display to the user."""
@@ -112,14 +198,20 @@ class EventActionContext:
         self.result = ActionResult.STOP
 
 
-class EventEngine:
+class EventEngine(CopyOnWrite):
     """
     Event processing engine.
     
     Manages event registration, trigger queuing, condition evaluation,
-    and action execution.
+    and action execution. Runtime state (enabled/occurred events, queued
+    triggers) is kept here rather than on the shared GameEvent objects,
+    so engines can be forked cheaply.
     """
     
+    _COW_FIELDS = ('_events', '_trigger_index', '_disabled', '_occurred',
+                   '_condition_cache', '_condition_reads', '_trigger_queue',
+                   '_dispatch', '_dispatch_slots', '_live_bits')
+    
     def __init__(self, variable_store, parser: ExpressionParser):
         self.variable_store = variable_store
         self.parser = parser
@@ -130,34 +222,126 @@ class EventEngine:
         # Events indexed by trigger
         self._trigger_index: Dict[str, List[str]] = {}
         
+        # Dispatch tables: trigger -> its events, highest priority first,
+        # rebuilt when an event is registered. Each event owns one bit (its
+        # position in the table) and _live_bits holds, per trigger, the bits
+        # of events that are enabled and not spent 'once' events.
+        self._dispatch: Dict[str, Tuple[GameEvent, ...]] = {}
+        self._dispatch_slots: Dict[str, Tuple[str, int]] = {}  # event_id -> (trigger, bit)
+        self._live_bits: Dict[str, int] = {}
+        
         # Disabled events
         self._disabled: Set[str] = set()
         
         # Events that have fired (for 'once' events)
         self._occurred: Set[str] = set()
+        self._occurred_version = 0  # Bumped when _occurred gains an event
+        
+        # Incremental condition evaluation: event_id -> (store version,
+        # occurred version, result) of the last evaluation
+        self._incremental = False
+        self._condition_cache: Dict[str, Tuple[int, int, bool]] = {}
+        self._condition_reads: Dict[str, Optional[ReadSet]] = {}  # Combined reads per event
         
         # Trigger queue (priority queue)
         self._trigger_queue: List[TriggerEntry] = []
         self._sequence_counter = 0
         
-        # Action handlers
+        # The trigger being processed when an event waits for the player:
+        # a generator frame that resumes at the next action, and the
+        # context it is waiting on
+        self._suspended: Optional[Iterator[EventActionContext]] = None
+        self._suspended_context: Optional[EventActionContext] = None
+        
+        # perf_counter() deadline of the running drain(); running events
+        # pause between actions once it has passed
+        self._deadline: Optional[float] = None
+        
+        # Action handlers and compilers
         self._action_handlers: Dict[str, Callable[[EventAction, EventActionContext], None]] = {}
+        self._action_compilers: Dict[str, ActionCompiler] = {}
+        
+        # Compiled action steps and condition checks per event
+        self._compiled_actions: Dict[str, List[ActionStep]] = {}
+        self._compiled_conditions: Dict[str, Callable[[], bool]] = {}
         
         # Random function for probability checks
-        self._random_func: Callable[[], float] = lambda: __import__('random').random()
+        self._random_func: Callable[[], float] = RandomService().stream(EVENT_STREAM).random
     
     def set_random_func(self, func: Callable[[], float]) -> None:
         """Set the random function for probability checks."""
         self._random_func = func
     
+    def set_incremental(self, enabled: bool) -> None:
+        """
+        Enable or disable incremental condition evaluation.
+        
+        When enabled, an event's conditions are only re-evaluated if a
+        variable, item, status or event they read changed since the last
+        evaluation. Conditions that are impure or have no read set are
+        always evaluated.
+        """
+        self._incremental = enabled
+        self._condition_cache = {}
+        self._unshare('_condition_cache')
+    
     def register_event(self, event: GameEvent) -> None:
         """Register an event."""
+        if self._shared:
+            self._own('_events')
+            self._own('_trigger_index')
+            self._own('_condition_reads')
+        previous = self._events.get(event.id)
         self._events[event.id] = event
+        self._condition_reads[event.id] = event.condition_reads()
+        self._compiled_actions.pop(event.id, None)
+        self._compiled_conditions.pop(event.id, None)
+        
+        # Index by trigger (lists are replaced, not appended to, so forks
+        # can share the index)
+        self._trigger_index[event.trigger] = self._trigger_index.get(event.trigger, []) + [event.id]
         
-        # Index by trigger
-        if event.trigger not in self._trigger_index:
-            self._trigger_index[event.trigger] = []
-        self._trigger_index[event.trigger].append(event.id)
+        if not event.enabled:
+            self.disable_event(event.id)
+        
+        self._build_dispatch(event.trigger)
+        if previous is not None and previous.trigger != event.trigger:
+            self._build_dispatch(previous.trigger)
+    
+    def _build_dispatch(self, trigger_id: str) -> None:
+        """Rebuild a trigger's dispatch table, slots and live bits."""
+        if self._shared:
+            self._own('_dispatch')
+            self._own('_dispatch_slots')
+            self._own('_live_bits')
+        
+        # Skip ids re-registered under another trigger; sorting is stable,
+        # so equal priorities keep registration order
+        event_ids = dict.fromkeys(self._trigger_index.get(trigger_id, ()))
+        events = [self._events[event_id] for event_id in event_ids
+                  if self._events[event_id].trigger == trigger_id]
+        events.sort(key=lambda event: -event.priority)
+        
+        self._dispatch[trigger_id] = tuple(events)
+        self._live_bits[trigger_id] = 0
+        for position, event in enumerate(events):
+            self._dispatch_slots[event.id] = (trigger_id, 1 << position)
+            self._update_live(event.id)
+    
+    def _update_live(self, event_id: str) -> None:
+        """Recompute whether an event can fire in its trigger's live bits."""
+        slot = self._dispatch_slots.get(event_id)
+        if slot is None:
+            return
+        trigger_id, bit = slot
+        event = self._events[event_id]
+        live = event_id not in self._disabled and not (event.once and event_id in self._occurred)
+        bits = self._live_bits[trigger_id]
+        new_bits = bits | bit if live else bits & ~bit
+        if new_bits != bits:
+            if self._shared:
+                self._own('_live_bits')
+            self._live_bits[trigger_id] = new_bits
     
     def register_action_handler(
         self, 
@@ -166,18 +350,96 @@ class EventEngine:
     ) -> None:
         """Register a handler for an action type."""
         self._action_handlers[action_id] = handler
+        self._action_compilers.pop(action_id, None)
+        self._compiled_actions.clear()
+    
+    def register_action_compiler(self, action_id: str, compiler: ActionCompiler) -> None:
+        """
+        Register a compiler for an action type.
+        
+        The compiler is called once per action at compile time with the
+        action's params and returns a step that executes it, so per-run
+        work such as parsing expressions happens only once.
+        """
+        self._action_compilers[action_id] = compiler
+        self._action_handlers.pop(action_id, None)
+        self._compiled_actions.clear()
+    
+    def compile_actions(self, actions: List[Any]) -> List[ActionStep]:
+        """
+        Compile a list of actions into ready-to-run steps.
+        
+        Args:
+            actions: EventAction objects or raw action dicts (as nested
+                under CoinFlip, Random, Switch and choices)
+        
+        Returns:
+            Steps for every action with a registered compiler or handler
+        
+        Raises:
+            ActionCompileError: If a compiler fails (e.g. an expression
+                does not parse), naming the action and its nesting
+        """
+        steps = []
+        for index, action in enumerate(actions):
+            if not isinstance(action, EventAction):
+                action = EventAction(
+                    id=action.get('id', 'Unknown'),
+                    params={k: v for k, v in action.items() if k != 'id'}
+                )
+            
+            compiler = self._action_compilers.get(action.id)
+            if compiler:
+                try:
+                    steps.append(compiler(action.params))
+                except Exception as e:
+                    location = f"action {index + 1} ({action.id})"
+                    if isinstance(e, ActionCompileError):
+                        raise ActionCompileError(e.message, [location] + e.path) from e.__cause__
+                    raise ActionCompileError(str(e), [location]) from e
+                continue
+            
+            handler = self._action_handlers.get(action.id)
+            if handler:
+                steps.append(partial(handler, action))
+            # Unknown actions are skipped
+        return steps
+    
+    def compile_event(self, event: GameEvent) -> List[ActionStep]:
+        """
+        Compile and cache the action steps of an event.
+        
+        Raises:
+            ActionCompileError: If an action cannot be compiled; the
+                error names the event and the action
+        """
+        try:
+            steps = self.compile_actions(event.actions)
+        except ActionCompileError as e:
+            raise ActionCompileError(e.message, e.path, event.id) from e.__cause__
+        self._compiled_actions[event.id] = steps
+        return steps
+    
+    def clear_compiled(self) -> None:
+        """Drop compiled action steps and condition checks, so they are recompiled on next use."""
+        self._compiled_actions.clear()
+        self._compiled_conditions.clear()
     
     def enable_event(self, event_id: str) -> None:
         """Enable an event."""
-        self._disabled.discard(event_id)
-        if event_id in self._events:
-            self._events[event_id].enabled = True
+        if event_id in self._disabled:
+            if self._shared:
+                self._own('_disabled')
+            self._disabled.discard(event_id)
+            self._update_live(event_id)
     
     def disable_event(self, event_id: str) -> None:
         """Disable an event."""
-        self._disabled.add(event_id)
-        if event_id in self._events:
-            self._events[event_id].enabled = False
+        if event_id not in self._disabled:
+            if self._shared:
+                self._own('_disabled')
+            self._disabled.add(event_id)
+            self._update_live(event_id)
     
     def is_event_enabled(self, event_id: str) -> bool:
         """Check if an event is enabled."""
@@ -187,6 +449,25 @@ class EventEngine:
         """Check if an event has occurred (fired at least once)."""
         return event_id in self._occurred
     
+    @property
+    def occurred_version(self) -> int:
+        """Counter increased whenever an event first occurs or occurrences are reset."""
+        return self._occurred_version
+    
+    def mark_occurred(self, event_id: str) -> None:
+        """Record that an event has occurred (e.g. when restoring a save)."""
+        if event_id not in self._occurred:
+            if self._shared:
+                self._own('_occurred')
+            self._occurred.add(event_id)
+            self._occurred_version += 1
+            self._update_live(event_id)
+            self.parser.clear_memo()
+    
+    def get_occurred_events(self) -> Set[str]:
+        """Get a copy of the ids of all events that have occurred."""
+        return set(self._occurred)
+    
     def trigger(self, trigger_id: str, probability: float = 1.0, priority: int = 0) -> None:
         """Queue a trigger for processing."""
         entry = TriggerEntry(
@@ -196,58 +477,149 @@ class EventEngine:
             sequence=self._sequence_counter
         )
         self._sequence_counter += 1
+        if self._shared:
+            self._own('_trigger_queue')
         heapq.heappush(self._trigger_queue, entry)
     
     def has_pending_triggers(self) -> bool:
-        """Check if there are pending triggers to process."""
-        return len(self._trigger_queue) > 0
+        """Check if there are pending triggers to process (including a paused one)."""
+        return self._suspended is not None or len(self._trigger_queue) > 0
+    
+    @property
+    def suspended_context(self) -> Optional[EventActionContext]:
+        """The context of the event waiting for the player, if any."""
+        return self._suspended_context
     
     def process_next_trigger(self) -> Optional[EventActionContext]:
         """
-        Process the next trigger in the queue.
+        Process the next trigger in the queue, or resume a paused one.
+        
+        When an event waits for the player (a message or choices), its
+        context is returned and the trigger is suspended. The next call
+        resumes it at the action after the one that waited, using the
+        choice given to continue_event(); the trigger's remaining events
+        run afterwards.
         
         Returns:
             EventActionContext if an event was processed and needs user interaction,
             None if no events need interaction or queue is empty.
         """
-        if not self._trigger_queue:
+        frame = self._suspended
+        if frame is not None:
+            context = self._suspended_context
+            if context.result == ActionResult.WAIT:
+                # Acknowledged without continue_event(): no choice
+                self.continue_event(context)
+        elif self._trigger_queue:
+            if self._shared:
+                self._own('_trigger_queue')
+            frame = self._process_trigger(heapq.heappop(self._trigger_queue))
+        else:
             return None
         
-        entry = heapq.heappop(self._trigger_queue)
+        # Memoized function results only live for one trigger (or one
+        # resumption of it, since the player may have changed things)
+        self.parser.clear_memo()
         
+        # Deliver the changes up to the next wait to bus subscribers as one batch
+        bus = getattr(self.variable_store, 'bus', None)
+        if bus is not None:
+            with bus.batch():
+                context = next(frame, None)
+        else:
+            context = next(frame, None)
+        
+        self._suspended = frame if context is not None else None
+        self._suspended_context = context
+        return context
+    
+    def drain(
+        self,
+        max_triggers: Optional[int] = None,
+        max_time_ms: Optional[float] = None,
+        wait_on_messages: bool = False,
+        stop: Optional[Callable[[], bool]] = None,
+    ) -> DrainResult:
+        """
+        Process queued triggers in bulk.
+        
+        Runs until the queue is empty, an event waits for the player, the
+        budget is used up or stop() returns True. Events that only show
+        a message do not stop draining unless wait_on_messages is set:
+        the message is collected and the event continues. The time budget
+        is checked between triggers and between the actions of an event;
+        an event out of time is paused and resumes on the next call, so
+        only a single slow action can overrun the budget.
+        
+        Args:
+            max_triggers: Most triggers to process (None for no limit)
+            max_time_ms: Wall-clock budget in milliseconds (None for no limit)
+            wait_on_messages: Whether a plain message also stops draining
+            stop: Checked after each trigger; draining ends when it returns True
+        
+        Returns:
+            DrainResult with the collected messages and any waiting context
+        """
+        result = DrainResult()
+        deadline = None if max_time_ms is None else time.perf_counter() + max_time_ms / 1000.0
+        
+        self._deadline = deadline
+        try:
+            while self.has_pending_triggers():
+                if ((max_triggers is not None and result.triggers >= max_triggers)
+                        or (deadline is not None and time.perf_counter() >= deadline)):
+                    result.exhausted = True
+                    break
+                
+                context = self.process_next_trigger()
+                result.triggers += 1
+                if context is not None:
+                    if context.preempted:
+                        result.exhausted = True
+                        break
+                    if context.pending_message:
+                        result.messages.append(context.pending_message)
+                    if context.pending_choices or wait_on_messages:
+                        result.context = context
+                        break
+                    self.continue_event(context)
+                
+                if stop is not None and stop():
+                    break
+        finally:
+            self._deadline = None
+        
+        return result
+    
+    def _process_trigger(self, entry: TriggerEntry) -> Iterator[EventActionContext]:
+        """Run a trigger's events as a frame that yields whenever one waits."""
         # Apply trigger probability
         if entry.probability < 1.0 and self._random_func() > entry.probability:
-            return None
-        
-        # Get events for this trigger
-        event_ids = self._trigger_index.get(entry.trigger_id, [])
+            return
         
-        for event_id in event_ids:
-            event = self._events.get(event_id)
-            if not event:
-                continue
-            
-            # Skip disabled events
-            if not event.enabled or event_id in self._disabled:
-                continue
-            
-            # Skip already-fired 'once' events
-            if event.once and event_id in self._occurred:
-                continue
+        # Walk the live events of this trigger in priority order (disabled
+        # and already-fired 'once' events have no live bit)
+        trigger_id = entry.trigger_id
+        table = self._dispatch.get(trigger_id, ())
+        pending = self._live_bits.get(trigger_id, 0)
+        while pending:
+            bit = pending & -pending
+            event = table[bit.bit_length() - 1]
+            pending ^= bit
             
             # Check conditions
-            if not event.check_conditions(self.parser):
+            if not self._check_conditions(event):
                 continue
             
             # Apply event probability
             if event.probability < 1.0 and self._random_func() > event.probability:
                 continue
             
-            # Execute the event
-            context = self._execute_event(event)
+            # Execute the event, pausing whenever it waits for the player
+            yield from self.run_steps(self._event_steps(event), EventActionContext(self, event))
             
             # Mark as occurred
-            self._occurred.add(event_id)
+            self.mark_occurred(event.id)
             
             # Handle exclusions
             for excluded_id in event.exclusions:
@@ -255,35 +627,117 @@ class EventEngine:
             
             # Disable if 'once' event
             if event.once:
-                self.disable_event(event_id)
+                self.disable_event(event.id)
             
-            # Return context if user interaction needed
-            if context.result == ActionResult.WAIT:
-                return context
+            # Firing can enable or disable other events, so re-read the
+            # live bits that come after this one
+            pending = self._live_bits[trigger_id] & -(bit << 1)
+    
+    def _check_conditions(self, event: GameEvent) -> bool:
+        """Check an event's conditions, reusing the cached result if nothing it reads changed."""
+        check = self._compiled_conditions.get(event.id)
+        if check is None:
+            check = self._compile_conditions(event)
+        if not self._incremental or not event.conditions:
+            return check()
         
-        return None
+        reads = self._condition_reads.get(event.id)
+        if reads is None or reads.impure:
+            return check()
+        
+        cached = self._condition_cache.get(event.id)
+        if cached is not None:
+            store_version, occurred_version, result = cached
+            events_changed = bool(reads.events) and occurred_version != self._occurred_version
+            if not events_changed and not self.variable_store.reads_changed_since(store_version, reads):
+                return result
+        
+        result = check()
+        if self._shared:
+            self._own('_condition_cache')
+        self._condition_cache[event.id] = (self.variable_store.version, self._occurred_version, result)
+        return result
     
-    def _execute_event(self, event: GameEvent) -> EventActionContext:
-        """Execute all actions in an event."""
-        context = EventActionContext(self, event)
+    def _compile_conditions(self, event: GameEvent) -> Callable[[], bool]:
+        """
+        Compile and cache one check of all of an event's conditions.
         
-        for action in event.actions:
-            if context.result == ActionResult.STOP:
-                break
+        Behaves like GameEvent.check_conditions: conditions are checked in
+        order until one fails, and one that cannot be parsed or raises
+        counts as not met.
+        """
+        evaluators = []
+        for cond in event.conditions:
+            try:
+                evaluators.append(self.parser.compile(cond.expression))
+            except Exception:
+                evaluators.append(_never)
+        
+        if len(evaluators) == 1:
+            evaluator = evaluators[0]
             
-            handler = self._action_handlers.get(action.id)
-            if handler:
-                handler(action, context)
-            else:
-                # Unknown action, log warning
-                pass
+            def check() -> bool:
+                try:
+                    return bool(evaluator())
+                except Exception:
+                    return False
+        else:
+            def check() -> bool:
+                for evaluator in evaluators:
+                    try:
+                        if not evaluator():
+                            return False
+                    except Exception:
+                        return False
+                return True
         
-        return context
+        self._compiled_conditions[event.id] = check
+        return check
+    
+    def _event_steps(self, event: GameEvent) -> List[ActionStep]:
+        """Get an event's compiled steps, compiling them on first use."""
+        steps = self._compiled_actions.get(event.id)
+        if steps is None:
+            steps = self.compile_event(event)
+        return steps
+    
+    def run_steps(self, steps: List[ActionStep], context: EventActionContext) -> Iterator[EventActionContext]:
+        """
+        Run compiled steps as a resumable frame.
+        
+        Yields the context after each step that waits for the player; the
+        frame resumes at the next step once the caller has continued the
+        context. Iterators returned by steps (nested actions) are run in
+        place. Stops early when a step stops the event. During drain(), it
+        also yields a preempted context once the time budget has passed.
+        
+        Args:
+            steps: Compiled steps
+            context: The event's execution context
+        
+        Returns:
+            Generator yielding the context at each wait
+        """
+        for step in steps:
+            if context.result == ActionResult.STOP:
+                return
+            nested = step(context)
+            if nested is not None:
+                yield from nested
+            if context.result == ActionResult.WAIT:
+                yield context
+            elif self._deadline is not None and time.perf_counter() >= self._deadline:
+                context.preempted = True
+                yield context
+                context.preempted = False
     
     def continue_event(self, context: EventActionContext, choice: Optional[int] = None) -> EventActionContext:
         """
         Continue event execution after user interaction.
         
+        Records the player's response; the event resumes on the next
+        process_next_trigger() (GameEngine.tick()).
+        
         Args:
             context: The context from the paused event
             choice: The user's choice (if applicable)
@@ -296,21 +750,79 @@ class EventEngine:
         context.pending_message = None
         context.pending_choices = []
         
-        # Continue processing from where we left off
-        # (In a full implementation, we'd track the action index)
-        
+        # The paused frame resumes at the next action on the next
+        # process_next_trigger() call
         return context
     
     def reset(self) -> None:
         """Reset the event engine to initial state."""
-        self._disabled.clear()
-        self._occurred.clear()
-        self._trigger_queue.clear()
+        # Re-enable all events
+        self._disabled = set()
+        self._occurred = set()
+        self._occurred_version += 1
+        self._condition_cache = {}
+        self._trigger_queue = []
         self._sequence_counter = 0
+        self._suspended = None
+        self._suspended_context = None
+        self._live_bits = {trigger_id: (1 << len(table)) - 1 for trigger_id, table in self._dispatch.items()}
+        self._unshare('_disabled', '_occurred', '_condition_cache', '_trigger_queue', '_live_bits')
+    
+    def _export_state(self) -> Tuple[Set[str], Set[str], List[TriggerEntry], int]:
+        """Return (occurred events, disabled events, trigger queue in heap order, sequence counter) for saves."""
+        return self._occurred, self._disabled, self._trigger_queue, self._sequence_counter
+    
+    def _import_state(
+        self,
+        occurred: Set[str],
+        disabled: Set[str],
+        trigger_queue: List[TriggerEntry],
+        sequence_counter: int,
+    ) -> None:
+        """
+        Replace the runtime state with one from _export_state().
         
-        # Re-enable all events
-        for event in self._events.values():
-            event.enabled = True
+        The queue must be in heap order, as _export_state returns it. A
+        paused event is dropped.
+        """
+        self.reset()
+        self._occurred = set(occurred)
+        self._disabled = set(disabled)
+        for event_id in self._occurred | self._disabled:
+            self._update_live(event_id)
+        self._trigger_queue = list(trigger_queue)
+        self._sequence_counter = sequence_counter
+        self.parser.clear_memo()
+    
+    def fork(self, variable_store, parser: ExpressionParser) -> EventEngine:
+        """
+        Create an independent copy of this engine's state in O(1).
+        
+        Event definitions and runtime state are shared copy-on-write.
+        Action handlers and compilers are carried over, but compiled steps
+        are not, since they are bound to the original engine's state;
+        re-register compilers that close over other objects. A trigger
+        paused for the player is not carried over (generator frames
+        cannot be copied); the fork starts at the next queued trigger.
+        
+        Args:
+            variable_store: The fork's store (usually variable_store.fork())
+            parser: Parser bound to the fork's store and engine
+        
+        Returns:
+            The forked engine
+        """
+        clone = copy.copy(self)
+        clone.variable_store = variable_store
+        clone.parser = parser
+        clone._action_handlers = dict(self._action_handlers)
+        clone._action_compilers = dict(self._action_compilers)
+        clone._compiled_actions = {}
+        clone._compiled_conditions = {}
+        clone._suspended = None
+        clone._suspended_context = None
+        self._share_with(clone)
+        return clone
     
     def get_event(self, event_id: str) -> Optional[GameEvent]:
         """Get an event by ID."""
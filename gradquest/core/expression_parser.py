@@ -6,12 +6,26 @@ supporting arithmetic, logical operators, and game-specific functions.
 """
 
 from __future__ import annotations
-from typing import Dict, Any, List, Optional, Callable, Union
+from typing import Dict, Any, List, Optional, Callable, Union, Tuple, FrozenSet, TYPE_CHECKING
 from dataclasses import dataclass
 from enum import Enum, auto
+from functools import lru_cache, partial
 import re
 import random
 
+from gradquest.core.rng import RandomService, EXPRESSION_STREAM
+
+if TYPE_CHECKING:
+    from gradquest.core.batch import BatchState
+
+
+# Maximum number of distinct expression strings kept in the compile cache
+COMPILE_CACHE_SIZE = 1024
+
+# Evaluation backends: 'tree' walks the cached AST, 'closure' compiles it
+# into nested Python closures bound to the parser's context
+BACKENDS = ('tree', 'closure')
+
 
 class TokenType(Enum):
     """Token types for the expression lexer."""
@@ -33,6 +47,269 @@ class Token:
     position: int
 
 
+# Token definitions as (group name, pattern, token type), in match priority
+# order. A token type of None means the match is skipped.
+_TOKEN_SPEC = [
+    ('WHITESPACE', r'\s+', None),
+    ('NUMBER', r'\d+\.?\d*', TokenType.NUMBER),
+    ('SQ_STRING', r"'[^']*'", TokenType.STRING),
+    ('DQ_STRING', r'"[^"]*"', TokenType.STRING),
+    ('IDENTIFIER', r'[a-zA-Z_][a-zA-Z0-9_\.]*', TokenType.IDENTIFIER),
+    ('OPERATOR', r'===|!==|<=|>=|&&|\|\||[+\-*/%<>!]', TokenType.OPERATOR),
+    ('LPAREN', r'\(', TokenType.LPAREN),
+    ('RPAREN', r'\)', TokenType.RPAREN),
+    ('COMMA', r',', TokenType.COMMA),
+]
+
+# Single combined scanner: alternatives are tried in the order above, so
+# the first pattern that matches at a position wins, as with a pattern loop.
+_TOKEN_REGEX = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern, _ in _TOKEN_SPEC))
+_TOKEN_TYPES = {name: token_type for name, _, token_type in _TOKEN_SPEC}
+
+
+# ==================== Expression AST ====================
+
+@dataclass(frozen=True)
+class Node:
+    """Base class for compiled expression nodes."""
+    
+    def evaluate(self, parser: ExpressionParser) -> Any:
+        """Evaluate this node against the parser's context."""
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class Literal(Node):
+    """A number, string or boolean constant."""
+    value: Any
+    
+    def evaluate(self, parser: ExpressionParser) -> Any:
+        return self.value
+
+
+@dataclass(frozen=True)
+class Variable(Node):
+    """A reference to a VariableStore variable."""
+    name: str
+    
+    def evaluate(self, parser: ExpressionParser) -> Any:
+        return parser._resolve_variable(self.name)
+
+
+@dataclass(frozen=True)
+class UnaryOp(Node):
+    """A prefix operator (! or -)."""
+    op: str
+    operand: Node
+    
+    def evaluate(self, parser: ExpressionParser) -> Any:
+        value = self.operand.evaluate(parser)
+        if self.op == '!':
+            return not bool(value)
+        return -float(value)
+
+
+@dataclass(frozen=True)
+class BinaryOp(Node):
+    """An infix operator applied to two operands."""
+    op: str
+    left: Node
+    right: Node
+    
+    def evaluate(self, parser: ExpressionParser) -> Any:
+        left = self.left.evaluate(parser)
+        if parser.short_circuit and self.op in ('&&', '||'):
+            # Skip the right operand once the result is decided
+            if bool(left) == (self.op == '||'):
+                return bool(left)
+            return bool(self.right.evaluate(parser))
+        right = self.right.evaluate(parser)
+        return parser._apply_binary_op(self.op, left, right)
+
+
+@dataclass(frozen=True)
+class FunctionCall(Node):
+    """A call to one of the built-in game functions."""
+    name: str
+    args: Tuple[Node, ...]
+    
+    def evaluate(self, parser: ExpressionParser) -> Any:
+        args = [arg.evaluate(parser) for arg in self.args]
+        return parser._call_function(self.name, args)
+
+
+# ==================== Function Registry ====================
+
+# Calls to pure functions at least this costly are memoized per parser
+# until the variable store or the occurred events change (see
+# ExpressionParser.clear_memo)
+MEMO_COST = 10
+
+
+@dataclass(frozen=True)
+class FunctionSpec:
+    """
+    An expression function and the metadata the compiler relies on.
+    
+    The implementation is called as func(context, *args) with the parser's
+    context dictionary and the evaluated arguments.
+    """
+    name: str
+    func: Callable[..., Any]
+    min_args: int = 0
+    max_args: Optional[int] = None  # None means any number
+    pure: bool = True  # No side effects and no random draws
+    reads_state: bool = False  # Result depends on game state, not only arguments
+    reads: Optional[str] = None  # ReadSet field named by a literal first argument
+    returns_read: bool = False  # Returns the state it reads unchanged (so a constant variable folds)
+    returns_bool: bool = False
+    cost: int = 1  # Relative cost; pure calls costing MEMO_COST or more are memoized
+    bind: Optional[Callable[[Dict[str, Any], Any], Optional[Callable[[], Any]]]] = None
+    batch: Optional[Callable[..., Any]] = None  # batch(state, mask, *columns)
+    
+    @property
+    def foldable(self) -> bool:
+        """Whether calls with literal arguments can be evaluated at compile time."""
+        return self.pure and not self.reads_state and self.reads is None
+    
+    def accepts(self, count: int) -> bool:
+        """Check whether the function can take count arguments."""
+        return count >= self.min_args and (self.max_args is None or count <= self.max_args)
+    
+    def check_arity(self, count: int) -> None:
+        """Raise ValueError if the function cannot take count arguments."""
+        if not self.accepts(count):
+            if self.max_args is None:
+                expected = f"at least {self.min_args}"
+            elif self.min_args == self.max_args:
+                expected = str(self.min_args)
+            else:
+                expected = f"{self.min_args} to {self.max_args}"
+            raise ValueError(f"{self.name}() takes {expected} arguments ({count} given)")
+
+
+def _item_count(context: Dict[str, Any], *args: Any) -> float:
+    variable_store = context.get('variable_store')
+    if variable_store and len(args) >= 1:
+        return variable_store.get_item_count(str(args[0]))
+    return 0
+
+
+def _has_status(context: Dict[str, Any], *args: Any) -> bool:
+    variable_store = context.get('variable_store')
+    if variable_store and len(args) >= 1:
+        return variable_store.has_status(str(args[0]))
+    return False
+
+
+def _randi(context: Dict[str, Any], *args: Any) -> int:
+    random_func = context.get('random_func', random.random)
+    max_val = int(args[0]) if args else 10
+    return int(random_func() * max_val)
+
+
+def _min(context: Dict[str, Any], *args: Any) -> float:
+    if len(args) >= 2:
+        return min(float(args[0]), float(args[1]))
+    return float(args[0]) if args else 0
+
+
+def _max(context: Dict[str, Any], *args: Any) -> float:
+    if len(args) >= 2:
+        return max(float(args[0]), float(args[1]))
+    return float(args[0]) if args else 0
+
+
+def _floor(context: Dict[str, Any], *args: Any) -> float:
+    return float(int(args[0])) if args else 0
+
+
+def _clip(context: Dict[str, Any], *args: Any) -> float:
+    if len(args) >= 3:
+        value, low, high = float(args[0]), float(args[1]), float(args[2])
+        return max(low, min(high, value))
+    return float(args[0]) if args else 0
+
+
+def _event_occurred(context: Dict[str, Any], *args: Any) -> bool:
+    event_engine = context.get('event_engine')
+    if event_engine and len(args) >= 1:
+        return event_engine.has_event_occurred(str(args[0]))
+    return False
+
+
+def _get_attribute_value(context: Dict[str, Any], *args: Any) -> float:
+    # For now, attributes are stored as variables
+    variable_store = context.get('variable_store')
+    if variable_store and len(args) >= 1:
+        return variable_store.get_var(str(args[0]), 0.0)
+    return 0.0
+
+
+def _bind_query(source: str, method: str, *extra: Any) -> Callable[[Dict[str, Any], Any], Optional[Callable[[], Any]]]:
+    """Build a binder that pre-resolves context[source].method(arg, *extra)."""
+    def bind(context: Dict[str, Any], arg: Any) -> Optional[Callable[[], Any]]:
+        target = context.get(source)
+        if not target:
+            return None
+        func = getattr(target, method)
+        return lambda: func(arg, *extra)
+    return bind
+
+
+def _batch_builtin(name: str) -> Callable[..., Any]:
+    """Get a built-in's vectorized implementation, importing batch (and NumPy) on first use."""
+    def batch(state: Any, mask: Any, *columns: Any) -> Any:
+        from gradquest.core.batch import BUILTIN_BATCH_FUNCTIONS
+        return BUILTIN_BATCH_FUNCTIONS[name](state, mask, *columns)
+    return batch
+
+
+# Functions available to every parser, keyed by name
+_FUNCTIONS: Dict[str, FunctionSpec] = {}
+
+
+def register_function(spec: FunctionSpec) -> None:
+    """
+    Register a function for parsers created from now on.
+    
+    Use ExpressionParser.register_function to add a function to a single
+    parser, e.g. one defined by a ruleset.
+    
+    Args:
+        spec: The function and its metadata
+    """
+    _FUNCTIONS[spec.name] = spec
+
+
+def get_function(name: str) -> Optional[FunctionSpec]:
+    """Look up a globally registered function by name."""
+    return _FUNCTIONS.get(name)
+
+
+for _spec in (
+    FunctionSpec('itemCount', _item_count, reads='items',
+                 bind=_bind_query('variable_store', 'get_item_count'),
+                 batch=_batch_builtin('itemCount')),
+    FunctionSpec('hasStatus', _has_status, reads='statuses', returns_bool=True,
+                 bind=_bind_query('variable_store', 'has_status'),
+                 batch=_batch_builtin('hasStatus')),
+    FunctionSpec('randi', _randi, pure=False, batch=_batch_builtin('randi')),
+    FunctionSpec('min', _min, batch=_batch_builtin('min')),
+    FunctionSpec('max', _max, batch=_batch_builtin('max')),
+    FunctionSpec('floor', _floor, batch=_batch_builtin('floor')),
+    FunctionSpec('clip', _clip, batch=_batch_builtin('clip')),
+    FunctionSpec('eventOccurred', _event_occurred, reads='events', returns_bool=True,
+                 bind=_bind_query('event_engine', 'has_event_occurred'),
+                 batch=_batch_builtin('eventOccurred')),
+    FunctionSpec('getAttributeValue', _get_attribute_value, reads='variables', returns_read=True,
+                 bind=_bind_query('variable_store', 'get_var', 0.0),
+                 batch=_batch_builtin('getAttributeValue')),
+):
+    register_function(_spec)
+del _spec
+
+
 class ExpressionParser:
     """
     Safe expression evaluator for game logic.
@@ -40,7 +317,7 @@ class ExpressionParser:
     Supported operators:
     - Arithmetic: +, -, *, /, %
     - Comparison: <, >, <=, >=, ===, !==
-    - Logical: &&, ||, !
+    - Logical: &&, ||, ! (&& and || short-circuit unless disabled)
     
     Supported functions:
     - itemCount('item_name') - Get item count
@@ -52,20 +329,12 @@ class ExpressionParser:
     - clip(x, min, max) - Clamp x between min and max
     - eventOccurred('event_id') - Check if event has occurred
     - getAttributeValue('attr_name') - Get attribute value
+    
+    Further functions can be added with register_function.
     """
     
-    # Regex patterns for tokenization
-    TOKEN_PATTERNS = [
-        (r'\s+', None),  # Skip whitespace
-        (r'\d+\.?\d*', TokenType.NUMBER),
-        (r"'[^']*'", TokenType.STRING),
-        (r'"[^"]*"', TokenType.STRING),
-        (r'[a-zA-Z_][a-zA-Z0-9_\.]*', TokenType.IDENTIFIER),
-        (r'===|!==|<=|>=|&&|\|\||[+\-*/%<>!]', TokenType.OPERATOR),
-        (r'\(', TokenType.LPAREN),
-        (r'\)', TokenType.RPAREN),
-        (r',', TokenType.COMMA),
-    ]
+    # Regex patterns for tokenization (compiled into _TOKEN_REGEX)
+    TOKEN_PATTERNS = [(pattern, token_type) for _, pattern, token_type in _TOKEN_SPEC]
     
     # Operator precedence (higher = tighter binding)
     PRECEDENCE = {
@@ -78,7 +347,12 @@ class ExpressionParser:
         '!': 7,
     }
     
-    def __init__(self, context: Optional[Dict[str, Any]] = None):
+    def __init__(
+        self,
+        context: Optional[Dict[str, Any]] = None,
+        backend: str = 'tree',
+        short_circuit: bool = True,
+    ):
         """
         Initialize the parser with a context for variable resolution.
         
@@ -87,55 +361,204 @@ class ExpressionParser:
                 - variable_store: VariableStore instance
                 - event_engine: EventEngine instance (optional)
                 - random_func: Custom random function (optional)
+            backend: 'tree' (default) or 'closure'. The closure backend binds
+                the context when an expression is first evaluated; call
+                clear_cache() after replacing context entries.
+            short_circuit: Skip the right operand of && / || when the left
+                operand decides the result. Pass False for rulesets that
+                rely on both operands always being evaluated.
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        
         self.context = context or {}
+        self.backend = backend
+        self.short_circuit = short_circuit
         self._tokens: List[Token] = []
         self._pos = 0
+        
+        # Variables declared immutable, folded into compiled expressions
+        self._constants: Dict[str, Any] = {}
+        
+        # Evaluators compiled against this parser's context, keyed by source
+        self._compiled: Dict[str, Callable[[], Any]] = {}
+        
+        # Vectorized evaluators compiled against this parser's functions
+        self._batch_compiled: Dict[str, Callable[..., Any]] = {}
+        
+        # Callable functions, starting from the global registry, and their
+        # dispatchers bound to the context
+        self.functions: Dict[str, FunctionSpec] = dict(_FUNCTIONS)
+        self._callers: Dict[str, Callable[..., Any]] = {}
+        
+        # Results of costly pure calls, valid while the state versions hold
+        self._memo: Dict[Tuple[Any, ...], Any] = {}
+        self._memo_version: Any = None
     
     def evaluate(self, expression: str) -> Union[float, bool]:
         """
         Evaluate an expression string and return the result.
         
+        The expression is compiled and optimized once per parser (see
+        compile), so repeated evaluations only run the cached evaluator.
+        
         Args:
             expression: The expression to evaluate
-            
+        
         Returns:
             The result (float or bool)
         """
-        self._tokenize(expression)
-        self._pos = 0
+        evaluator = self._compiled.get(expression)
+        if evaluator is None:
+            evaluator = self.compile(expression)
+        return evaluator()
+    
+    def compile(self, expression: str) -> Callable[[], Any]:
+        """
+        Compile an expression into a zero-argument evaluator.
         
-        if not self._tokens:
-            return 0.0
+        The cached AST is optimized against the declared constants, then
+        either bound to a tree walk or, for the closure backend, translated
+        into closures with variable lookups and function calls with literal
+        arguments pre-bound to the current context. The result is cached.
         
-        result = self._parse_expression(0)
-        return result
+        Args:
+            expression: The expression to compile
+        
+        Returns:
+            Callable returning the expression's value
+        """
+        node = self.optimize(expression)
+        if self.backend == 'closure':
+            evaluator = compile_closure(node, self)
+        else:
+            evaluator = partial(node.evaluate, self)
+        
+        if len(self._compiled) >= COMPILE_CACHE_SIZE:
+            self._compiled.clear()
+        self._compiled[expression] = evaluator
+        return evaluator
+    
+    def evaluate_batch(self, expression: str, state: BatchState, mask: Any = None) -> Any:
+        """
+        Evaluate an expression for every game in a batch (requires NumPy).
+        
+        Functions are those of this parser, through their batch
+        implementations; the vectorized evaluator is cached like compile().
+        
+        Args:
+            expression: The expression to evaluate
+            state: BatchState holding one column per variable, item, status
+                and event
+            mask: Optional boolean array of lanes to evaluate
+        
+        Returns:
+            NumPy array with one result per game
+        """
+        from gradquest.core.batch import compile_batch, run_batch
+        evaluator = self._batch_compiled.get(expression)
+        if evaluator is None:
+            evaluator = compile_batch(self.optimize(expression), self.short_circuit, self.functions)
+            if len(self._batch_compiled) >= COMPILE_CACHE_SIZE:
+                self._batch_compiled.clear()
+            self._batch_compiled[expression] = evaluator
+        return run_batch(evaluator, state, mask)
+    
+    def optimize(self, expression: str) -> Node:
+        """Return the constant-folded AST for an expression."""
+        return optimize(compile_expression(expression), self._constants, self.short_circuit, self.functions)
+    
+    def read_set(self, expression: str) -> ReadSet:
+        """Return the state an expression reads (see analyze_reads)."""
+        return analyze_reads(self.optimize(expression), self.functions)
+    
+    def dump(self, expression: str) -> str:
+        """Return the optimized form of an expression as source text."""
+        return dump_expression(self.optimize(expression))
+    
+    def declare_constants(self, values: Dict[str, Any]) -> bool:
+        """
+        Declare variables that will not change for the rest of the game.
+        
+        References to them are folded into literals when expressions are
+        compiled, so they must not be modified after this call.
+        
+        Args:
+            values: Mapping of variable name to its fixed value
+        
+        Returns:
+            True if any value changed, so expressions compiled before
+            this call are outdated
+        """
+        if all(self._constants.get(name, _MISSING) == value for name, value in values.items()):
+            return False
+        self._constants.update(values)
+        self.clear_cache()
+        return True
+    
+    def fork(self, context: Dict[str, Any]) -> ExpressionParser:
+        """
+        Create a parser with this one's settings for another context.
+        
+        Backend, short-circuiting, declared constants and functions carry
+        over; compiled evaluators do not, as they are bound to the context.
+        
+        Args:
+            context: Context of the new parser (see __init__)
+        
+        Returns:
+            The new parser
+        """
+        clone = ExpressionParser(context, backend=self.backend, short_circuit=self.short_circuit)
+        clone._constants = dict(self._constants)
+        clone.functions = dict(self.functions)
+        return clone
+    
+    def register_function(self, spec: FunctionSpec) -> None:
+        """
+        Make a function callable from this parser's expressions.
+        
+        Replaces any function of the same name and drops compiled
+        evaluators, which may have folded or bound the old one.
+        
+        Args:
+            spec: The function and its metadata
+        """
+        self.functions[spec.name] = spec
+        self.clear_cache()
+    
+    def clear_cache(self) -> None:
+        """Drop evaluators compiled against the previous context or constants."""
+        self._compiled.clear()
+        self._batch_compiled.clear()
+        self._callers.clear()
+        self.clear_memo()
+    
+    def clear_memo(self) -> None:
+        """Forget memoized results of costly pure function calls."""
+        self._memo.clear()
+        self._memo_version = None
+    
+    def parse(self, expression: str) -> Node:
+        """
+        Parse an expression string into an AST without evaluating it.
+        
+        Args:
+            expression: The expression to parse
+        
+        Returns:
+            Root node of the expression tree
+        
+        Raises:
+            ValueError: If the expression is malformed (or empty)
+        """
+        self._tokenize(expression)
+        self._pos = 0
+        return self._parse_expression(0)
     
     def _tokenize(self, expression: str) -> None:
         """Tokenize the input expression."""
-        self._tokens = []
-        pos = 0
-        
-        while pos < len(expression):
-            match = None
-            for pattern, token_type in self.TOKEN_PATTERNS:
-                regex = re.compile(pattern)
-                match = regex.match(expression, pos)
-                if match:
-                    if token_type is not None:
-                        value = match.group()
-                        if token_type == TokenType.NUMBER:
-                            value = float(value)
-                        elif token_type == TokenType.STRING:
-                            value = value[1:-1]  # Remove quotes
-                        self._tokens.append(Token(token_type, value, pos))
-                    pos = match.end()
-                    break
-            
-            if not match:
-                raise ValueError(f"Unexpected character at position {pos}: {expression[pos]}")
-        
-        self._tokens.append(Token(TokenType.EOF, None, pos))
+        self._tokens = tokenize(expression)
     
     def _current(self) -> Token:
         """Get current token."""
@@ -147,7 +570,7 @@ class ExpressionParser:
         self._pos += 1
         return token
     
-    def _parse_expression(self, min_precedence: int) -> Union[float, bool]:
+    def _parse_expression(self, min_precedence: int) -> Node:
         """Parse expression using precedence climbing."""
         left = self._parse_unary()
         
@@ -162,37 +585,28 @@ class ExpressionParser:
             
             self._advance()
             right = self._parse_expression(precedence + 1)
-            left = self._apply_binary_op(token.value, left, right)
+            left = BinaryOp(token.value, left, right)
         
         return left
     
-    def _parse_unary(self) -> Union[float, bool]:
+    def _parse_unary(self) -> Node:
         """Parse unary expressions (!, -)."""
         token = self._current()
         
-        if token.type == TokenType.OPERATOR and token.value == '!':
+        if token.type == TokenType.OPERATOR and token.value in ('!', '-'):
             self._advance()
             operand = self._parse_unary()
-            return not bool(operand)
-        
-        if token.type == TokenType.OPERATOR and token.value == '-':
-            self._advance()
-            operand = self._parse_unary()
-            return -float(operand)
+            return UnaryOp(token.value, operand)
         
         return self._parse_primary()
     
-    def _parse_primary(self) -> Union[float, bool]:
+    def _parse_primary(self) -> Node:
         """Parse primary expressions (numbers, strings, identifiers, function calls)."""
         token = self._current()
         
-        if token.type == TokenType.NUMBER:
-            self._advance()
-            return token.value
-        
-        if token.type == TokenType.STRING:
+        if token.type in (TokenType.NUMBER, TokenType.STRING):
             self._advance()
-            return token.value
+            return Literal(token.value)
         
         if token.type == TokenType.IDENTIFIER:
             self._advance()
@@ -203,12 +617,12 @@ class ExpressionParser:
             
             # Check for boolean literals
             if token.value == 'true':
-                return True
+                return Literal(True)
             if token.value == 'false':
-                return False
+                return Literal(False)
             
             # Variable reference
-            return self._resolve_variable(token.value)
+            return Variable(token.value)
         
         if token.type == TokenType.LPAREN:
             self._advance()
@@ -220,7 +634,7 @@ class ExpressionParser:
         
         raise ValueError(f"Unexpected token: {token}")
     
-    def _parse_function_call(self, name: str) -> Union[float, bool]:
+    def _parse_function_call(self, name: str) -> Node:
         """Parse a function call."""
         self._advance()  # consume (
         
@@ -232,7 +646,7 @@ class ExpressionParser:
         
         self._advance()  # consume )
         
-        return self._call_function(name, args)
+        return FunctionCall(name, tuple(args))
     
     def _apply_binary_op(self, op: str, left: Any, right: Any) -> Union[float, bool]:
         """Apply a binary operator."""
@@ -273,60 +687,529 @@ class ExpressionParser:
         return 0.0
     
     def _call_function(self, name: str, args: List[Any]) -> Union[float, bool]:
-        """Call a built-in game function."""
-        variable_store = self.context.get('variable_store')
-        event_engine = self.context.get('event_engine')
-        random_func = self.context.get('random_func', random.random)
-        
-        if name == 'itemCount':
-            if variable_store and len(args) >= 1:
-                return variable_store.get_item_count(str(args[0]))
-            return 0
-        
-        elif name == 'hasStatus':
-            if variable_store and len(args) >= 1:
-                return variable_store.has_status(str(args[0]))
-            return False
+        """Call a registered game function."""
+        call = self._callers.get(name)
+        if call is None:
+            call = self._caller(name)
+        return call(*args)
+    
+    def _caller(self, name: str) -> Callable[..., Any]:
+        """
+        Build (and cache) the dispatcher for a function name.
         
-        elif name == 'randi':
-            max_val = int(args[0]) if args else 10
-            return int(random_func() * max_val)
+        Functions without arity limits or memoization are bound straight to
+        the context, so a call is one dict lookup plus the function itself.
+        """
+        spec = self.functions.get(name)
+        if spec is None:
+            raise ValueError(f"Unknown function: {name}")
         
-        elif name == 'min':
-            if len(args) >= 2:
-                return min(float(args[0]), float(args[1]))
-            return float(args[0]) if args else 0
+        func = partial(spec.func, self.context)
+        if spec.pure and spec.cost >= MEMO_COST:
+            func = partial(self._call_memoized, name, func)
+        if spec.min_args > 0 or spec.max_args is not None:
+            check_arity = spec.check_arity
+            inner = func
+            
+            def func(*args: Any) -> Any:
+                check_arity(len(args))
+                return inner(*args)
         
-        elif name == 'max':
-            if len(args) >= 2:
-                return max(float(args[0]), float(args[1]))
-            return float(args[0]) if args else 0
+        self._callers[name] = func
+        return func
+    
+    def _state_version(self) -> Optional[Tuple[int, int]]:
+        """Get the versions of the store and occurred events, or None if untracked."""
+        version = getattr(self.context.get('variable_store'), 'version', None)
+        if version is None:
+            return None
+        event_engine = self.context.get('event_engine')
+        return version, getattr(event_engine, 'occurred_version', 0)
+    
+    def _call_memoized(self, name: str, func: Callable[..., Any], *args: Any) -> Any:
+        """Call a costly pure function, reusing its result until state changes."""
+        version = self._state_version()
+        if version is None:
+            # Without a store version, changes cannot be detected
+            return func(*args)
+        if version != self._memo_version:
+            self._memo.clear()
+            self._memo_version = version
         
-        elif name == 'floor':
-            return float(int(args[0])) if args else 0
+        key = (name, *args)
+        if key in self._memo:
+            return self._memo[key]
+        result = func(*args)
+        self._memo[key] = result
+        return result
+
+
+def tokenize(expression: str) -> List[Token]:
+    """
+    Split an expression into tokens using the precompiled master scanner.
+    
+    Args:
+        expression: The expression to tokenize
+    
+    Returns:
+        List of tokens, terminated by an EOF token
+    """
+    tokens = []
+    match = _TOKEN_REGEX.match
+    pos = 0
+    end = len(expression)
+    
+    while pos < end:
+        m = match(expression, pos)
+        if not m:
+            raise ValueError(f"Unexpected character at position {pos}: {expression[pos]}")
         
-        elif name == 'clip':
-            if len(args) >= 3:
-                value, low, high = float(args[0]), float(args[1]), float(args[2])
-                return max(low, min(high, value))
-            return float(args[0]) if args else 0
+        token_type = _TOKEN_TYPES[m.lastgroup]
+        if token_type is not None:
+            value = m.group()
+            if token_type == TokenType.NUMBER:
+                value = float(value)
+            elif token_type == TokenType.STRING:
+                value = value[1:-1]  # Remove quotes
+            tokens.append(Token(token_type, value, pos))
+        pos = m.end()
+    
+    tokens.append(Token(TokenType.EOF, None, pos))
+    return tokens
+
+
+# Python implementations of the binary operators, matching _apply_binary_op
+_BINARY_FUNCS: Dict[str, Callable[[Any, Any], Any]] = {
+    '+': lambda l, r: float(l) + float(r),
+    '-': lambda l, r: float(l) - float(r),
+    '*': lambda l, r: float(l) * float(r),
+    '/': lambda l, r: float(l) / float(r) if r != 0 else 0,
+    '%': lambda l, r: float(l) % float(r) if r != 0 else 0,
+    '<': lambda l, r: float(l) < float(r),
+    '>': lambda l, r: float(l) > float(r),
+    '<=': lambda l, r: float(l) <= float(r),
+    '>=': lambda l, r: float(l) >= float(r),
+    '===': lambda l, r: l == r,
+    '!==': lambda l, r: l != r,
+    '&&': lambda l, r: bool(l) and bool(r),
+    '||': lambda l, r: bool(l) or bool(r),
+}
+
+# Sentinel for constants that have not been declared
+_MISSING = object()
+
+# Operators whose left operand is always converted with float()
+_FLOAT_OPS = frozenset(['+', '-', '*', '<', '>', '<=', '>='])
+
+
+def compile_closure(node: Node, parser: ExpressionParser) -> Callable[[], Any]:
+    """
+    Compile an AST into nested closures bound to a parser's context.
+    
+    Only the known node types are translated and no source code is
+    generated, so this keeps the parser's no-eval() guarantee.
+    
+    Args:
+        node: Root node of the expression tree
+        parser: Parser whose context supplies the variable store,
+            event engine and random function
+    
+    Returns:
+        Callable returning the expression's value
+    """
+    variable_store = parser.context.get('variable_store')
+    
+    if isinstance(node, Literal):
+        value = node.value
+        return lambda: value
+    
+    if isinstance(node, Variable):
+        if not variable_store:
+            return lambda: 0.0
+        get_var = variable_store.get_var
+        name = node.name
+        return lambda: get_var(name, 0.0)
+    
+    if isinstance(node, UnaryOp):
+        operand = compile_closure(node.operand, parser)
+        if node.op == '!':
+            return lambda: not bool(operand())
+        return lambda: -float(operand())
+    
+    if isinstance(node, BinaryOp):
+        if node.op not in _BINARY_FUNCS:
+            raise ValueError(f"Unknown operator: {node.op}")
+        left = compile_closure(node.left, parser)
         
-        elif name == 'eventOccurred':
-            if event_engine and len(args) >= 1:
-                return event_engine.has_event_occurred(str(args[0]))
-            return False
+        # Specialize arithmetic and comparisons against a numeric literal
+        right_value = node.right.value if isinstance(node.right, Literal) else None
+        if node.op in _FLOAT_OPS and isinstance(right_value, float):
+            return _compile_constant_op(node.op, left, right_value)
+        if node.op == '===' and right_value is not None:
+            return lambda: left() == right_value
         
-        elif name == 'getAttributeValue':
-            # For now, attributes are stored as variables
-            if variable_store and len(args) >= 1:
-                return variable_store.get_var(str(args[0]), 0.0)
-            return 0.0
+        right = compile_closure(node.right, parser)
+        if parser.short_circuit and node.op == '&&':
+            return lambda: bool(left()) and bool(right())
+        if parser.short_circuit and node.op == '||':
+            return lambda: bool(left()) or bool(right())
+        func = _BINARY_FUNCS[node.op]
+        return lambda: func(left(), right())
+    
+    if isinstance(node, FunctionCall):
+        return _compile_call(node, parser)
+    
+    raise TypeError(f"Cannot compile node: {node!r}")
+
+
+def _compile_constant_op(op: str, left: Callable[[], Any], right: float) -> Callable[[], Any]:
+    """Build a closure for 'left op <number>'."""
+    if op == '+':
+        return lambda: float(left()) + right
+    if op == '-':
+        return lambda: float(left()) - right
+    if op == '*':
+        return lambda: float(left()) * right
+    if op == '<':
+        return lambda: float(left()) < right
+    if op == '>':
+        return lambda: float(left()) > right
+    if op == '<=':
+        return lambda: float(left()) <= right
+    return lambda: float(left()) >= right
+
+
+def _compile_call(node: FunctionCall, parser: ExpressionParser) -> Callable[[], Any]:
+    """Build a closure for a function call, binding it directly where possible."""
+    spec = parser.functions.get(node.name)
+    if spec is not None and spec.bind is not None and len(node.args) == 1 and isinstance(node.args[0], Literal):
+        # Pre-resolve a state query with a literal string argument
+        arg = node.args[0].value
+        bound = spec.bind(parser.context, arg) if isinstance(arg, str) else None
+        if bound is not None:
+            return bound
+    
+    args = [compile_closure(arg, parser) for arg in node.args]
+    if spec is None:
+        # Raise the unknown-function error at evaluation time, as the tree does
+        call = parser._call_function
+        name = node.name
+        return lambda: call(name, [arg() for arg in args])
+    
+    func = parser._caller(node.name)
+    return lambda: func(*[arg() for arg in args])
+
+
+# ==================== Optimization ====================
+
+# Operators that always produce a bool
+_BOOLEAN_OPS = frozenset(['<', '>', '<=', '>=', '===', '!==', '&&', '||', '!'])
+
+
+def is_pure(node: Node, functions: Optional[Dict[str, FunctionSpec]] = None) -> bool:
+    """Check whether evaluating a node has no side effects."""
+    if functions is None:
+        functions = _FUNCTIONS
+    if isinstance(node, UnaryOp):
+        return is_pure(node.operand, functions)
+    if isinstance(node, BinaryOp):
+        return is_pure(node.left, functions) and is_pure(node.right, functions)
+    if isinstance(node, FunctionCall):
+        spec = functions.get(node.name)
+        return spec is not None and spec.pure and all(is_pure(arg, functions) for arg in node.args)
+    return True
+
+
+# Operators that cannot raise on any operand values
+_SAFE_OPS = frozenset(['===', '!==', '&&', '||', '!'])
+
+# Operators that convert their operands with float(); they cannot raise on
+# numbers (division and modulo by zero yield 0)
+_NUMERIC_OPS = frozenset(['+', '-', '*', '/', '%', '<', '>', '<=', '>='])
+
+
+def _is_numeric(node: Node) -> bool:
+    """Check whether a node always evaluates to a number without raising."""
+    if isinstance(node, Literal):
+        return isinstance(node.value, (int, float))
+    if isinstance(node, Variable):
+        # The store always yields a number
+        return True
+    if isinstance(node, UnaryOp):
+        return node.op == '-' and _is_numeric(node.operand)
+    if isinstance(node, BinaryOp):
+        return node.op in ('+', '-', '*', '/', '%') and _is_numeric(node.left) and _is_numeric(node.right)
+    return False
+
+
+def _cannot_raise(node: Node) -> bool:
+    """
+    Check whether evaluating a node can never raise.
+    
+    Literals, variables, arithmetic and ordering over numbers, and
+    equality, logical and negation operators over such nodes qualify.
+    Function calls and arithmetic on strings may raise.
+    """
+    if isinstance(node, (Literal, Variable)):
+        return True
+    if isinstance(node, UnaryOp):
+        return _is_numeric(node) if node.op == '-' else _cannot_raise(node.operand)
+    if isinstance(node, BinaryOp):
+        if node.op in _NUMERIC_OPS:
+            return _is_numeric(node.left) and _is_numeric(node.right)
+        return node.op in _SAFE_OPS and _cannot_raise(node.left) and _cannot_raise(node.right)
+    return False
+
+
+def _is_boolean(node: Node, functions: Dict[str, FunctionSpec]) -> bool:
+    """Check whether a node always evaluates to a bool."""
+    if isinstance(node, Literal):
+        return isinstance(node.value, bool)
+    if isinstance(node, (UnaryOp, BinaryOp)):
+        return node.op in _BOOLEAN_OPS
+    if isinstance(node, FunctionCall):
+        spec = functions.get(node.name)
+        return spec is not None and spec.returns_bool
+    return False
+
+
+def optimize(
+    node: Node,
+    constants: Optional[Dict[str, Any]] = None,
+    short_circuit: bool = False,
+    functions: Optional[Dict[str, FunctionSpec]] = None,
+) -> Node:
+    """
+    Fold constants and simplify boolean identities in an expression tree.
+    
+    Declared constants replace variable references, operators and
+    foldable functions over literals are evaluated, and && / || with a
+    literal operand are reduced. A subtree is only dropped when it would be
+    skipped by short-circuiting anyway, or when it is pure and cannot
+    raise, so random draws and errors happen exactly as in the original
+    expression.
+    
+    Args:
+        node: Root node of the expression tree
+        constants: Mapping of immutable variable names to their values
+        short_circuit: Whether && / || skip their right operand
+        functions: Function registry to consult (defaults to the global one)
+    
+    Returns:
+        An equivalent, possibly smaller, tree
+    """
+    constants = constants or {}
+    if functions is None:
+        functions = _FUNCTIONS
+    
+    if isinstance(node, Variable):
+        if node.name in constants:
+            return Literal(constants[node.name])
+        return node
+    
+    if isinstance(node, UnaryOp):
+        operand = optimize(node.operand, constants, short_circuit, functions)
+        if isinstance(operand, Literal):
+            return _fold(UnaryOp(node.op, operand), functions)
+        return UnaryOp(node.op, operand)
+    
+    if isinstance(node, BinaryOp):
+        left = optimize(node.left, constants, short_circuit, functions)
+        right = optimize(node.right, constants, short_circuit, functions)
+        if isinstance(left, Literal) and isinstance(right, Literal):
+            return _fold(BinaryOp(node.op, left, right), functions)
+        if node.op in ('&&', '||'):
+            return _simplify_logical(node.op, left, right, short_circuit, functions)
+        return BinaryOp(node.op, left, right)
+    
+    if isinstance(node, FunctionCall):
+        args = tuple(optimize(arg, constants, short_circuit, functions) for arg in node.args)
+        call = FunctionCall(node.name, args)
+        if all(isinstance(arg, Literal) for arg in args):
+            spec = functions.get(node.name)
+            if spec is not None and spec.foldable:
+                return _fold(call, functions)
+            # Reading a constant variable is the constant itself
+            if (spec is not None and spec.returns_read and spec.reads == 'variables'
+                    and args and str(args[0].value) in constants):
+                return Literal(constants[str(args[0].value)])
+        return call
+    
+    return node
+
+
+def _fold(node: Node, functions: Dict[str, FunctionSpec]) -> Node:
+    """Evaluate a node made only of literals, keeping it if that fails."""
+    parser = ExpressionParser()
+    parser.functions = functions
+    try:
+        return Literal(node.evaluate(parser))
+    except (ValueError, TypeError, ArithmeticError):
+        # Leave the error to surface at evaluation time
+        return node
+
+
+def _simplify_logical(
+    op: str,
+    left: Node,
+    right: Node,
+    short_circuit: bool,
+    functions: Dict[str, FunctionSpec],
+) -> Node:
+    """Apply boolean identities to && / || with one literal operand."""
+    # The operator short-circuits to this value when an operand has it
+    absorbing = op == '||'
+    
+    for literal, other in ((left, right), (right, left)):
+        if not isinstance(literal, Literal):
+            continue
+        if bool(literal.value) == absorbing:
+            # 'false && x' / 'true || x': the result is fixed, and x is
+            # never evaluated if it is the skipped right operand
+            if (is_pure(other, functions) and _cannot_raise(other)) or (short_circuit and literal is left):
+                return Literal(absorbing)
+        elif _is_boolean(other, functions):
+            # 'true && x' / 'false || x': the result is bool(x)
+            return other
+    
+    return BinaryOp(op, left, right)
+
+
+# ==================== Read-Set Analysis ====================
+
+@dataclass(frozen=True)
+class ReadSet:
+    """The game state an expression depends on."""
+    variables: FrozenSet[str] = frozenset()
+    items: FrozenSet[str] = frozenset()
+    statuses: FrozenSet[str] = frozenset()
+    events: FrozenSet[str] = frozenset()
+    impure: bool = False  # Random, unknown, or not statically resolvable
+    
+    def union(self, other: ReadSet) -> ReadSet:
+        """Combine the reads of two expressions."""
+        return ReadSet(
+            variables=self.variables | other.variables,
+            items=self.items | other.items,
+            statuses=self.statuses | other.statuses,
+            events=self.events | other.events,
+            impure=self.impure or other.impure,
+        )
+
+
+def analyze_reads(node: Node, functions: Optional[Dict[str, FunctionSpec]] = None) -> ReadSet:
+    """
+    Collect the variables, items, statuses and events an expression reads.
+    
+    The result is conservative: both operands of && / || are included, and
+    calls to impure or unknown functions, functions that read unspecified
+    state, and state queries with a computed argument mark the expression
+    as impure.
+    
+    Args:
+        node: Root node of the expression tree
+        functions: Function registry to consult (defaults to the global one)
+    
+    Returns:
+        ReadSet describing the expression's dependencies
+    """
+    reads: Dict[str, set] = {'variables': set(), 'items': set(), 'statuses': set(), 'events': set()}
+    impure = _collect_reads(node, reads, _FUNCTIONS if functions is None else functions)
+    return ReadSet(
+        variables=frozenset(reads['variables']),
+        items=frozenset(reads['items']),
+        statuses=frozenset(reads['statuses']),
+        events=frozenset(reads['events']),
+        impure=impure,
+    )
+
+
+def _collect_reads(node: Node, reads: Dict[str, set], functions: Dict[str, FunctionSpec]) -> bool:
+    """Add a node's reads to the given sets; return True if impure."""
+    if isinstance(node, Variable):
+        reads['variables'].add(node.name)
+        return False
+    if isinstance(node, UnaryOp):
+        return _collect_reads(node.operand, reads, functions)
+    if isinstance(node, BinaryOp):
+        left = _collect_reads(node.left, reads, functions)
+        right = _collect_reads(node.right, reads, functions)
+        return left or right
+    if isinstance(node, FunctionCall):
+        impure = False
+        for arg in node.args:
+            impure = _collect_reads(arg, reads, functions) or impure
         
-        else:
-            raise ValueError(f"Unknown function: {name}")
+        spec = functions.get(node.name)
+        if spec is None or not spec.pure or spec.reads_state:
+            return True
+        if spec.reads is not None:
+            if node.args and isinstance(node.args[0], Literal):
+                reads[spec.reads].add(str(node.args[0].value))
+                return impure
+            # Which entry is read is only known at runtime
+            return True
+        return impure
+    return False
+
+
+def dump_expression(node: Node) -> str:
+    """
+    Render an expression tree back to source text.
+    
+    Binary operations are fully parenthesized so the structure is explicit.
+    
+    Args:
+        node: Root node of the expression tree
+    
+    Returns:
+        Source text that compiles to an equivalent tree
+    """
+    if isinstance(node, Literal):
+        value = node.value
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        if isinstance(value, str):
+            return f"'{value}'"
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+    if isinstance(node, Variable):
+        return node.name
+    if isinstance(node, UnaryOp):
+        return f"{node.op}{dump_expression(node.operand)}"
+    if isinstance(node, BinaryOp):
+        return f"({dump_expression(node.left)} {node.op} {dump_expression(node.right)})"
+    if isinstance(node, FunctionCall):
+        return f"{node.name}({', '.join(dump_expression(arg) for arg in node.args)})"
+    raise TypeError(f"Cannot dump node: {node!r}")
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_expression(expression: str) -> Node:
+    """
+    Compile an expression string into an immutable AST.
+    
+    Results are kept in a bounded LRU cache keyed by the source text, so
+    each distinct ruleset expression is tokenized and parsed only once.
+    
+    Args:
+        expression: The expression to compile
+    
+    Returns:
+        Root node of the expression tree
+    """
+    return ExpressionParser().parse(expression)
 
 
-def create_parser(variable_store=None, event_engine=None, random_seed: Optional[int] = None) -> ExpressionParser:
+def create_parser(
+    variable_store=None,
+    event_engine=None,
+    random_seed: Optional[int] = None,
+    backend: str = 'tree',
+    short_circuit: bool = True,
+    rng: Optional[RandomService] = None,
+) -> ExpressionParser:
     """
     Create an ExpressionParser with the given context.
     
@@ -334,15 +1217,16 @@ def create_parser(variable_store=None, event_engine=None, random_seed: Optional[
         variable_store: VariableStore instance for variable resolution
         event_engine: EventEngine instance for event queries
         random_seed: Optional seed for reproducible random numbers
+        backend: Evaluation backend, 'tree' or 'closure'
+        short_circuit: Whether && / || skip the right operand when the left decides
+        rng: Random service whose randi stream feeds randi (overrides random_seed)
     
     Returns:
         Configured ExpressionParser instance
     """
-    if random_seed is not None:
-        rng = random.Random(random_seed)
-        random_func = rng.random
-    else:
-        random_func = random.random
+    if rng is None and random_seed is not None:
+        rng = RandomService(random_seed)
+    random_func = rng.stream(EXPRESSION_STREAM).random if rng else random.random
     
     context = {
         'variable_store': variable_store,
@@ -350,4 +1234,4 @@ def create_parser(variable_store=None, event_engine=None, random_seed: Optional[
         'random_func': random_func,
     }
     
-    return ExpressionParser(context)
+    return ExpressionParser(context, backend=backend, short_circuit=short_circuit)
@@ -6,15 +6,27 @@ registries, and game loop execution.
 """
 
 from __future__ import annotations
-from typing import Dict, Optional, Any, Callable, TYPE_CHECKING
+from typing import Dict, List, Optional, Any, Callable, Iterator, Tuple, TYPE_CHECKING
 from pathlib import Path
+import copy
 import random
-import yaml
 
+from gradquest.core.change_bus import ChangeBus
+from gradquest.core.cow import CopyOnWrite
 from gradquest.core.variable_store import VariableStore
-from gradquest.core.expression_parser import ExpressionParser, create_parser
+from gradquest.core.slot_store import SlotVariableStore
+from gradquest.core.expression_parser import ExpressionParser, FunctionSpec, ReadSet, create_parser
 from gradquest.core.registries import AttributeRegistry, ItemRegistry, StatusRegistry, ActiveStatus
-from gradquest.core.event_engine import EventEngine, GameEvent, EventCondition, EventAction, EventActionContext, ActionResult
+from gradquest.core.ruleset_cache import load_ruleset_data
+from gradquest.core.rng import RandomService, RandomStream, ACTION_STREAM, EVENT_STREAM, EXPRESSION_STREAM
+from gradquest.core.event_engine import (
+    EventEngine, GameEvent, EventCondition, EventAction, EventActionContext, ActionResult, ActionStep,
+    DrainResult,
+)
+
+
+# Ruleset used when no data path is given
+DEFAULT_DATA_PATH = Path(__file__).parent.parent.parent / "data" / "rulesets" / "default"
 
 
 class EndGameState:
@@ -26,7 +38,7 @@ class EndGameState:
         self.message = message
 
 
-class GameEngine:
+class GameEngine(CopyOnWrite):
     """
     Central game controller orchestrating all game systems.
     
@@ -37,13 +49,34 @@ class GameEngine:
     - Game loop with tick() method
     - Win/lose condition checking
     - Game lifecycle management
+    - Copy-on-write forking for lookahead
     """
     
+    _COW_FIELDS = ('_active_status',)
+    
     # Default game settings
     DEFAULT_HOPE = 50
     DEFAULT_PAPERS_REQUIRED = 3
+    DEFAULT_MAX_YEAR = 8
     TICK_INTERVAL_MS = 50  # Original game speed
     
+    # Variables that never change after _init_game_variables; expressions
+    # reading them are constant-folded by the parser
+    CONSTANT_VARIABLES = ('rule.papersRequired', 'rule.maxYear')
+    
+    # Short-circuit && / || in ruleset expressions; set to False for
+    # rulesets that expect both operands to always be evaluated
+    SHORT_CIRCUIT_LOGIC = True
+    
+    # Only re-evaluate event conditions whose inputs changed
+    INCREMENTAL_CONDITIONS = True
+    
+    # Expression evaluation backend: 'tree' or 'closure' (see ExpressionParser)
+    EXPRESSION_BACKEND = 'tree'
+    
+    # State store; SlotVariableStore trades dicts for slot-indexed arrays
+    VARIABLE_STORE_CLASS = VariableStore
+    
     def __init__(self, data_path: Optional[Path] = None):
         """
         Initialize the game engine.
@@ -52,7 +85,11 @@ class GameEngine:
             data_path: Path to the ruleset data directory
         """
         # Core systems
-        self.variable_store = VariableStore()
+        self.variable_store = self.VARIABLE_STORE_CLASS()
+        
+        # State change notifications, batched per tick and per month
+        self.change_bus = ChangeBus()
+        self.variable_store.bus = self.change_bus
         self.parser: Optional[ExpressionParser] = None
         self.event_engine: Optional[EventEngine] = None
         
@@ -64,32 +101,42 @@ class GameEngine:
         # Active status effects with duration tracking
         self._active_status: Dict[str, ActiveStatus] = {}
         
+        # Ruleset-defined expression functions
+        self._functions: List[FunctionSpec] = []
+        
+        # Interpolate variables into event messages (headless runs turn
+        # this off, since nobody reads them)
+        self.format_messages = True
+        
         # Data path
-        self.data_path = data_path or Path(__file__).parent.parent.parent / "data" / "rulesets" / "default"
+        self.data_path = data_path or DEFAULT_DATA_PATH
         
         # Game state
         self._running = False
         self._ended = False
         self._end_state: Optional[EndGameState] = None
         self._random_seed: Optional[int] = None
-        self._rng: Optional[random.Random] = None
         
         # Callbacks for UI
         self._on_message: Optional[Callable[[str], None]] = None
         self._on_choice: Optional[Callable[[list], int]] = None
         self._on_state_update: Optional[Callable[[], None]] = None
         
-        # Initialize random
-        self._rng = random.Random()
+        # Initialize random: event rolls, action outcomes and randi each
+        # draw from their own stream of one service
+        self.rng = RandomService()
+        self._action_stream = self.rng.stream(ACTION_STREAM)
     
     def set_random_seed(self, seed: int) -> None:
         """Set the random seed for reproducible gameplay."""
         self._random_seed = seed
-        self._rng = random.Random(seed)
+        # Streams are rekeyed in place, so the parser and event engine
+        # follow and a loaded engine can play several reproducible games
+        self.rng.reseed(seed)
     
     def _random(self) -> float:
-        """Get a random float in [0, 1)."""
-        return self._rng.random() if self._rng else random.random()
+        """Get a random float in [0, 1) from the action stream."""
+        return self._action_stream.random()
     
     # ==================== Callbacks ====================
     
@@ -105,61 +152,86 @@ class GameEngine:
         """Set callback for state updates."""
         self._on_state_update = callback
     
+    def register_function(self, spec: FunctionSpec) -> None:
+        """
+        Add an expression function for this ruleset's conditions and actions.
+        
+        Functions registered before load_game_data are compiled into the
+        event conditions and actions it loads.
+        
+        Args:
+            spec: The function and its metadata
+        """
+        self._functions.append(spec)
+        if self.parser:
+            self.parser.register_function(spec)
+    
     # ==================== Data Loading ====================
     
-    def load_game_data(self) -> None:
-        """Load all game data from YAML files."""
+    def load_game_data(self, use_cache: bool = False) -> None:
+        """
+        Load all game data from YAML files.
+        
+        Args:
+            use_cache: Read the parsed files from the ruleset's on-disk
+                cache, and write it when missing or outdated (see
+                ruleset_cache). Off by default, since the cache is written
+                next to the ruleset directory.
+        """
+        documents = load_ruleset_data(self.data_path, use_cache=use_cache)
+        
         # Load attributes
-        attr_path = self.data_path / "attributes.yaml"
-        if attr_path.exists():
-            with open(attr_path, 'r') as f:
-                data = yaml.safe_load(f)
-                if data:
-                    self.attribute_registry.load_from_yaml(data)
+        if documents['attributes.yaml']:
+            self.attribute_registry.load_from_yaml(documents['attributes.yaml'])
         
         # Load items
-        items_path = self.data_path / "items.yaml"
-        if items_path.exists():
-            with open(items_path, 'r') as f:
-                data = yaml.safe_load(f)
-                if data:
-                    self.item_registry.load_from_yaml(data)
+        if documents['items.yaml']:
+            self.item_registry.load_from_yaml(documents['items.yaml'])
         
         # Load status effects
-        status_path = self.data_path / "status.yaml"
-        if status_path.exists():
-            with open(status_path, 'r') as f:
-                data = yaml.safe_load(f)
-                if data:
-                    self.status_registry.load_from_yaml(data)
+        if documents['status.yaml']:
+            self.status_registry.load_from_yaml(documents['status.yaml'])
+        
+        # Give the ruleset's names fixed slots in an array-backed store
+        if isinstance(self.variable_store, SlotVariableStore):
+            self.variable_store.layout.intern(
+                variables=self.attribute_registry.get_all_ids(),
+                items=self.item_registry.get_all_ids(),
+                statuses=self.status_registry.get_all_ids(),
+            )
         
         # Initialize expression parser
         self.parser = create_parser(
             variable_store=self.variable_store,
             event_engine=None,  # Will be set after event engine is created
-            random_seed=self._random_seed
+            rng=self.rng,
+            backend=self.EXPRESSION_BACKEND,
+            short_circuit=self.SHORT_CIRCUIT_LOGIC,
         )
         
+        for spec in self._functions:
+            self.parser.register_function(spec)
+        
         # Initialize event engine
         self.event_engine = EventEngine(self.variable_store, self.parser)
-        self.event_engine.set_random_func(self._random)
+        self.event_engine.set_random_func(self.rng.stream(EVENT_STREAM).random)
+        self.event_engine.set_incremental(self.INCREMENTAL_CONDITIONS)
         
         # Update parser with event engine reference
         self.parser.context['event_engine'] = self.event_engine
         
-        # Register action handlers
-        self._register_action_handlers()
+        # Register action compilers
+        self._register_action_compilers()
+        
+        # Declare constants before compiling, so events fold them
+        rules = self._rule_values()
+        self.parser.declare_constants({name: rules[name] for name in self.CONSTANT_VARIABLES if name in rules})
         
         # Load events
-        events_path = self.data_path / "events.yaml"
-        if events_path.exists():
-            self._load_events(events_path)
+        self._load_events(documents['events.yaml'])
     
-    def _load_events(self, path: Path) -> None:
-        """Load events from YAML file."""
-        with open(path, 'r') as f:
-            data = yaml.safe_load(f)
-        
+    def _load_events(self, data: Optional[List[Dict[str, Any]]]) -> None:
+        """Load events from the parsed events.yaml."""
         if not data:
             return
         
@@ -167,9 +239,11 @@ class GameEngine:
             # Parse conditions
             conditions = []
             for cond_data in event_data.get('conditions', []):
+                expression = cond_data.get('expression', 'true')
                 cond = EventCondition(
                     id=cond_data.get('id', 'Expression'),
-                    expression=cond_data.get('expression', 'true')
+                    expression=expression,
+                    reads=self._analyze_reads(expression),
                 )
                 conditions.append(cond)
             
@@ -195,171 +269,222 @@ class GameEngine:
             )
             
             self.event_engine.register_event(event)
-    
-    def _register_action_handlers(self) -> None:
-        """Register all action handlers with the event engine."""
+            # Compile now, so a broken action fails the load, naming the
+            # event and action, rather than the game that first runs it
+            self.event_engine.compile_event(event)
+    
+    def _analyze_reads(self, expression: Any) -> ReadSet:
+        """Compute the read set of a condition, treating parse errors as impure."""
+        try:
+            return self.parser.read_set(expression)
+        except Exception:
+            return ReadSet(impure=True)
+    
+    def _register_action_compilers(self) -> None:
+        """Register all action compilers with the event engine."""
         if not self.event_engine:
             return
         
-        self.event_engine.register_action_handler('DisplayMessage', self._action_display_message)
-        self.event_engine.register_action_handler('DisplayChoices', self._action_display_choices)
-        self.event_engine.register_action_handler('UpdateVariable', self._action_update_variable)
-        self.event_engine.register_action_handler('UpdateVariables', self._action_update_variables)
-        self.event_engine.register_action_handler('GiveItem', self._action_give_item)
-        self.event_engine.register_action_handler('RemoveItem', self._action_remove_item)
-        self.event_engine.register_action_handler('SetStatus', self._action_set_status)
-        self.event_engine.register_action_handler('RemoveStatus', self._action_remove_status)
-        self.event_engine.register_action_handler('TriggerEvents', self._action_trigger_events)
-        self.event_engine.register_action_handler('EndGame', self._action_end_game)
-        self.event_engine.register_action_handler('EnableEvent', self._action_enable_event)
-        self.event_engine.register_action_handler('DisableEvent', self._action_disable_event)
-        self.event_engine.register_action_handler('CoinFlip', self._action_coin_flip)
-        self.event_engine.register_action_handler('Random', self._action_random)
-        self.event_engine.register_action_handler('Switch', self._action_switch)
-    
-    # ==================== Action Handlers ====================
-    
-    def _action_display_message(self, action: EventAction, context: EventActionContext) -> None:
+        self.event_engine.register_action_compiler('DisplayMessage', self._compile_display_message)
+        self.event_engine.register_action_compiler('DisplayChoices', self._compile_display_choices)
+        self.event_engine.register_action_compiler('UpdateVariable', self._compile_update_variable)
+        self.event_engine.register_action_compiler('UpdateVariables', self._compile_update_variables)
+        self.event_engine.register_action_compiler('GiveItem', self._compile_give_item)
+        self.event_engine.register_action_compiler('RemoveItem', self._compile_remove_item)
+        self.event_engine.register_action_compiler('SetStatus', self._compile_set_status)
+        self.event_engine.register_action_compiler('RemoveStatus', self._compile_remove_status)
+        self.event_engine.register_action_compiler('TriggerEvents', self._compile_trigger_events)
+        self.event_engine.register_action_compiler('EndGame', self._compile_end_game)
+        self.event_engine.register_action_compiler('EnableEvent', self._compile_enable_event)
+        self.event_engine.register_action_compiler('DisableEvent', self._compile_disable_event)
+        self.event_engine.register_action_compiler('CoinFlip', self._compile_coin_flip)
+        self.event_engine.register_action_compiler('Random', self._compile_random)
+        self.event_engine.register_action_compiler('Switch', self._compile_switch)
+    
+    # ==================== Action Compilers ====================
+    #
+    # Each compiler reads an action's params once and returns a step
+    # (a callable taking the EventActionContext) that performs it. Steps
+    # with nested actions return EventEngine.run_steps() for them, so a
+    # wait inside a branch pauses and resumes the whole event.
+    
+    def _compile_display_message(self, params: Dict[str, Any]) -> ActionStep:
         """Display a message to the player."""
-        message = action.params.get('message', '')
-        message = self._interpolate_text(message)
-        context.display_message(message)
+        message = params.get('message', '')
+        
+        def step(context: EventActionContext) -> None:
+            context.display_message(self._interpolate_text(message) if self.format_messages else message)
+        return step
     
-    def _action_display_choices(self, action: EventAction, context: EventActionContext) -> None:
-        """Display choices to the player."""
-        choices = action.params.get('choices', [])
-        context.display_choices(choices)
+    def _compile_display_choices(self, params: Dict[str, Any]) -> ActionStep:
+        """Display choices to the player and run the chosen one's actions."""
+        choices = params.get('choices', [])
+        options = [self.event_engine.compile_actions(choice.get('actions', [])) for choice in choices]
+        
+        def step(context: EventActionContext) -> Iterator[EventActionContext]:
+            context.display_choices(choices)
+            return self._run_choice(options, context)
+        return step
     
-    def _action_update_variable(self, action: EventAction, context: EventActionContext) -> None:
+    def _compile_update_variable(self, params: Dict[str, Any]) -> ActionStep:
         """Update a single variable."""
-        var_name = action.params.get('variable', '')
-        value_expr = action.params.get('value', '0')
+        var_name = params.get('variable', '')
+        evaluate = self.parser.compile(str(params.get('value', '0')))
+        set_var = self.variable_store.set_var
         
-        if self.parser:
-            value = self.parser.evaluate(str(value_expr))
-            self.variable_store.set_var(var_name, float(value))
+        def step(context: EventActionContext) -> None:
+            set_var(var_name, float(evaluate()))
+        return step
     
-    def _action_update_variables(self, action: EventAction, context: EventActionContext) -> None:
+    def _compile_update_variables(self, params: Dict[str, Any]) -> ActionStep:
         """Update multiple variables."""
-        updates = action.params.get('updates', [])
-        for update in updates:
-            var_name = update.get('variable', '')
-            value_expr = update.get('value', '0')
-            
-            if self.parser:
-                value = self.parser.evaluate(str(value_expr))
-                self.variable_store.set_var(var_name, float(value))
-    
-    def _action_give_item(self, action: EventAction, context: EventActionContext) -> None:
+        updates = [
+            (update.get('variable', ''), self.parser.compile(str(update.get('value', '0'))))
+            for update in params.get('updates', [])
+        ]
+        set_var = self.variable_store.set_var
+        
+        def step(context: EventActionContext) -> None:
+            for var_name, evaluate in updates:
+                set_var(var_name, float(evaluate()))
+        return step
+    
+    def _compile_give_item(self, params: Dict[str, Any]) -> ActionStep:
         """Give an item to the player."""
-        item_id = action.params.get('item', '')
-        count = action.params.get('count', 1)
-        self.variable_store.add_item(item_id, count)
+        item_id = params.get('item', '')
+        count = params.get('count', 1)
+        add_item = self.variable_store.add_item
+        
+        def step(context: EventActionContext) -> None:
+            add_item(item_id, count)
+        return step
     
-    def _action_remove_item(self, action: EventAction, context: EventActionContext) -> None:
+    def _compile_remove_item(self, params: Dict[str, Any]) -> ActionStep:
         """Remove an item from the player."""
-        item_id = action.params.get('item', '')
-        count = action.params.get('count', 1)
-        self.variable_store.remove_item(item_id, count)
+        item_id = params.get('item', '')
+        count = params.get('count', 1)
+        remove_item = self.variable_store.remove_item
+        
+        def step(context: EventActionContext) -> None:
+            remove_item(item_id, count)
+        return step
     
-    def _action_set_status(self, action: EventAction, context: EventActionContext) -> None:
+    def _compile_set_status(self, params: Dict[str, Any]) -> ActionStep:
         """Apply a status effect."""
-        status_id = action.params.get('status', '')
+        status_id = params.get('status', '')
         definition = self.status_registry.get(status_id)
         
-        if definition:
-            self._active_status[status_id] = ActiveStatus(definition)
-            self.variable_store.add_status(status_id)
+        def step(context: EventActionContext) -> None:
+            if definition:
+                if self._shared:
+                    self._own('_active_status')
+                self._active_status[status_id] = ActiveStatus(definition)
+                self.variable_store.add_status(status_id)
+        return step
     
-    def _action_remove_status(self, action: EventAction, context: EventActionContext) -> None:
+    def _compile_remove_status(self, params: Dict[str, Any]) -> ActionStep:
         """Remove a status effect."""
-        status_id = action.params.get('status', '')
-        self._active_status.pop(status_id, None)
-        self.variable_store.remove_status(status_id)
+        status_id = params.get('status', '')
+        
+        def step(context: EventActionContext) -> None:
+            if self._shared:
+                self._own('_active_status')
+            self._active_status.pop(status_id, None)
+            self.variable_store.remove_status(status_id)
+        return step
     
-    def _action_trigger_events(self, action: EventAction, context: EventActionContext) -> None:
+    def _compile_trigger_events(self, params: Dict[str, Any]) -> ActionStep:
         """Trigger events by trigger ID."""
-        trigger_id = action.params.get('trigger', '')
-        probability = action.params.get('probability', 1.0)
-        priority = action.params.get('priority', 0)
+        trigger_id = params.get('trigger', '')
+        probability = params.get('probability', 1.0)
+        priority = params.get('priority', 0)
         
-        if self.event_engine:
+        def step(context: EventActionContext) -> None:
             self.event_engine.trigger(trigger_id, probability, priority)
+        return step
     
-    def _action_end_game(self, action: EventAction, context: EventActionContext) -> None:
+    def _compile_end_game(self, params: Dict[str, Any]) -> ActionStep:
         """End the game."""
-        won = action.params.get('won', False)
-        reason = action.params.get('reason', 'unknown')
-        message = action.params.get('message', '')
+        won = params.get('won', False)
+        reason = params.get('reason', 'unknown')
+        message = params.get('message', '')
         
-        self._ended = True
-        self._running = False
-        self._end_state = EndGameState(won, reason, self._interpolate_text(message))
-        context.stop_event()
+        def step(context: EventActionContext) -> None:
+            self._ended = True
+            self._running = False
+            text = self._interpolate_text(message) if self.format_messages else message
+            self._end_state = EndGameState(won, reason, text)
+            context.stop_event()
+        return step
     
-    def _action_enable_event(self, action: EventAction, context: EventActionContext) -> None:
+    def _compile_enable_event(self, params: Dict[str, Any]) -> ActionStep:
         """Enable an event."""
-        event_id = action.params.get('event', '')
-        if self.event_engine:
+        event_id = params.get('event', '')
+        
+        def step(context: EventActionContext) -> None:
             self.event_engine.enable_event(event_id)
+        return step
     
-    def _action_disable_event(self, action: EventAction, context: EventActionContext) -> None:
+    def _compile_disable_event(self, params: Dict[str, Any]) -> ActionStep:
         """Disable an event."""
-        event_id = action.params.get('event', '')
-        if self.event_engine:
+        event_id = params.get('event', '')
+        
+        def step(context: EventActionContext) -> None:
             self.event_engine.disable_event(event_id)
+        return step
     
-    def _action_coin_flip(self, action: EventAction, context: EventActionContext) -> None:
+    def _compile_coin_flip(self, params: Dict[str, Any]) -> ActionStep:
         """Execute actions based on coin flip."""
-        probability = action.params.get('probability', 0.5)
-        
-        if self._random() < probability:
-            # Execute success actions
-            success_actions = action.params.get('success', [])
-            self._execute_nested_actions(success_actions, context)
-        else:
-            # Execute failure actions
-            failure_actions = action.params.get('failure', [])
-            self._execute_nested_actions(failure_actions, context)
-    
-    def _action_random(self, action: EventAction, context: EventActionContext) -> None:
-        """Execute weighted random action."""
-        options = action.params.get('options', [])
-        
-        total_weight = sum(opt.get('weight', 1) for opt in options)
-        roll = self._random() * total_weight
+        probability = params.get('probability', 0.5)
+        success = self.event_engine.compile_actions(params.get('success', []))
+        failure = self.event_engine.compile_actions(params.get('failure', []))
         
-        cumulative = 0
-        for option in options:
-            cumulative += option.get('weight', 1)
-            if roll < cumulative:
-                self._execute_nested_actions(option.get('actions', []), context)
-                break
+        def step(context: EventActionContext) -> Iterator[EventActionContext]:
+            return self.event_engine.run_steps(success if self._random() < probability else failure, context)
+        return step
+    
+    def _compile_random(self, params: Dict[str, Any]) -> ActionStep:
+        """Execute weighted random action."""
+        options = [
+            (option.get('weight', 1), self.event_engine.compile_actions(option.get('actions', [])))
+            for option in params.get('options', [])
+        ]
+        total_weight = sum(weight for weight, _ in options)
+        
+        def step(context: EventActionContext) -> Optional[Iterator[EventActionContext]]:
+            roll = self._random() * total_weight
+            cumulative = 0
+            for weight, steps in options:
+                cumulative += weight
+                if roll < cumulative:
+                    return self.event_engine.run_steps(steps, context)
+            return None
+        return step
     
-    def _action_switch(self, action: EventAction, context: EventActionContext) -> None:
+    def _compile_switch(self, params: Dict[str, Any]) -> ActionStep:
         """Execute conditional switch."""
-        cases = action.params.get('cases', [])
-        default_actions = action.params.get('default', [])
-        
-        for case in cases:
-            condition = case.get('condition', 'false')
-            if self.parser and self.parser.evaluate(condition):
-                self._execute_nested_actions(case.get('actions', []), context)
-                return
-        
-        # No case matched, execute default
-        self._execute_nested_actions(default_actions, context)
-    
-    def _execute_nested_actions(self, actions_data: list, context: EventActionContext) -> None:
-        """Execute a list of nested actions."""
-        for action_data in actions_data:
-            action = EventAction(
-                id=action_data.get('id', 'Unknown'),
-                params={k: v for k, v in action_data.items() if k != 'id'}
-            )
-            handler = self.event_engine._action_handlers.get(action.id)
-            if handler:
-                handler(action, context)
+        cases = [
+            (self.parser.compile(str(case.get('condition', 'false'))),
+             self.event_engine.compile_actions(case.get('actions', [])))
+            for case in params.get('cases', [])
+        ]
+        default = self.event_engine.compile_actions(params.get('default', []))
+        
+        def step(context: EventActionContext) -> Iterator[EventActionContext]:
+            for condition, steps in cases:
+                if condition():
+                    return self.event_engine.run_steps(steps, context)
+            
+            # No case matched, execute default
+            return self.event_engine.run_steps(default, context)
+        return step
+    
+    def _run_choice(self, options: List[List[ActionStep]], context: EventActionContext) -> Iterator[EventActionContext]:
+        """Wait for the player's choice, then run the chosen option's actions."""
+        yield context
+        choice = context.user_choice
+        if choice is not None and 0 <= choice < len(options):
+            yield from self.event_engine.run_steps(options[choice], context)
     
     # ==================== Game Lifecycle ====================
     
@@ -369,7 +494,8 @@ class GameEngine:
         self.variable_store.reset()
         if self.event_engine:
             self.event_engine.reset()
-        self._active_status.clear()
+        self._active_status = {}
+        self._unshare('_active_status')
         self._ended = False
         self._end_state = None
         
@@ -410,8 +536,21 @@ class GameEngine:
         vs.set_var('elapsedMonth', 0)
         
         # Game rules
-        vs.set_var('rule.papersRequired', self.DEFAULT_PAPERS_REQUIRED)
-        vs.set_var('rule.maxYear', 8)
+        for name, value in self._rule_values().items():
+            vs.set_var(name, value)
+        
+        # Steps compiled against other constants (e.g. a changed
+        # DEFAULT_PAPERS_REQUIRED) are recompiled
+        if self.parser and self.parser.declare_constants(
+                {name: vs.get_var(name) for name in self.CONSTANT_VARIABLES}):
+            self.event_engine.clear_compiled()
+    
+    def _rule_values(self) -> Dict[str, Any]:
+        """Get the game rule variables of a new game."""
+        return {
+            'rule.papersRequired': self.DEFAULT_PAPERS_REQUIRED,
+            'rule.maxYear': self.DEFAULT_MAX_YEAR,
+        }
     
     def tick(self) -> Optional[EventActionContext]:
         """
@@ -425,14 +564,49 @@ class GameEngine:
         
         # Process pending triggers
         if self.event_engine and self.event_engine.has_pending_triggers():
-            context = self.event_engine.process_next_trigger()
+            with self.change_bus.batch():
+                context = self.event_engine.process_next_trigger()
             if context and context.result == ActionResult.WAIT:
                 return context
         
         return None
     
+    def drain(
+        self,
+        max_triggers: Optional[int] = None,
+        max_time_ms: Optional[float] = None,
+        wait_on_messages: bool = False,
+    ) -> DrainResult:
+        """
+        Process pending triggers in bulk (see EventEngine.drain).
+        
+        Stops early if the game ends. Changes are delivered to change bus
+        subscribers as one batch.
+        
+        Args:
+            max_triggers: Most triggers to process (None for no limit)
+            max_time_ms: Wall-clock budget in milliseconds (None for no limit)
+            wait_on_messages: Whether a plain message also stops draining
+        
+        Returns:
+            DrainResult with the collected messages and any waiting context
+        """
+        if not self._running or self._ended or not self.event_engine:
+            return DrainResult()
+        
+        with self.change_bus.batch():
+            return self.event_engine.drain(
+                max_triggers, max_time_ms, wait_on_messages,
+                stop=lambda: self._ended or not self._running,
+            )
+    
     def advance_month(self) -> None:
         """Advance the game by one month."""
+        with self.change_bus.batch():
+            self._advance_month()
+    
+    def _advance_month(self) -> None:
+        """Advance the calendar, tick statuses and queue MonthBegin."""
         vs = self.variable_store
         
         month = int(vs.get_var('month'))
@@ -459,6 +633,8 @@ class GameEngine:
     
     def _tick_status_effects(self) -> None:
         """Tick all active status effects."""
+        if self._shared:
+            self._own('_active_status')
         expired = []
         
         for status_id, active in self._active_status.items():
@@ -501,6 +677,81 @@ class GameEngine:
         
         return re.sub(r'\{([a-zA-Z_.]+)\}', replace_var, text)
     
+    # ==================== Saving ====================
+    
+    def _export_state(self) -> Tuple[Dict[str, float], bool, bool, Optional[EndGameState]]:
+        """Return (remaining duration by active status, running, ended, end state) for saves."""
+        remaining = {status_id: active.remaining_duration for status_id, active in self._active_status.items()}
+        return remaining, self._running, self._ended, self._end_state
+    
+    def _import_state(
+        self,
+        remaining: Dict[str, float],
+        running: bool,
+        ended: bool,
+        end_state: Optional[EndGameState],
+    ) -> None:
+        """Replace the game's own state with one from _export_state()."""
+        active_status = {}
+        for status_id, duration in remaining.items():
+            definition = self.status_registry.get(status_id)
+            if definition:
+                active_status[status_id] = ActiveStatus(definition)
+                active_status[status_id].remaining_duration = duration
+        self._active_status = active_status
+        self._unshare('_active_status')
+        self._running = running
+        self._ended = ended
+        self._end_state = end_state
+    
+    # ==================== Forking ====================
+    
+    def fork(self) -> GameEngine:
+        """
+        Create an independent copy of the current game in O(1).
+        
+        State is shared copy-on-write with the fork: variables, active
+        statuses and the event engine's occurred/disabled events and
+        trigger queue are only copied when one side changes them. Random
+        streams are copied, so a fork replays the same draws as this game
+        would. UI callbacks and change bus subscribers are not carried over.
+        
+        Returns:
+            The forked engine
+        """
+        clone = copy.copy(self)
+        clone._on_message = None
+        clone._on_choice = None
+        clone._on_state_update = None
+        clone._functions = list(self._functions)
+        clone.variable_store = self.variable_store.fork()
+        clone.change_bus = ChangeBus()
+        clone.variable_store.bus = clone.change_bus
+        clone.rng = self.rng.fork()
+        clone._action_stream = clone.rng.stream(ACTION_STREAM)
+        self._share_with(clone)
+        
+        if self.parser:
+            context = dict(self.parser.context)
+            context['variable_store'] = clone.variable_store
+            if isinstance(getattr(context.get('random_func'), '__self__', None), RandomStream):
+                context['random_func'] = clone.rng.stream(EXPRESSION_STREAM).random
+            clone.parser = self.parser.fork(context)
+        
+        if self.event_engine:
+            clone.event_engine = self.event_engine.fork(clone.variable_store, clone.parser)
+            clone.event_engine.set_random_func(clone.rng.stream(EVENT_STREAM).random)
+            clone.parser.context['event_engine'] = clone.event_engine
+            clone._register_action_compilers()
+        
+        return clone
+    
+    def _copy_shared(self, name: str, value: Any) -> Any:
+        """Copy active statuses along with their remaining durations."""
+        if name == '_active_status':
+            return {status_id: copy.copy(active) for status_id, active in value.items()}
+        return super()._copy_shared(name, value)
+    
     # ==================== Accessors ====================
     
     @property
@@ -0,0 +1,283 @@
+"""
+Player Actions - The rules of the player's monthly actions.
+
+Reading papers, research, publishing, slacking off, preparing for quals
+and the thesis: which actions are available and what each one does. The
+CLI, the web UI and headless simulation all play by these rules; they
+only differ in how they show the returned messages and ask for choices.
+"""
+
+from __future__ import annotations
+from typing import List, Optional
+
+from gradquest.core.game_engine import GameEngine, EndGameState
+
+
+# Choices offered when the player works on the thesis
+THESIS_CHOICES = [
+    {"text": "Write the thesis and defend"},
+    {"text": "Stay for another year of research"},
+]
+
+DEFEND_THESIS = 0
+STAY_FOR_RESEARCH = 1
+
+# Actions that do not end with the month advancing (they advance it, or
+# end the game, themselves)
+SELF_TIMED_ACTIONS = frozenset(['advance', 'thesis'])
+
+
+class PlayerActions:
+    """
+    Applies player actions to a game.
+    
+    Each action is an _action_<key> method returning the messages that
+    describe what happened; subclasses may add actions or extend them.
+    Random outcomes are drawn from the engine's action stream, in the
+    same order for every frontend, so seeded games replay identically.
+    """
+    
+    def __init__(self, engine: GameEngine):
+        """
+        Bind the rules to a game.
+        
+        Args:
+            engine: The running game
+        """
+        self.engine = engine
+    
+    def available(self) -> List[str]:
+        """Get the keys of the actions available this month."""
+        vs = self.engine.variable_store
+        actions = []
+        
+        majors = vs.get_item_count('major_result')
+        if vs.get_item_count('idea') == 0:
+            actions.append('read')
+        else:
+            actions.append('work_idea')
+        if vs.get_item_count('preliminary_result') > 0:
+            actions.append('work_preliminary')
+        if majors > 0 and not vs.has_status('brokenEquipment'):
+            actions.append('work_figures')
+        if majors > 0 and vs.get_item_count('figure') >= 3:
+            actions.append('write_paper')
+        if vs.get_item_count('rejected_paper') > 0:
+            actions.append('revise')
+        if vs.get_item_count('paper') >= self.papers_required():
+            actions.append('thesis')
+        actions.append('slack')
+        
+        # Qual prep: available until September year 2 (when exam happens)
+        year = vs.get_var('year')
+        if year == 1 or (year == 2 and vs.get_var('month') < 9):
+            actions.append('quals')
+        
+        actions.append('advance')
+        return actions
+    
+    def perform(self, action: str, choice: Optional[int] = None) -> List[str]:
+        """
+        Apply a player action, then advance the month.
+        
+        Args:
+            action: Key of the action (see available)
+            choice: For 'thesis', the index of the chosen THESIS_CHOICES
+                option
+        
+        Returns:
+            Messages describing the outcome, in order
+        
+        Raises:
+            ValueError: If the action is unknown, or 'thesis' has no choice
+        """
+        handler = getattr(self, f'_action_{action}', None)
+        if handler is None:
+            raise ValueError(f"Unknown action: {action}")
+        if action == 'thesis':
+            if choice is None:
+                raise ValueError("The thesis action needs a choice")
+            messages = handler(choice)
+        else:
+            messages = handler()
+        if action not in SELF_TIMED_ACTIONS:
+            self.engine.advance_month()
+        return messages
+    
+    def papers_required(self) -> int:
+        """Get the number of papers needed to graduate."""
+        return int(self.engine.variable_store.get_var('rule.papersRequired'))
+    
+    def thesis_prompt(self) -> str:
+        """Get the message shown before the thesis choice."""
+        papers = self.engine.variable_store.get_item_count('paper')
+        return (
+            f"📚 You have {papers} papers published ({self.papers_required()} required).\n"
+            "It's time to write your thesis and defend!"
+        )
+    
+    # ==================== Actions ====================
+    
+    def _action_advance(self) -> List[str]:
+        self.engine.advance_month()
+        return []
+    
+    def _action_read(self) -> List[str]:
+        vs = self.engine.variable_store
+        messages = []
+        vs.add_var('player.readPapers', 1)
+        
+        # Chance to get idea (40%)
+        if self.engine._random() < 0.4:
+            vs.add_item('idea', 1)
+            messages.append("💡 After reading several papers, you have a new research idea!")
+        else:
+            messages.append("📚 You read some papers. No ideas yet, but you're learning...")
+        
+        # Lower chance for exhaustion (5%)
+        if self.engine._random() < 0.05:
+            vs.add_status('exhaustion')
+            messages.append("😫 All that reading has left you exhausted...")
+        return messages
+    
+    def _experiment_boost(self) -> float:
+        """Get the bonus added to the success chance of research work."""
+        return self.engine.variable_store.get_var('player.experimentBoost', 0)
+    
+    def _work_on(self, consume: str, produce: str, success_chance: float) -> List[str]:
+        """Convert one item into the next, helped by the experiment boost."""
+        vs = self.engine.variable_store
+        chance = min(1.0, success_chance + self._experiment_boost())
+        if self.engine._random() < chance:
+            vs.remove_item(consume, 1)
+            vs.add_item(produce, 1)
+            return [f"🎉 Success! You've made a {produce.replace('_', ' ').title()}!"]
+        return ["😔 You worked hard but didn't make progress this month..."]
+    
+    def _action_work_idea(self) -> List[str]:
+        return self._work_on('idea', 'preliminary_result', 0.45)
+    
+    def _action_work_preliminary(self) -> List[str]:
+        return self._work_on('preliminary_result', 'major_result', 0.35)
+    
+    def _action_work_figures(self) -> List[str]:
+        vs = self.engine.variable_store
+        messages = []
+        
+        # Figure creation (60%)
+        if self.engine._random() < 0.6:
+            vs.add_item('figure', 1)
+            messages.append(f"📊 You created a figure! ({vs.get_item_count('figure')}/3 needed for paper)")
+        else:
+            messages.append("😔 The figures didn't come out right. Try again next month...")
+        
+        # Random equipment breakdown (5%)
+        if self.engine._random() < 0.05:
+            vs.add_status('brokenEquipment')
+            messages.append("⚠️ Oh no! Your equipment just broke down!")
+        return messages
+    
+    def _publish(self, acceptance: float, accepted: str, rejected: str) -> List[str]:
+        """Review a submitted paper; once enough are out, see _papers_complete."""
+        vs = self.engine.variable_store
+        if self.engine._random() < acceptance:
+            vs.add_item('paper', 1)
+            papers = vs.get_item_count('paper')
+            required = self.papers_required()
+            if papers >= required:
+                self._papers_complete()
+            return [f"{accepted} ({papers}/{required} complete)"]
+        vs.add_item('rejected_paper', 1)
+        return [rejected]
+    
+    def _papers_complete(self) -> None:
+        """Queue ThesisReady once an accepted paper completes the set."""
+        if self.engine.event_engine:
+            self.engine.event_engine.trigger("ThesisReady", 1.0, 100)
+    
+    def _action_write_paper(self) -> List[str]:
+        vs = self.engine.variable_store
+        vs.remove_item('major_result', 1)
+        vs.remove_item('figure', 3)
+        return ["📝 You've submitted your paper for review..."] + self._publish(
+            0.6,
+            "🎉 ACCEPTED! Your paper has been published!",
+            "😢 REJECTED. The reviewers were not convinced... You can revise and resubmit.",
+        )
+    
+    def _action_revise(self) -> List[str]:
+        self.engine.variable_store.remove_item('rejected_paper', 1)
+        return ["✏️ You've revised your paper and resubmitted..."] + self._publish(
+            0.7,
+            "🎉 ACCEPTED on revision!",
+            "😢 Rejected again... Keep trying!",
+        )
+    
+    def _action_slack(self) -> List[str]:
+        vs = self.engine.variable_store
+        roll = self.engine._random
+        
+        # Recover morale
+        hope_gain = 5 + int(roll() * 10)
+        vs.add_var('player.hope', hope_gain)
+        messages = [f"😌 You took some time to relax. (+{hope_gain} morale)"]
+        
+        # Chance to recover from exhaustion (35%)
+        if vs.has_status('exhaustion') and roll() < 0.35:
+            vs.remove_status('exhaustion')
+            messages.append("💆 You're feeling refreshed! Exhaustion has faded.")
+        
+        # Chance to recover advisor relationship (25%)
+        if vs.has_status('unhappyAdvisor') and roll() < 0.25:
+            vs.remove_status('unhappyAdvisor')
+            messages.append("🤝 Your advisor seems to have cooled down.")
+        
+        # Smaller chance to anger advisor (10%)
+        if not vs.has_status('unhappyAdvisor') and roll() < 0.1:
+            vs.add_status('unhappyAdvisor')
+            messages.append("😠 Your advisor noticed you weren't working...")
+        return messages
+    
+    def _action_quals(self) -> List[str]:
+        vs = self.engine.variable_store
+        # V1.4: Randomize qual prep - adds 0-2 points per session
+        points_gained = int(self.engine._random() * 3)
+        vs.add_var('player.qualifyLevel', points_gained)
+        level = int(vs.get_var('player.qualifyLevel'))
+        
+        if points_gained == 0:
+            return [f"📖 You studied but didn't retain much. (Preparation: {level}/3)"]
+        if points_gained == 1:
+            return [f"📖 Decent study session! (Preparation: {level}/3)"]
+        return [f"📖 Great progress! (Preparation: {level}/3)"]
+    
+    def _action_thesis(self, choice: int) -> List[str]:
+        if choice == DEFEND_THESIS:
+            return self._defend()
+        return self._stay()
+    
+    def _defend(self) -> List[str]:
+        """Defend the thesis; both outcomes graduate, only the message differs."""
+        engine = self.engine
+        messages = ["📖 After months of writing, you're ready to defend..."]
+        
+        # 90% success rate for defense
+        if engine._random() < 0.9:
+            messages.append(
+                "🎓🎉 CONGRATULATIONS, DOCTOR! 🎉🎓\n\n"
+                "You've successfully defended your thesis and earned your PhD!"
+            )
+            end_state = EndGameState(True, "graduation", "You are now Dr. You!")
+        else:
+            messages.append("😅 The defense was rough, but you passed with major revisions!")
+            end_state = EndGameState(True, "graduation", "It wasn't easy, but you made it!")
+        engine._ended = True
+        engine._running = False
+        engine._end_state = end_state
+        return messages
+    
+    def _stay(self) -> List[str]:
+        """Stay for another year of research."""
+        self.engine.variable_store.add_var('player.hope', 20)
+        self.engine.advance_month()
+        return ["You decide to stay and do more research. Your advisor is pleased. (+20 morale)"]
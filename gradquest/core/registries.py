@@ -69,9 +69,25 @@ class BaseRegistry:
     
     def __init__(self):
         self._items: Dict[str, Any] = {}
+        self._frozen = False
+    
+    def freeze(self) -> None:
+        """Make the registry read-only, e.g. once it is shared by many games."""
+        self._frozen = True
+    
+    @property
+    def frozen(self) -> bool:
+        """Check if the registry is read-only."""
+        return self._frozen
+    
+    def _check_mutable(self) -> None:
+        """Raise if the registry has been frozen."""
+        if self._frozen:
+            raise RuntimeError(f"{type(self).__name__} is frozen")
     
     def register(self, item: Any) -> None:
         """Register an item by its id."""
+        self._check_mutable()
         self._items[item.id] = item
     
     def get(self, id: str) -> Optional[Any]:
@@ -92,6 +108,7 @@ class BaseRegistry:
     
     def clear(self) -> None:
         """Clear all registered items."""
+        self._check_mutable()
         self._items.clear()
     
     def count(self) -> int:
@@ -0,0 +1,172 @@
+"""
+RNG - Deterministic, splittable random streams.
+
+A RandomService derives independent named streams (event probability
+rolls, action outcomes, randi) from one seed, so consulting one stream
+never shifts the draws of another. Each stream is a counter-based
+SplitMix64 generator: draw n is a pure function of the stream's key and
+n, so a stream can jump to any position in O(1) and a game can be
+replayed from its seed and the stream offsets. split() derives
+independent services for parallel workers without coordination.
+"""
+
+from __future__ import annotations
+from typing import Dict, Optional, Tuple
+from functools import lru_cache
+import hashlib
+import random
+
+
+# SplitMix64 constants (shared with the per-lane streams in batch.py)
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+MIX_1 = 0xBF58476D1CE4E5B9
+MIX_2 = 0x94D049BB133111EB
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+# Standard stream names
+EVENT_STREAM = 'events'  # Trigger and event probability rolls
+ACTION_STREAM = 'actions'  # CoinFlip, Random and player action outcomes
+EXPRESSION_STREAM = 'randi'  # randi() in expressions
+
+_FLOAT_SCALE = 1.0 / (1 << 53)
+
+
+def mix64(x: int) -> int:
+    """Apply the SplitMix64 finalizer to a 64-bit integer."""
+    x &= MASK_64
+    x = ((x ^ (x >> 30)) * MIX_1) & MASK_64
+    x = ((x ^ (x >> 27)) * MIX_2) & MASK_64
+    return x ^ (x >> 31)
+
+
+@lru_cache(maxsize=None)
+def _name_hash(name: str) -> int:
+    """Hash a stream name to 64 bits, stable across processes."""
+    return int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class RandomStream:
+    """
+    A counter-based random stream.
+    
+    Draw n is mix64(key + n * GOLDEN_GAMMA), the same sequence a
+    BatchState lane with this key produces.
+    """
+    
+    __slots__ = ('key', 'counter')
+    
+    def __init__(self, key: int, counter: int = 0):
+        self.key = key & MASK_64
+        self.counter = counter
+    
+    def bits(self) -> int:
+        """Draw 64 random bits."""
+        x = (self.key + self.counter * GOLDEN_GAMMA) & MASK_64
+        self.counter += 1
+        x = ((x ^ (x >> 30)) * MIX_1) & MASK_64
+        x = ((x ^ (x >> 27)) * MIX_2) & MASK_64
+        return x ^ (x >> 31)
+    
+    def random(self) -> float:
+        """Draw a float in [0, 1)."""
+        x = (self.key + self.counter * GOLDEN_GAMMA) & MASK_64
+        self.counter += 1
+        x = ((x ^ (x >> 30)) * MIX_1) & MASK_64
+        x = ((x ^ (x >> 27)) * MIX_2) & MASK_64
+        return ((x ^ (x >> 31)) >> 11) * _FLOAT_SCALE
+    
+    def skip(self, draws: int) -> None:
+        """Advance past a number of draws in O(1)."""
+        self.counter += draws
+    
+    def copy(self) -> RandomStream:
+        """Copy the stream, including its position."""
+        return RandomStream(self.key, self.counter)
+
+
+class RandomService:
+    """
+    Named random streams derived from one seed.
+    
+    Streams are created on first use and keep their identity when the
+    service is reseeded, so callers may hold on to a stream (or its
+    bound random method).
+    """
+    
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Create a service.
+        
+        Args:
+            seed: Seed for every stream (a random one if None)
+        """
+        self._streams: Dict[str, RandomStream] = {}
+        self.reseed(seed)
+    
+    def reseed(self, seed: Optional[int] = None) -> None:
+        """Rekey every stream from a new seed (a random one if None) and rewind it."""
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.key = mix64(self.seed)
+        for name, stream in self._streams.items():
+            stream.key = self._stream_key(name)
+            stream.counter = 0
+    
+    def _stream_key(self, name: str) -> int:
+        return mix64(self.key ^ _name_hash(name))
+    
+    def stream(self, name: str) -> RandomStream:
+        """Get a named stream, creating it if needed."""
+        stream = self._streams.get(name)
+        if stream is None:
+            stream = self._streams[name] = RandomStream(self._stream_key(name))
+        return stream
+    
+    def random(self, name: str) -> float:
+        """Draw a float in [0, 1) from a named stream."""
+        return self.stream(name).random()
+    
+    # ==================== Positions ====================
+    
+    def offsets(self) -> Dict[str, int]:
+        """Get the number of draws taken from each stream."""
+        return {name: stream.counter for name, stream in self._streams.items()}
+    
+    def seek(self, offsets: Dict[str, int]) -> None:
+        """Move streams to the given positions (others are left alone)."""
+        for name, counter in offsets.items():
+            self.stream(name).counter = counter
+    
+    def getstate(self) -> Tuple[int, Dict[str, int]]:
+        """Return (seed, stream offsets), enough to replay from this point."""
+        return self.seed, self.offsets()
+    
+    def setstate(self, state: Tuple[int, Dict[str, int]]) -> None:
+        """Restore a state from getstate()."""
+        seed, offsets = state
+        self.reseed(seed)
+        self.seek(offsets)
+    
+    # ==================== Splitting ====================
+    
+    def split(self, index: int) -> RandomService:
+        """
+        Derive an independent service, e.g. for a worker or a game.
+        
+        The same index always gives the same service, and different
+        indexes give unrelated streams.
+        
+        Args:
+            index: Which child service (0, 1, 2, ...)
+        
+        Returns:
+            A new service seeded from this one and the index
+        """
+        return RandomService(mix64(self.key + (index + 1) * GOLDEN_GAMMA))
+    
+    def fork(self) -> RandomService:
+        """Copy the service with every stream at its current position."""
+        clone = RandomService.__new__(RandomService)
+        clone.seed = self.seed
+        clone.key = self.key
+        clone._streams = {name: stream.copy() for name, stream in self._streams.items()}
+        return clone
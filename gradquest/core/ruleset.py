@@ -0,0 +1,115 @@
+"""
+Ruleset - A loaded ruleset shared by any number of games.
+
+Loading a ruleset reads and parses every YAML file and builds the
+registries, event definitions and dispatch tables. A Ruleset does that
+once and keeps the result in a template GameEngine that is never played;
+each new game is a copy-on-write fork of the template, so it shares all
+definitions and only owns its mutable state (variables, active
+statuses, occurred/disabled events, trigger queue, random streams).
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Type
+import threading
+
+from gradquest.core.game_engine import GameEngine, DEFAULT_DATA_PATH
+
+
+class Ruleset:
+    """
+    Immutable ruleset template for cheap per-game engines.
+    
+    The template's registries are frozen; event definitions and compiled
+    dispatch tables are shared with every game. A game compiles its own
+    action steps and expression evaluators on first use, since those are
+    bound to its state.
+    """
+    
+    def __init__(self, template: GameEngine):
+        """
+        Wrap an engine that has loaded its game data.
+        
+        The engine becomes the template and must not be played itself;
+        register functions on it before load_game_data.
+        
+        Args:
+            template: The loaded engine
+        """
+        self._template = template
+        self.data_path = template.data_path
+        self.attribute_registry = template.attribute_registry
+        self.item_registry = template.item_registry
+        self.status_registry = template.status_registry
+        for registry in (self.attribute_registry, self.item_registry, self.status_registry):
+            registry.freeze()
+    
+    @classmethod
+    def load(cls, data_path: Optional[Path] = None, engine_class: Type[GameEngine] = GameEngine,
+             use_cache: bool = True) -> Ruleset:
+        """
+        Load a ruleset from its YAML files.
+        
+        Args:
+            data_path: Ruleset directory (the default ruleset if None)
+            engine_class: GameEngine subclass that new games are made of
+            use_cache: Read and write the ruleset's on-disk cache (see
+                ruleset_cache)
+        
+        Returns:
+            The loaded ruleset
+        """
+        template = engine_class(data_path)
+        template.load_game_data(use_cache=use_cache)
+        return cls(template)
+    
+    @classmethod
+    def shared(cls, data_path: Optional[Path] = None, engine_class: Type[GameEngine] = GameEngine,
+               use_cache: bool = True) -> Ruleset:
+        """
+        Get the process-wide ruleset for a directory, loading it on first use.
+        
+        Args:
+            data_path: Ruleset directory (the default ruleset if None)
+            engine_class: GameEngine subclass that new games are made of
+            use_cache: Read and write the ruleset's on-disk cache when
+                loading (see ruleset_cache)
+        
+        Returns:
+            The shared ruleset
+        """
+        key = (Path(data_path or DEFAULT_DATA_PATH).resolve(), engine_class)
+        ruleset = _SHARED.get(key)
+        if ruleset is None:
+            # Concurrent first calls (e.g. web worker threads) load once
+            with _SHARED_LOCK:
+                ruleset = _SHARED.get(key)
+                if ruleset is None:
+                    ruleset = _SHARED[key] = cls.load(data_path, engine_class, use_cache)
+        return ruleset
+    
+    def new_game(self, seed: Optional[int] = None) -> GameEngine:
+        """
+        Create an engine for a new game of this ruleset.
+        
+        The engine is ready to start(); it has its own random streams,
+        seeded from seed (or randomly if None).
+        
+        Args:
+            seed: Random seed for the game
+        
+        Returns:
+            A new, unstarted engine
+        """
+        engine = self._template.fork()
+        if seed is not None:
+            engine.set_random_seed(seed)
+        else:
+            engine.rng.reseed()
+        return engine
+
+
+# Rulesets loaded by Ruleset.shared, by (resolved directory, engine class)
+_SHARED: Dict[Tuple[Path, Type[GameEngine]], Ruleset] = {}
+_SHARED_LOCK = threading.Lock()
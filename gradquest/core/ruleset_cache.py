@@ -0,0 +1,179 @@
+"""
+Ruleset cache - Parsed ruleset files kept in one binary file.
+
+Parsing the ruleset's YAML is most of the cost of loading a game. The
+parsed documents of every ruleset file are pickled into a single cache
+file next to the ruleset directory (data/rulesets/default.gqcache for
+data/rulesets/default). The cache records each source file's size,
+modification time and content hash: when the sizes and times match, the
+cache is used without reading the sources; when only the times changed,
+the hashes decide; otherwise the files are re-parsed (with libyaml's
+CSafeLoader when PyYAML was built with it) and the cache is rewritten.
+
+Rulesets (and with them the web app and headless workers) and the
+command-line game read and write the cache; a bare
+GameEngine.load_game_data only does when asked to. "gradquest compile"
+writes it ahead of time.
+
+The cache is a pickle, so it is trusted like the ruleset directory it
+sits next to.
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+import hashlib
+import os
+import pickle
+import warnings
+
+
+# Bumped whenever the cached layout or the parsing of the sources changes
+CACHE_VERSION = 1
+
+CACHE_SUFFIX = '.gqcache'
+
+# Files that make up a ruleset
+RULESET_FILES = ('attributes.yaml', 'items.yaml', 'status.yaml', 'events.yaml', 'lang.yaml')
+
+
+def parse_yaml(source: str) -> Any:
+    """
+    Parse a YAML document with the fastest available safe loader.
+    
+    libyaml's CSafeLoader accepts the same documents as SafeLoader and is
+    about ten times faster. PyYAML is imported here rather than at module
+    level, so starting from a current cache does not import it at all.
+    """
+    import yaml
+    return yaml.load(source, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+
+def read_yaml(path: Path) -> Any:
+    """Parse a YAML file with the fastest available safe loader."""
+    return parse_yaml(Path(path).read_text(encoding='utf-8'))
+
+
+def cache_path(data_path: Path) -> Path:
+    """Get the cache file of a ruleset directory."""
+    data_path = Path(data_path)
+    return data_path.with_name(data_path.name + CACHE_SUFFIX)
+
+
+# (size, mtime in ns) of a source file, or None if it does not exist
+_Stat = Optional[Tuple[int, int]]
+
+
+def _stat(path: Path) -> _Stat:
+    try:
+        result = path.stat()
+    except FileNotFoundError:
+        return None
+    return result.st_size, result.st_mtime_ns
+
+
+def _hash(source: Optional[bytes]) -> Optional[str]:
+    return hashlib.blake2b(source, digest_size=16).hexdigest() if source is not None else None
+
+
+def _read_bytes(path: Path) -> Optional[bytes]:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _read_cache(path: Path) -> Optional[Dict[str, Any]]:
+    """Read a cache file, or None if it is missing, unreadable or outdated."""
+    try:
+        with open(path, 'rb') as f:
+            cache = pickle.load(f)
+    except Exception:
+        # A corrupt pickle can fail with almost any exception; rebuild
+        return None
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        return None
+    if set(cache.get('sources', ())) != set(RULESET_FILES):
+        return None
+    return cache
+
+
+def _write_cache(path: Path, cache: Dict[str, Any], strict: bool = False) -> None:
+    """Write a cache file atomically; unwritable locations raise if strict, else warn."""
+    temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, path)
+    except OSError as e:
+        try:
+            temp.unlink()
+        except OSError:
+            pass
+        if strict:
+            raise
+        warnings.warn(f"Could not write ruleset cache {path}: {e}", RuntimeWarning, stacklevel=3)
+
+
+def compile_ruleset(data_path: Path, strict: bool = False) -> Dict[str, Any]:
+    """
+    Parse every ruleset file and write the cache.
+    
+    Args:
+        data_path: Ruleset directory
+        strict: Raise OSError if the cache cannot be written (it is
+            otherwise skipped, e.g. for a read-only install)
+    
+    Returns:
+        Parsed documents by file name (None for missing or empty files)
+    """
+    data_path = Path(data_path)
+    sources = {}
+    documents = {}
+    for name in RULESET_FILES:
+        # Stat before reading, so an edit in between fails the next check
+        path = data_path / name
+        stat = _stat(path)
+        source = _read_bytes(path)
+        sources[name] = (stat, _hash(source))
+        documents[name] = parse_yaml(source.decode('utf-8')) if source is not None else None
+    _write_cache(cache_path(data_path), {
+        'version': CACHE_VERSION,
+        'sources': sources,
+        'documents': documents,
+    }, strict)
+    return documents
+
+
+def load_ruleset_data(data_path: Path, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Get the parsed documents of a ruleset, from the cache when it is current.
+    
+    Args:
+        data_path: Ruleset directory
+        use_cache: Whether to read and write the cache
+    
+    Returns:
+        Parsed documents by file name (None for missing or empty files)
+    """
+    data_path = Path(data_path)
+    if not use_cache:
+        return {name: read_yaml(data_path / name) if (data_path / name).exists() else None
+                for name in RULESET_FILES}
+    
+    cache = _read_cache(cache_path(data_path))
+    if cache is None:
+        return compile_ruleset(data_path)
+    
+    sources = cache['sources']
+    stats = {name: _stat(data_path / name) for name in RULESET_FILES}
+    if all(stats[name] == sources[name][0] for name in RULESET_FILES):
+        return cache['documents']
+    
+    # Touched files (e.g. after a checkout) may still have the same content
+    for name in RULESET_FILES:
+        if stats[name] != sources[name][0] and _hash(_read_bytes(data_path / name)) != sources[name][1]:
+            return compile_ruleset(data_path)
+    cache['sources'] = {name: (stats[name], sources[name][1]) for name in RULESET_FILES}
+    _write_cache(cache_path(data_path), cache)
+    return cache['documents']
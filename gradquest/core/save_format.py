@@ -0,0 +1,230 @@
+"""
+Binary save format for complete game state.
+
+A save holds the VariableStore (variables, limits, items, statuses),
+active statuses with their remaining durations, the EventEngine's
+occurred and disabled events and queued triggers, the game flags and end
+state, and the random service's seed and stream offsets. Every name is
+written once to a key table and referenced by index. The body can be
+zlib-compressed. An event paused for the player is not part of a save;
+a loaded game continues with the queued triggers.
+
+All sizes come first, so the rest of the body is read with a single
+struct whose format depends only on them; those structs are cached, and
+games of one ruleset mostly reuse a handful.
+
+Layout (little-endian):
+    header   magic b'GQSV', format version (B), flags (B)
+    counts   size of the key table and of each section (_COUNTS)
+    keys     the key table: UTF-8 names separated by NUL bytes
+    values   every section's key indexes and values (see _Layout)
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from typing import Dict, List, Any, TYPE_CHECKING
+import struct
+import zlib
+
+from gradquest.core.event_engine import TriggerEntry
+from gradquest.core.game_engine import EndGameState
+from gradquest.core.rng import MASK_64
+
+if TYPE_CHECKING:
+    from gradquest.core.game_engine import GameEngine
+
+
+MAGIC = b'GQSV'
+FORMAT_VERSION = 3
+
+# Header flags
+FLAG_ZLIB = 0x01
+
+_HEADER = struct.Struct('<4sBB')
+
+# Key table size in bytes, then the entry count of variables, limits,
+# items, statuses, active statuses, occurred events, disabled events,
+# triggers and random streams, then whether there is an end state
+_COUNTS = struct.Struct('<10IB')
+
+# Most keys an index can address
+_MAX_KEYS = 0xFFFF
+
+_SEPARATOR = '\0'
+
+
+class _Layout:
+    """The values struct of one set of counts, and where each field starts."""
+    
+    def __init__(self, variables: int, limits: int, items: int, statuses: int, active: int,
+                 occurred: int, disabled: int, triggers: int, streams: int, has_end_state: int):
+        fields = [
+            (variables, 'H'), (variables, 'd'),
+            (limits, 'H'), (limits, 'd'), (limits, 'd'),
+            (items, 'H'), (items, 'q'),
+            (statuses, 'H'),
+            (active, 'H'), (active, 'd'),
+            (occurred, 'H'),
+            (disabled, 'H'),
+            (triggers, 'H'), (triggers, 'd'), (triggers, 'q'), (triggers, 'Q'),
+            # Sequence counter, running, ended
+            (1, 'Q'), (1, 'B'), (1, 'B'),
+            # End state: won, reason key, message key
+            (has_end_state, 'B'), (has_end_state, 'H'), (has_end_state, 'H'),
+            # Random seed, then stream keys and offsets
+            (1, 'Q'), (streams, 'H'), (streams, 'Q'),
+        ]
+        self.struct = struct.Struct('<' + ''.join(f'{count}{code}' for count, code in fields))
+        self.slices = []
+        start = 0
+        for count, _ in fields:
+            self.slices.append(slice(start, start + count))
+            start += count
+
+
+@lru_cache(maxsize=256)
+def _layout(*counts: int) -> _Layout:
+    return _Layout(*counts)
+
+
+# ==================== Writing ====================
+
+class _KeyTable:
+    """Interns strings to indexes while a save is written."""
+    
+    def __init__(self):
+        self.keys: List[str] = []
+        self.index: Dict[str, int] = {}
+    
+    def __call__(self, key: str) -> int:
+        index = self.index.get(key)
+        if index is None:
+            index = len(self.keys)
+            if index > _MAX_KEYS:
+                raise ValueError("Too many distinct keys for the binary save format")
+            if _SEPARATOR in key:
+                raise ValueError(f"Key {key!r} contains a NUL character")
+            self.index[key] = index
+            self.keys.append(key)
+        return index
+    
+    def pack(self) -> bytes:
+        return _SEPARATOR.join(self.keys).encode('utf-8')
+
+
+def dumps(engine: GameEngine, compress: bool = False) -> bytes:
+    """
+    Serialize the full state of a game.
+    
+    Args:
+        engine: The game to save
+        compress: Whether to zlib-compress the body
+    
+    Returns:
+        The encoded save
+    """
+    table = _KeyTable()
+    variables, items, statuses, limits = engine.variable_store._export_state()
+    items = {name: count for name, count in items.items() if count}
+    remaining, running, ended, end_state = engine._export_state()
+    if engine.event_engine:
+        occurred, disabled, queue, sequence_counter = engine.event_engine._export_state()
+    else:
+        occurred, disabled, queue, sequence_counter = (), (), [], 0
+    seed, offsets = engine.rng.getstate()
+    
+    values: List[Any] = []
+    values += map(table, variables)
+    values += variables.values()
+    values += map(table, limits)
+    values += (low for low, _ in limits.values())
+    values += (high for _, high in limits.values())
+    values += map(table, items)
+    values += items.values()
+    values += map(table, statuses)
+    values += map(table, remaining)
+    values += remaining.values()
+    values += map(table, sorted(occurred))
+    values += map(table, sorted(disabled))
+    values += (table(entry.trigger_id) for entry in queue)
+    values += (entry.probability for entry in queue)
+    values += (entry.priority for entry in queue)
+    values += (entry.sequence for entry in queue)
+    values += (sequence_counter, running, ended)
+    if end_state is not None:
+        values += (end_state.won, table(end_state.reason), table(end_state.message))
+    values.append(seed & MASK_64)
+    values += map(table, offsets)
+    values += offsets.values()
+    
+    keys = table.pack()
+    counts = (len(variables), len(limits), len(items), len(statuses), len(remaining),
+              len(occurred), len(disabled), len(queue), len(offsets), int(end_state is not None))
+    body = _COUNTS.pack(len(keys), *counts) + keys + _layout(*counts).struct.pack(*values)
+    flags = 0
+    if compress:
+        body = zlib.compress(body)
+        flags |= FLAG_ZLIB
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, flags) + body
+
+
+# ==================== Reading ====================
+
+def loads(engine: GameEngine, data: bytes) -> None:
+    """
+    Restore a game saved with dumps().
+    
+    The engine must have loaded the same ruleset (load_game_data), since
+    active statuses are rebuilt from its status registry.
+    
+    Args:
+        engine: The game to restore into
+        data: An encoded save
+    
+    Raises:
+        ValueError: If the data is not a supported save
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Save data is truncated")
+    magic, version, flags = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a GradQuest save")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported save format version: {version}")
+    
+    try:
+        body = data[_HEADER.size:]
+        if flags & FLAG_ZLIB:
+            body = zlib.decompress(body)
+        key_size, *counts = _COUNTS.unpack_from(body)
+        start = _COUNTS.size + key_size
+        table = body[_COUNTS.size:start].decode('utf-8').split(_SEPARATOR)
+        layout = _layout(*counts)
+        values = layout.struct.unpack_from(body, start)
+        
+        (variable_keys, variable_values, limit_keys, lows, highs, item_keys, item_counts,
+         status_keys, active_keys, durations, occurred_keys, disabled_keys,
+         trigger_keys, probabilities, priorities, sequences, (sequence_counter,),
+         (running,), (ended,), won, reason, message, (seed,), stream_keys,
+         stream_offsets) = [values[part] for part in layout.slices]
+        
+        name = table.__getitem__
+        variables = dict(zip(map(name, variable_keys), variable_values))
+        limits = dict(zip(map(name, limit_keys), zip(lows, highs)))
+        items = dict(zip(map(name, item_keys), item_counts))
+        statuses = set(map(name, status_keys))
+        remaining = dict(zip(map(name, active_keys), durations))
+        occurred = set(map(name, occurred_keys))
+        disabled = set(map(name, disabled_keys))
+        # Saved in heap order, so the list is already a valid heap
+        triggers = list(map(TriggerEntry, map(name, trigger_keys), probabilities, priorities, sequences))
+        end_state = EndGameState(bool(won[0]), name(reason[0]), name(message[0])) if won else None
+        offsets = dict(zip(map(name, stream_keys), stream_offsets))
+    except (struct.error, zlib.error, IndexError, ValueError) as e:
+        raise ValueError(f"Save data is corrupt: {e}") from e
+    
+    engine.variable_store.load_state(variables, items, statuses, limits)
+    engine._import_state(remaining, bool(running), bool(ended), end_state)
+    if engine.event_engine:
+        engine.event_engine._import_state(occurred, disabled, triggers, sequence_counter)
+    engine.rng.setstate((seed, offsets))
@@ -0,0 +1,367 @@
+"""
+SlotVariableStore - Array-backed game state with interned names.
+
+Variable, item and status names are interned to integer slots in a
+SlotLayout shared by every game of a ruleset. Each store then keeps its
+values in flat arrays indexed by slot, so a game costs a few contiguous
+buffers instead of several string-keyed dicts, and a snapshot is a copy
+of those buffers. The string API of VariableStore is kept as a facade.
+"""
+
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Set, Tuple, List, Optional, Iterable
+
+from gradquest.core.variable_store import VariableStore
+
+
+class SlotTable:
+    """Interns names to consecutive integer slots."""
+    
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        for name in names:
+            self.slot(name)
+    
+    def slot(self, name: str) -> int:
+        """Get the slot for a name, assigning the next free one if new."""
+        slot = self.index.get(name)
+        if slot is None:
+            slot = len(self.names)
+            self.index[name] = slot
+            self.names.append(name)
+        return slot
+    
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class SlotLayout:
+    """
+    Slot tables for variables, items and statuses.
+    
+    A layout is usually built once from the ruleset's registries and
+    shared by all stores; names first seen at runtime are appended.
+    """
+    
+    def __init__(
+        self,
+        variables: Iterable[str] = (),
+        items: Iterable[str] = (),
+        statuses: Iterable[str] = (),
+    ):
+        self.variables = SlotTable(variables)
+        self.items = SlotTable(items)
+        self.statuses = SlotTable(statuses)
+    
+    def intern(
+        self,
+        variables: Iterable[str] = (),
+        items: Iterable[str] = (),
+        statuses: Iterable[str] = (),
+    ) -> None:
+        """Assign slots to names ahead of time."""
+        for name in variables:
+            self.variables.slot(name)
+        for name in items:
+            self.items.slot(name)
+        for name in statuses:
+            self.statuses.slot(name)
+
+
+@dataclass(frozen=True)
+class SlotSnapshot:
+    """A copy of a SlotVariableStore's buffers (see snapshot/restore)."""
+    values: array
+    present: bytes
+    limited: bytes
+    minimums: array
+    maximums: array
+    items: array
+    status_bits: int
+
+
+class SlotVariableStore(VariableStore):
+    """
+    VariableStore backed by slot-indexed arrays.
+    
+    Storage:
+    - Variables: array('d') of values plus a presence bytearray
+    - Limits: parallel min/max arrays plus a bytearray of limited slots
+    - Items: array('q') of counts
+    - Statuses: an int used as a bitset
+    
+    Values are stored as floats. Change tracking, callbacks, forking and
+    serialization behave as in VariableStore.
+    """
+    
+    _COW_FIELDS = VariableStore._COW_FIELDS + (
+        '_values', '_present', '_limited', '_minimums', '_maximums', '_counts')
+    
+    def __init__(self, layout: Optional[SlotLayout] = None):
+        super().__init__()
+        self.layout = layout or SlotLayout()
+        self._var_index = self.layout.variables.index
+        self._item_index = self.layout.items.index
+        self._status_index = self.layout.statuses.index
+        
+        self._values = array('d')
+        self._present = bytearray()
+        self._limited = bytearray()
+        self._minimums = array('d')
+        self._maximums = array('d')
+        self._counts = array('q')
+        self._status_bits = 0
+        self._grow()
+    
+    def _grow(self) -> None:
+        """Extend the buffers to cover every slot in the layout."""
+        if self._shared:
+            for name in self._COW_FIELDS:
+                self._own(name)
+        
+        missing = len(self.layout.variables) - len(self._values)
+        if missing > 0:
+            self._values.extend([0.0] * missing)
+            self._present.extend(bytes(missing))
+            self._limited.extend(bytes(missing))
+            self._minimums.extend([0.0] * missing)
+            self._maximums.extend([0.0] * missing)
+        missing = len(self.layout.items) - len(self._counts)
+        if missing > 0:
+            self._counts.extend([0] * missing)
+    
+    def _var_slot(self, name: str) -> int:
+        """Get a variable's slot, interning the name if needed."""
+        slot = self._var_index.get(name)
+        if slot is None:
+            slot = self.layout.variables.slot(name)
+        if slot >= len(self._values):
+            self._grow()
+        return slot
+    
+    def _item_slot(self, name: str) -> int:
+        """Get an item's slot, interning the name if needed."""
+        slot = self._item_index.get(name)
+        if slot is None:
+            slot = self.layout.items.slot(name)
+        if slot >= len(self._counts):
+            self._grow()
+        return slot
+    
+    # ==================== Variable Management ====================
+    
+    def set_var(self, name: str, value: float) -> None:
+        """Set a variable value with automatic clamping."""
+        slot = self._var_slot(name)
+        existed = self._present[slot]
+        old_value = self._values[slot] if existed else 0.0
+        
+        if self._limited[slot]:
+            value = max(self._minimums[slot], min(self._maximums[slot], value))
+        
+        if self._shared:
+            self._own('_values')
+            self._own('_present')
+        self._values[slot] = value
+        self._present[slot] = 1
+        
+        if old_value != value or not existed:
+            self._mark_var(name, old_value, self._values[slot], bool(existed))
+    
+    def get_var(self, name: str, default: float = 0.0) -> float:
+        """Get a variable value, returning default if not set."""
+        slot = self._var_index.get(name)
+        if slot is not None and slot < len(self._present) and self._present[slot]:
+            return self._values[slot]
+        return default
+    
+    def has_var(self, name: str) -> bool:
+        """Check if a variable exists."""
+        slot = self._var_index.get(name)
+        return slot is not None and slot < len(self._present) and bool(self._present[slot])
+    
+    def _delete_var(self, name: str) -> None:
+        """Remove a variable entirely (used to undo its creation)."""
+        slot = self._var_index.get(name)
+        if slot is not None and slot < len(self._present) and self._present[slot]:
+            if self._shared:
+                self._own('_present')
+            self._present[slot] = 0
+            self._mark_var(name, self._values[slot], 0.0)
+    
+    def set_var_limits(self, name: str, min_val: float, max_val: float) -> None:
+        """Set min/max limits for a variable."""
+        slot = self._var_slot(name)
+        if self._shared:
+            self._own('_minimums')
+            self._own('_maximums')
+            self._own('_limited')
+        self._minimums[slot] = min_val
+        self._maximums[slot] = max_val
+        self._limited[slot] = 1
+        self._mark_limits()
+        
+        # Re-clamp existing value if present
+        if self._present[slot]:
+            self.set_var(name, self._values[slot])
+    
+    def get_all_vars(self) -> Dict[str, float]:
+        """Get a copy of all variables."""
+        names = self.layout.variables.names
+        return {names[slot]: self._values[slot] for slot, present in enumerate(self._present) if present}
+    
+    # ==================== Item Management ====================
+    
+    def add_item(self, name: str, count: int = 1) -> None:
+        """Add items to inventory."""
+        slot = self._item_slot(name)
+        old_count = self._counts[slot]
+        new_count = max(0, old_count + count)
+        if self._shared:
+            self._own('_counts')
+        self._counts[slot] = new_count
+        
+        if old_count != new_count:
+            self._mark_item(name, old_count, new_count)
+    
+    def get_item_count(self, name: str) -> int:
+        """Get count of an item."""
+        slot = self._item_index.get(name)
+        if slot is not None and slot < len(self._counts):
+            return self._counts[slot]
+        return 0
+    
+    def clear_items(self, name: str) -> None:
+        """Remove all of a specific item."""
+        slot = self._item_slot(name)
+        old_count = self._counts[slot]
+        if self._shared:
+            self._own('_counts')
+        self._counts[slot] = 0
+        
+        if old_count != 0:
+            self._mark_item(name, old_count, 0)
+    
+    def get_all_items(self) -> Dict[str, int]:
+        """Get a copy of all items with non-zero counts."""
+        names = self.layout.items.names
+        return {names[slot]: count for slot, count in enumerate(self._counts) if count > 0}
+    
+    def _delete_item(self, name: str) -> None:
+        """Remove an item entirely (used to undo its creation)."""
+        self.clear_items(name)
+    
+    # ==================== Status Management ====================
+    
+    def add_status(self, name: str) -> None:
+        """Add a status effect."""
+        bit = 1 << self.layout.statuses.slot(name)
+        if not self._status_bits & bit:
+            self._status_bits |= bit
+            self._mark_status(name, True)
+    
+    def remove_status(self, name: str) -> None:
+        """Remove a status effect."""
+        slot = self._status_index.get(name)
+        if slot is not None and self._status_bits >> slot & 1:
+            self._status_bits &= ~(1 << slot)
+            self._mark_status(name, False)
+    
+    def has_status(self, name: str) -> bool:
+        """Check if a status effect is active."""
+        slot = self._status_index.get(name)
+        return slot is not None and bool(self._status_bits >> slot & 1)
+    
+    def get_all_status(self) -> Set[str]:
+        """Get a copy of all active status effects."""
+        names = self.layout.statuses.names
+        bits = self._status_bits
+        return {names[slot] for slot in range(bits.bit_length()) if bits >> slot & 1}
+    
+    # ==================== Snapshots ====================
+    
+    def snapshot(self) -> SlotSnapshot:
+        """Copy the current state; each buffer is copied in one operation."""
+        return SlotSnapshot(
+            values=array('d', self._values),
+            present=bytes(self._present),
+            limited=bytes(self._limited),
+            minimums=array('d', self._minimums),
+            maximums=array('d', self._maximums),
+            items=array('q', self._counts),
+            status_bits=self._status_bits,
+        )
+    
+    def restore(self, snapshot: SlotSnapshot) -> None:
+        """Return to a state taken with snapshot() on a store with the same layout."""
+        self._journal_state()
+        self._values = array('d', snapshot.values)
+        self._present = bytearray(snapshot.present)
+        self._limited = bytearray(snapshot.limited)
+        self._minimums = array('d', snapshot.minimums)
+        self._maximums = array('d', snapshot.maximums)
+        self._counts = array('q', snapshot.items)
+        self._status_bits = snapshot.status_bits
+        self._unshare('_values', '_present', '_limited', '_minimums', '_maximums', '_counts')
+        self._grow()
+        self._mark_reset()
+    
+    # ==================== Serialization ====================
+    
+    def _export_state(self) -> Tuple[Dict[str, float], Dict[str, int], Set[str], Dict[str, Tuple[float, float]]]:
+        """Return (variables, items, statuses, limits) for serialization."""
+        names = self.layout.variables.names
+        limits = {
+            names[slot]: (self._minimums[slot], self._maximums[slot])
+            for slot, limited in enumerate(self._limited) if limited
+        }
+        return self.get_all_vars(), self.get_all_items(), self.get_all_status(), limits
+    
+    def _import_state(
+        self,
+        variables: Dict[str, float],
+        items: Dict[str, int],
+        status: Set[str],
+        limits: Dict[str, Tuple[float, float]],
+    ) -> None:
+        """Replace the whole state without recording per-key changes."""
+        self._clear_buffers()
+        if self._shared:
+            self._own('_minimums')
+            self._own('_maximums')
+        for name, (low, high) in limits.items():
+            slot = self._var_slot(name)
+            self._minimums[slot] = low
+            self._maximums[slot] = high
+            self._limited[slot] = 1
+        for name, value in variables.items():
+            slot = self._var_slot(name)
+            self._values[slot] = value
+            self._present[slot] = 1
+        for name, count in items.items():
+            self._counts[self._item_slot(name)] = count
+        for name in status:
+            self._status_bits |= 1 << self.layout.statuses.slot(name)
+    
+    def _clear_buffers(self, keep_limits: bool = False) -> None:
+        """Zero all values, counts and statuses (and limits unless kept)."""
+        size = len(self._values)
+        self._values = array('d', bytes(8 * size))
+        self._present = bytearray(size)
+        if not keep_limits:
+            self._limited = bytearray(size)
+        self._counts = array('q', bytes(8 * len(self._counts)))
+        self._status_bits = 0
+        self._unshare('_values', '_present', '_counts')
+        if not keep_limits:
+            self._unshare('_limited')
+    
+    def reset(self) -> None:
+        """Reset all state to initial values."""
+        self._journal_state()
+        self._clear_buffers(keep_limits=True)
+        self._mark_reset()
+        # Keep limits as they define the game rules
@@ -6,12 +6,20 @@ with clamping, change observation, and JSON serialization support.
 """
 
 from __future__ import annotations
-from typing import Dict, Set, Tuple, Callable, Optional, Any
+from typing import Dict, Set, Tuple, List, Callable, Optional, Any, Iterable, Iterator, TYPE_CHECKING
+from contextlib import contextmanager
+import copy
 import json
 import math
 
+from gradquest.core.cow import CopyOnWrite
 
-class VariableStore:
+if TYPE_CHECKING:
+    from gradquest.core.change_bus import ChangeBus
+    from gradquest.core.expression_parser import ReadSet
+
+
+class VariableStore(CopyOnWrite):
     """
     Centralized storage for all game state variables.
     
@@ -19,10 +27,16 @@ class VariableStore:
     - Numeric variables with min/max clamping
     - Item counting (inventory)
     - Status effect tracking
-    - Observable change events
+    - Observable change events (single callbacks or a ChangeBus)
+    - Per-key change versions for dirty checking
+    - O(1) copy-on-write forking
+    - Nested transactions with an undo journal
     - JSON serialization for save/load
     """
     
+    _COW_FIELDS = ('_vars', '_limits', '_items', '_status',
+                   '_var_versions', '_item_versions', '_status_versions')
+    
     def __init__(self):
         # Numeric variables (e.g., player.hope, year, month)
         self._vars: Dict[str, float] = {}
@@ -44,11 +58,33 @@ class VariableStore:
         
         # Status change callback
         self._on_status_change: Optional[Callable[[str, bool], None]] = None
+        
+        # Change bus for any number of (batched) subscribers
+        self.bus: Optional[ChangeBus] = None
+        
+        # Change versions: a counter bumped on every change, and the
+        # version at which each key last changed
+        self._version = 0
+        self._reset_version = 0  # Version of the last bulk reset/load
+        self._limits_version = 0  # Version of the last limits change
+        self._var_versions: Dict[str, int] = {}
+        self._item_versions: Dict[str, int] = {}
+        self._status_versions: Dict[str, int] = {}
+        
+        # (source version, own version) after the last applied delta: the
+        # store mirrors that source version until it changes again
+        self._delta_source: Optional[Tuple[int, int]] = None
+        
+        # Undo journal of the open transactions (None when there are none)
+        # and the journal length at which each transaction began
+        self._journal: Optional[List[Tuple[Any, ...]]] = None
+        self._tx_marks: List[int] = []
     
     # ==================== Variable Management ====================
     
     def set_var(self, name: str, value: float) -> None:
         """Set a variable value with automatic clamping."""
+        existed = name in self._vars
         old_value = self._vars.get(name, 0.0)
         
         # Apply limits if defined
@@ -56,11 +92,12 @@ class VariableStore:
             low, high = self._limits[name]
             value = max(low, min(high, value))
         
+        if self._shared:
+            self._own('_vars')
         self._vars[name] = value
         
-        # Notify change
-        if self._on_change and old_value != value:
-            self._on_change(name, old_value, value)
+        if old_value != value or not existed:
+            self._mark_var(name, old_value, value, existed)
     
     def get_var(self, name: str, default: float = 0.0) -> float:
         """Get a variable value, returning default if not set."""
@@ -72,7 +109,10 @@ class VariableStore:
     
     def set_var_limits(self, name: str, min_val: float, max_val: float) -> None:
         """Set min/max limits for a variable."""
+        if self._shared:
+            self._own('_limits')
         self._limits[name] = (min_val, max_val)
+        self._mark_limits()
         
         # Re-clamp existing value if present
         if name in self._vars:
@@ -93,14 +133,16 @@ class VariableStore:
         """Add items to inventory."""
         old_count = self._items.get(name, 0)
         new_count = old_count + count
+        if self._shared:
+            self._own('_items')
         self._items[name] = max(0, new_count)
         
-        if self._on_item_change and old_count != self._items[name]:
-            self._on_item_change(name, old_count, self._items[name])
+        if old_count != self._items[name]:
+            self._mark_item(name, old_count, self._items[name])
     
     def remove_item(self, name: str, count: int = 1) -> bool:
         """Remove items from inventory. Returns True if successful."""
-        current = self._items.get(name, 0)
+        current = self.get_item_count(name)
         if current < count:
             return False
         self.add_item(name, -count)
@@ -117,30 +159,43 @@ class VariableStore:
     def clear_items(self, name: str) -> None:
         """Remove all of a specific item."""
         old_count = self._items.get(name, 0)
+        if self._shared:
+            self._own('_items')
         self._items[name] = 0
         
-        if self._on_item_change and old_count != 0:
-            self._on_item_change(name, old_count, 0)
+        if old_count != 0:
+            self._mark_item(name, old_count, 0)
     
     def get_all_items(self) -> Dict[str, int]:
         """Get a copy of all items with non-zero counts."""
         return {k: v for k, v in self._items.items() if v > 0}
     
+    def _delete_item(self, name: str) -> None:
+        """Remove an item entry entirely (used to undo its creation)."""
+        if name in self._items:
+            if self._shared:
+                self._own('_items')
+            old_count = self._items.pop(name)
+            if old_count != 0:
+                self._mark_item(name, old_count, 0)
+    
     # ==================== Status Management ====================
     
     def add_status(self, name: str) -> None:
         """Add a status effect."""
         if name not in self._status:
+            if self._shared:
+                self._own('_status')
             self._status.add(name)
-            if self._on_status_change:
-                self._on_status_change(name, True)
+            self._mark_status(name, True)
     
     def remove_status(self, name: str) -> None:
         """Remove a status effect."""
         if name in self._status:
+            if self._shared:
+                self._own('_status')
             self._status.discard(name)
-            if self._on_status_change:
-                self._on_status_change(name, False)
+            self._mark_status(name, False)
     
     def has_status(self, name: str) -> bool:
         """Check if a status effect is active."""
@@ -152,9 +207,212 @@ class VariableStore:
     
     def clear_status(self) -> None:
         """Remove all status effects."""
-        for status in list(self._status):
+        for status in self.get_all_status():
             self.remove_status(status)
     
+    def _delete_var(self, name: str) -> None:
+        """Remove a variable entirely (used to undo its creation)."""
+        if name in self._vars:
+            if self._shared:
+                self._own('_vars')
+            old_value = self._vars.pop(name)
+            self._mark_var(name, old_value, 0.0)
+    
+    # ==================== Change Tracking ====================
+    
+    def _mark_var(self, name: str, old_value: float, new_value: float, existed: bool = True) -> None:
+        """Record a variable change and notify observers."""
+        if self._journal is not None:
+            self._journal.append(('var', name, old_value, existed))
+        self._version += 1
+        if self._shared:
+            self._own('_var_versions')
+        self._var_versions[name] = self._version
+        if self._on_change and old_value != new_value:
+            self._on_change(name, old_value, new_value)
+        if self.bus is not None:
+            self.bus.publish('var', name, old_value, new_value)
+    
+    def _mark_item(self, name: str, old_count: int, new_count: int) -> None:
+        """Record an item count change and notify observers."""
+        if self._journal is not None:
+            self._journal.append(('item', name, old_count))
+        self._version += 1
+        if self._shared:
+            self._own('_item_versions')
+        self._item_versions[name] = self._version
+        if self._on_item_change:
+            self._on_item_change(name, old_count, new_count)
+        if self.bus is not None:
+            self.bus.publish('item', name, old_count, new_count)
+    
+    def _mark_status(self, name: str, added: bool) -> None:
+        """Record a status change and notify observers."""
+        if self._journal is not None:
+            self._journal.append(('status', name, added))
+        self._version += 1
+        if self._shared:
+            self._own('_status_versions')
+        self._status_versions[name] = self._version
+        if self._on_status_change:
+            self._on_status_change(name, added)
+        if self.bus is not None:
+            self.bus.publish('status', name, not added, added)
+    
+    def _mark_limits(self) -> None:
+        """Record a change to variable limits."""
+        self._version += 1
+        self._limits_version = self._version
+    
+    def _journal_state(self) -> None:
+        """Journal the whole state before a bulk reset or load."""
+        if self._journal is not None:
+            self._journal.append(('state', tuple(copy.copy(part) for part in self._export_state())))
+    
+    def _mark_reset(self) -> None:
+        """Record a bulk change that invalidates every key."""
+        self._version += 1
+        self._reset_version = self._version
+        if self.bus is not None:
+            self.bus.publish_reset()
+    
+    @property
+    def version(self) -> int:
+        """Change counter, increased by every modification."""
+        return self._version
+    
+    def changed_since(
+        self,
+        version: int,
+        variables: Iterable[str] = (),
+        items: Iterable[str] = (),
+        statuses: Iterable[str] = (),
+    ) -> bool:
+        """Check whether any of the given keys changed after a version."""
+        if version >= self._version:
+            return False
+        if version < self._reset_version:
+            return True
+        
+        for versions, names in ((self._var_versions, variables),
+                                (self._item_versions, items),
+                                (self._status_versions, statuses)):
+            for name in names:
+                if versions.get(name, 0) > version:
+                    return True
+        return False
+    
+    def reads_changed_since(self, version: int, reads: ReadSet) -> bool:
+        """Check whether any state in an expression read set changed after a version."""
+        return self.changed_since(version, reads.variables, reads.items, reads.statuses)
+    
+    # ==================== Transactions ====================
+    
+    def begin(self) -> None:
+        """
+        Start a transaction; transactions may be nested.
+        
+        Until the matching commit() or rollback(), every change to
+        variables, items and statuses is journaled with its previous value.
+        Variable limits are not journaled.
+        """
+        if self._journal is None:
+            self._journal = []
+        self._tx_marks.append(len(self._journal))
+    
+    def commit(self) -> None:
+        """Keep the changes of the innermost transaction."""
+        if not self._tx_marks:
+            raise RuntimeError("No transaction in progress")
+        self._tx_marks.pop()
+        if not self._tx_marks:
+            self._journal = None
+    
+    def rollback(self) -> None:
+        """
+        Undo the changes of the innermost transaction.
+        
+        Takes time proportional to the number of changes made. Undone keys
+        get new change versions and observers are notified, as for any
+        other change.
+        """
+        if not self._tx_marks:
+            raise RuntimeError("No transaction in progress")
+        mark = self._tx_marks.pop()
+        journal = self._journal
+        
+        # Undo without journaling the undo itself
+        self._journal = None
+        try:
+            while len(journal) > mark:
+                self._undo(journal.pop())
+        finally:
+            self._journal = journal if self._tx_marks else None
+    
+    @property
+    def in_transaction(self) -> bool:
+        """Whether a transaction is open."""
+        return bool(self._tx_marks)
+    
+    @contextmanager
+    def transaction(self) -> Iterator[VariableStore]:
+        """Run a block in a transaction, rolling back if it raises."""
+        self.begin()
+        try:
+            yield self
+        except BaseException:
+            self.rollback()
+            raise
+        self.commit()
+    
+    def _undo(self, entry: Tuple[Any, ...]) -> None:
+        """Revert one journal entry."""
+        kind = entry[0]
+        if kind == 'var':
+            _, name, old_value, existed = entry
+            if existed:
+                self.set_var(name, old_value)
+            else:
+                self._delete_var(name)
+        elif kind == 'item':
+            _, name, old_count = entry
+            if old_count:
+                self.add_item(name, old_count - self.get_item_count(name))
+            else:
+                self._delete_item(name)
+        elif kind == 'status':
+            _, name, added = entry
+            if added:
+                self.remove_status(name)
+            else:
+                self.add_status(name)
+        else:
+            self._import_state(*entry[1])
+            self._mark_reset()
+    
+    # ==================== Forking ====================
+    
+    def fork(self) -> VariableStore:
+        """
+        Create an independent copy of this store in O(1).
+        
+        The fork shares all containers with this store until either side
+        modifies one, which then gets its own copy. Change versions carry
+        over; change callbacks, the change bus and open transactions do not.
+        
+        Returns:
+            A store of the same class with the same state
+        """
+        clone = copy.copy(self)
+        clone._on_change = None
+        clone._on_item_change = None
+        clone._on_status_change = None
+        clone.bus = None
+        clone._journal = None
+        clone._tx_marks = []
+        self._share_with(clone)
+        return clone
+    
     # ==================== Callbacks ====================
     
     def on_variable_changed(self, callback: Callable[[str, float, float], None]) -> None:
@@ -171,44 +429,189 @@ class VariableStore:
     
     # ==================== Serialization ====================
     
-    def to_json(self) -> str:
-        """Serialize state to JSON string."""
-        def encode_value(v: float) -> Any:
-            if math.isinf(v):
-                return "Infinity" if v > 0 else "-Infinity"
-            if math.isnan(v):
-                return "NaN"
-            return v
-        
-        data = {
-            "vars": {k: encode_value(v) for k, v in self._vars.items()},
-            "items": self._items,
-            "status": list(self._status),
-            "limits": {k: list(v) for k, v in self._limits.items()}
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the full state as a JSON-compatible dict."""
+        variables, items, status, limits = self._export_state()
+        return {
+            "vars": {k: _encode_value(v) for k, v in variables.items()},
+            "items": dict(items),
+            "status": list(status),
+            "limits": {k: list(v) for k, v in limits.items()}
         }
-        return json.dumps(data, indent=2)
+    
+    def from_dict(self, data: Dict[str, Any]) -> None:
+        """Replace the full state with one produced by to_dict()."""
+        self.load_state(
+            {k: _decode_value(v) for k, v in data.get("vars", {}).items()},
+            dict(data.get("items", {})),
+            set(data.get("status", [])),
+            {k: tuple(v) for k, v in data.get("limits", {}).items()},
+        )
+    
+    def load_state(
+        self,
+        variables: Dict[str, float],
+        items: Dict[str, int],
+        status: Set[str],
+        limits: Dict[str, Tuple[float, float]],
+    ) -> None:
+        """
+        Replace the full state, as a bulk load.
+        
+        The previous state is journaled and every key counts as changed
+        (see diff_since); save formats other than JSON restore through this.
+        
+        Args:
+            variables: Value by variable name
+            items: Count by item name
+            status: Names of the set statuses
+            limits: (min, max) by variable name
+        """
+        self._journal_state()
+        self._import_state(variables, items, status, limits)
+        self._mark_reset()
+    
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Serialize state to JSON string (pass indent=None for compact output)."""
+        return json.dumps(self.to_dict(), indent=indent)
     
     def from_json(self, json_str: str) -> None:
         """Deserialize state from JSON string."""
-        def decode_value(v: Any) -> float:
-            if v == "Infinity":
-                return float('inf')
-            if v == "-Infinity":
-                return float('-inf')
-            if v == "NaN":
-                return float('nan')
-            return float(v)
-        
-        data = json.loads(json_str)
-        
-        self._limits = {k: tuple(v) for k, v in data.get("limits", {}).items()}
-        self._vars = {k: decode_value(v) for k, v in data.get("vars", {}).items()}
-        self._items = data.get("items", {})
-        self._status = set(data.get("status", []))
+        self.from_dict(json.loads(json_str))
+    
+    def diff_since(self, version: int) -> Dict[str, Any]:
+        """
+        Get the changes made after a version, as a JSON-compatible delta.
+        
+        Only keys whose change version is newer are included, plus all
+        variable limits if any changed. If the state was reset or loaded
+        after the version, the delta is a full snapshot instead (marked
+        with "full": true).
+        
+        Args:
+            version: A value of the version property seen earlier
+        
+        Returns:
+            Delta for apply_delta(); its "version" is the version to pass
+            to the next diff_since() call
+        """
+        if version < self._reset_version:
+            return {"full": True, "version": self._version, **self.to_dict()}
+        
+        delta: Dict[str, Any] = {
+            "full": False,
+            "base": version,
+            "version": self._version,
+            "vars": {},
+            "removed_vars": [],
+            "items": {},
+            "added_status": [],
+            "removed_status": [],
+        }
+        if version >= self._version:
+            return delta
+        
+        for name, changed in self._var_versions.items():
+            if changed > version:
+                if self.has_var(name):
+                    delta["vars"][name] = _encode_value(self.get_var(name))
+                else:
+                    delta["removed_vars"].append(name)
+        for name, changed in self._item_versions.items():
+            if changed > version:
+                delta["items"][name] = self.get_item_count(name)
+        for name, changed in self._status_versions.items():
+            if changed > version:
+                key = "added_status" if self.has_status(name) else "removed_status"
+                delta[key].append(name)
+        if self._limits_version > version:
+            delta["limits"] = self.to_dict()["limits"]
+        return delta
+    
+    def apply_delta(self, delta: Dict[str, Any]) -> None:
+        """
+        Merge a delta from diff_since() into this store.
+        
+        The store must hold the state the delta was taken against: its
+        "base" must be the version this store is at, or the source version
+        of the last delta applied if the store has not changed since. Full
+        snapshots can be applied to any store.
+        
+        Args:
+            delta: Delta produced by diff_since()
+        
+        Raises:
+            ValueError: If the delta is based on another version
+        """
+        if delta.get("full"):
+            self.from_dict(delta)
+            self._delta_source = (delta["version"], self._version)
+            return
+        
+        base = self._version
+        if self._delta_source is not None and self._delta_source[1] == self._version:
+            base = self._delta_source[0]
+        if delta.get("base") != base:
+            raise ValueError(f"Delta is based on version {delta.get('base')}, but the store is at {base}")
+        
+        for name, (low, high) in delta.get("limits", {}).items():
+            self.set_var_limits(name, low, high)
+        for name, value in delta.get("vars", {}).items():
+            self.set_var(name, _decode_value(value))
+        for name in delta.get("removed_vars", []):
+            self._delete_var(name)
+        for name, count in delta.get("items", {}).items():
+            self.add_item(name, count - self.get_item_count(name))
+        for name in delta.get("added_status", []):
+            self.add_status(name)
+        for name in delta.get("removed_status", []):
+            self.remove_status(name)
+        self._delta_source = (delta["version"], self._version)
+    
+    def _export_state(self) -> Tuple[Dict[str, float], Dict[str, int], Set[str], Dict[str, Tuple[float, float]]]:
+        """Return (variables, items, statuses, limits) for serialization."""
+        return self._vars, self._items, self._status, self._limits
+    
+    def _import_state(
+        self,
+        variables: Dict[str, float],
+        items: Dict[str, int],
+        status: Set[str],
+        limits: Dict[str, Tuple[float, float]],
+    ) -> None:
+        """Replace the whole state without recording per-key changes."""
+        self._limits = limits
+        self._vars = variables
+        self._items = items
+        self._status = status
+        self._unshare('_limits', '_vars', '_items', '_status')
     
     def reset(self) -> None:
         """Reset all state to initial values."""
-        self._vars.clear()
-        self._items.clear()
-        self._status.clear()
+        self._journal_state()
+        self._vars = {}
+        self._items = {}
+        self._status = set()
+        self._unshare('_vars', '_items', '_status')
+        self._mark_reset()
         # Keep limits as they define the game rules
+
+
+def _encode_value(v: float) -> Any:
+    """Encode a float for JSON, spelling out infinities and NaN."""
+    if math.isinf(v):
+        return "Infinity" if v > 0 else "-Infinity"
+    if math.isnan(v):
+        return "NaN"
+    return v
+
+
+def _decode_value(v: Any) -> float:
+    """Decode a float written by _encode_value."""
+    if v == "Infinity":
+        return float('inf')
+    if v == "-Infinity":
+        return float('-inf')
+    if v == "NaN":
+        return float('nan')
+    return float(v)
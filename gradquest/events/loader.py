@@ -7,9 +7,9 @@ Parses YAML event definitions and creates GameEvent objects.
 from __future__ import annotations
 from typing import List, Dict, Any, Optional
 from pathlib import Path
-import yaml
 
 from gradquest.core.event_engine import GameEvent, EventCondition, EventAction
+from gradquest.core.ruleset_cache import read_yaml
 
 
 def load_events(path: Path) -> List[GameEvent]:
@@ -18,15 +18,14 @@ def load_events(path: Path) -> List[GameEvent]:
     
     Args:
         path: Path to the events YAML file
-        
+    
     Returns:
         List of GameEvent objects
     """
     if not path.exists():
         return []
     
-    with open(path, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
+    data = read_yaml(path)
     
     if not data:
         return []
@@ -46,7 +45,7 @@ def parse_event(data: Dict[str, Any]) -> Optional[GameEvent]:
     
     Args:
         data: Event definition dictionary
-        
+    
     Returns:
         GameEvent object or None if invalid
     """
@@ -116,15 +115,14 @@ def load_lang(path: Path) -> Dict[str, str]:
     
     Args:
         path: Path to lang.yaml
-        
+    
     Returns:
         Dictionary of key -> translated string
     """
     if not path.exists():
         return {}
     
-    with open(path, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
+    data = read_yaml(path)
     
     if not data:
         return {}
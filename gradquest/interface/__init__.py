@@ -2,8 +2,14 @@
 
 from gradquest.interface.cli import CLI
 from gradquest.interface.text_renderer import TextRenderer
+from gradquest.interface.headless import HeadlessRunner, Policy, RandomPolicy, GreedyPolicy, simulate
 
 __all__ = [
     "CLI",
     "TextRenderer",
+    "HeadlessRunner",
+    "Policy",
+    "RandomPolicy",
+    "GreedyPolicy",
+    "simulate",
 ]
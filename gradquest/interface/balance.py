@@ -0,0 +1,210 @@
+"""
+Balance - Parallel Monte Carlo runs of headless games for tuning rulesets.
+
+Plays many seeded games across a process pool. Each worker loads the
+ruleset once and plays chunks of seeds; outcomes stream back as chunks
+finish and are folded into a BalanceReport (outcome rates, time to
+graduation, paper counts) without keeping per-game results around.
+"""
+
+from __future__ import annotations
+from collections import Counter
+from dataclasses import dataclass, field
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Callable, Iterator, Tuple
+import time
+
+from gradquest.interface.headless import HeadlessRunner, Policy, GreedyPolicy, RandomPolicy, GameResult
+
+
+# Policies selectable by name (e.g. from the command line)
+POLICIES: Dict[str, Callable[[], Policy]] = {
+    'greedy': GreedyPolicy,
+    'random': RandomPolicy,
+}
+
+# Seeds handed to a worker at a time; large enough to amortize IPC
+DEFAULT_CHUNK_SIZE = 200
+
+
+# ==================== Report ====================
+
+@dataclass
+class BalanceReport:
+    """Aggregated outcomes of many games."""
+    games: int = 0
+    wins: int = 0
+    reasons: Counter = field(default_factory=Counter)  # EndGameState.reason -> games
+    graduation_months: Counter = field(default_factory=Counter)  # Months played -> graduations
+    papers: Counter = field(default_factory=Counter)  # Papers at the end -> games
+    
+    def add(self, result: GameResult) -> None:
+        """Fold one game's outcome into the report."""
+        self.games += 1
+        self.wins += result.won
+        self.reasons[result.reason] += 1
+        self.papers[result.papers] += 1
+        if result.reason == 'graduation':
+            self.graduation_months[result.months] += 1
+    
+    @property
+    def win_rate(self) -> float:
+        """Fraction of games won."""
+        return self.wins / self.games if self.games else 0.0
+    
+    def graduation_percentile(self, fraction: float) -> Optional[int]:
+        """Months to graduation at a percentile (0-1), or None if nobody graduated."""
+        total = sum(self.graduation_months.values())
+        if not total:
+            return None
+        rank = fraction * (total - 1)
+        seen = 0
+        for months in sorted(self.graduation_months):
+            seen += self.graduation_months[months]
+            if seen > rank:
+                return months
+        return max(self.graduation_months)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the report as JSON-compatible data."""
+        graduations = sum(self.graduation_months.values())
+        mean = (sum(months * count for months, count in self.graduation_months.items()) / graduations
+                if graduations else None)
+        return {
+            'games': self.games,
+            'winRate': self.win_rate,
+            'reasons': {reason: count / self.games for reason, count in self.reasons.most_common()},
+            'graduationMonths': {
+                'mean': mean,
+                'p10': self.graduation_percentile(0.1),
+                'p50': self.graduation_percentile(0.5),
+                'p90': self.graduation_percentile(0.9),
+                'histogram': dict(sorted(self.graduation_months.items())),
+            },
+            'papers': {papers: count / self.games for papers, count in sorted(self.papers.items())},
+        }
+    
+    def format(self) -> str:
+        """Format the report for the terminal."""
+        data = self.to_dict()
+        lines = [f"Games: {self.games:,}    Win rate: {self.win_rate:.1%}", "", "Outcomes:"]
+        for reason, share in data['reasons'].items():
+            lines.append(f"  {reason:<16} {self.reasons[reason]:>10,}  {share:6.1%}")
+        
+        months = data['graduationMonths']
+        lines += ["", "Months to graduation:"]
+        if months['mean'] is None:
+            lines.append("  (no graduations)")
+        else:
+            lines.append(f"  mean {months['mean']:.1f}   p10 {months['p10']}   "
+                         f"p50 {months['p50']}   p90 {months['p90']}")
+            by_year = Counter()
+            for month_count, count in self.graduation_months.items():
+                by_year[month_count // 12] += count
+            graduations = sum(by_year.values())
+            for year in sorted(by_year):
+                share = by_year[year] / graduations
+                lines.append(f"  year {year + 1:<3} {share:6.1%}  {'#' * round(share * 40)}")
+        
+        lines += ["", "Papers at the end:"]
+        for papers, share in data['papers'].items():
+            lines.append(f"  {papers:<3} {share:6.1%}")
+        return "\n".join(lines)
+
+
+# ==================== Workers ====================
+
+# Each worker process's runner, created once by _init_worker
+_runner: Optional[HeadlessRunner] = None
+
+
+def _init_worker(data_path: Optional[Path], policy: str) -> None:
+    """Load the ruleset once per worker process."""
+    global _runner
+    _runner = HeadlessRunner.from_path(data_path, POLICIES[policy]())
+
+
+def _play_chunk(seeds: Tuple[int, int]) -> List[GameResult]:
+    """Play the seeds in [start, stop) on this worker's runner."""
+    return _runner.play_many(range(*seeds))
+
+
+def _chunks(games: int, first_seed: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """Split a seed range into [start, stop) chunks."""
+    for start in range(first_seed, first_seed + games, chunk_size):
+        yield start, min(start + chunk_size, first_seed + games)
+
+
+def iter_results(
+    games: int,
+    workers: int = 1,
+    policy: str = 'greedy',
+    data_path: Optional[Path] = None,
+    first_seed: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[GameResult]:
+    """
+    Play seeded games in parallel and yield results as they finish.
+    
+    Game i uses seed first_seed + i, so a run is reproducible whatever
+    the worker count; results arrive in completion order.
+    
+    Args:
+        games: Number of games
+        workers: Worker processes (1 plays in this process)
+        policy: Name of a policy in POLICIES
+        data_path: Ruleset directory (the default ruleset if None)
+        first_seed: Seed of the first game
+        chunk_size: Seeds per task sent to a worker
+    
+    Returns:
+        Iterator over the game results
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy: {policy} (choose from {', '.join(POLICIES)})")
+    chunks = _chunks(games, first_seed, chunk_size)
+    
+    if workers <= 1:
+        _init_worker(data_path, policy)
+        for chunk in chunks:
+            yield from _play_chunk(chunk)
+        return
+    
+    with Pool(workers, initializer=_init_worker, initargs=(data_path, policy)) as pool:
+        for results in pool.imap_unordered(_play_chunk, chunks):
+            yield from results
+
+
+def run_balance(
+    games: int,
+    workers: int = 1,
+    policy: str = 'greedy',
+    data_path: Optional[Path] = None,
+    first_seed: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[BalanceReport, float], None]] = None,
+) -> BalanceReport:
+    """
+    Play seeded games in parallel and aggregate the outcomes.
+    
+    Args:
+        games: Number of games
+        workers: Worker processes (1 plays in this process)
+        policy: Name of a policy in POLICIES
+        data_path: Ruleset directory (the default ruleset if None)
+        first_seed: Seed of the first game
+        chunk_size: Seeds per task sent to a worker
+        progress: Called with (report so far, elapsed seconds) after each chunk
+    
+    Returns:
+        The aggregated report
+    """
+    report = BalanceReport()
+    start = time.perf_counter()
+    results = iter_results(games, workers, policy, data_path, first_seed, chunk_size)
+    for result in results:
+        report.add(result)
+        if progress is not None and report.games % chunk_size == 0:
+            progress(report, time.perf_counter() - start)
+    return report
@@ -9,6 +9,7 @@ from typing import Dict, List, Optional, TYPE_CHECKING
 import os
 import sys
 
+from gradquest.core.player_actions import PlayerActions, THESIS_CHOICES
 from gradquest.interface.text_renderer import TextRenderer
 
 if TYPE_CHECKING:
@@ -37,8 +38,26 @@ class CLI:
     HOPE_EMPTY = "░"
     HOPE_WIDTH = 20
     
+    # Menu labels of the player actions
+    ACTION_LABELS = {
+        'read': '📚 Read Papers',
+        'work_idea': '💡 Work on Idea',
+        'work_preliminary': '🔬 Work on Preliminary Result',
+        'work_figures': '📊 Work on Figures',
+        'write_paper': '📝 Write Paper',
+        'revise': '✏️ Revise Rejected Paper',
+        'thesis': '🎓 Work on Thesis',
+        'slack': '😴 Slack Off',
+        'quals': '📖 Prepare for Quals',
+        'advance': '⏩ Advance to Next Month',
+    }
+    
+    # Actions whose first message is confirmed before their outcome
+    PAUSED_ACTIONS = frozenset(['write_paper', 'revise', 'thesis'])
+    
     def __init__(self, engine: GameEngine):
         self.engine = engine
+        self.actions = PlayerActions(engine)
         self.renderer = TextRenderer()
         
         # Set up renderer with engine
@@ -146,7 +165,7 @@ class CLI:
         
         Args:
             choices: List of choice dictionaries with 'text' key
-            
+        
         Returns:
             Index of selected choice (0-based)
         """
@@ -238,48 +257,15 @@ class CLI:
                 return "quit"
     
     def _get_available_actions(self) -> List[tuple]:
-        """Get list of available actions based on game state."""
-        vs = self.engine.variable_store
+        """Get (key, label) pairs of the available actions, plus quitting."""
+        level = int(self.engine.variable_store.get_var('player.qualifyLevel'))
         actions = []
-        
-        # Research actions
-        if vs.get_item_count('idea') == 0:
-            actions.append(('read', '📚 Read Papers'))
-        
-        if vs.get_item_count('idea') > 0:
-            actions.append(('work_idea', '💡 Work on Idea'))
-        
-        if vs.get_item_count('preliminary_result') > 0:
-            actions.append(('work_preliminary', '🔬 Work on Preliminary Result'))
-        
-        if vs.get_item_count('major_result') > 0 and not vs.has_status('brokenEquipment'):
-            actions.append(('work_figures', '📊 Work on Figures'))
-        
-        if vs.get_item_count('major_result') > 0 and vs.get_item_count('figure') >= 3:
-            actions.append(('write_paper', '📝 Write Paper'))
-        
-        if vs.get_item_count('rejected_paper') > 0:
-            actions.append(('revise', '✏️ Revise Rejected Paper'))
-        
-        # V1.2: Thesis action when player has enough papers
-        papers_required = int(vs.get_var('rule.papersRequired'))
-        if vs.get_item_count('paper') >= papers_required:
-            actions.append(('thesis', '🎓 Work on Thesis'))
-        
-        # Other actions
-        actions.append(('slack', '😴 Slack Off'))
-        
-        # Qual prep: available until September year 2 (when exam happens)
-        year = vs.get_var('year')
-        month = vs.get_var('month')
-        quals_not_yet = (year == 1) or (year == 2 and month < 9)
-        if quals_not_yet:
-            current_level = int(vs.get_var('player.qualifyLevel'))
-            actions.append(('quals', f'📖 Prepare for Quals ({current_level}/3)'))
-        
-        actions.append(('advance', '⏩ Advance to Next Month'))
+        for key in self.actions.available():
+            label = self.ACTION_LABELS[key]
+            if key == 'quals':
+                label = f"{label} ({level}/3)"
+            actions.append((key, label))
         actions.append(('quit', '🚪 Quit Game'))
-        
         return actions
     
     def run(self) -> None:
@@ -332,257 +318,20 @@ class CLI:
             print("\nThanks for playing!")
             sys.exit(0)
         
-        elif action == 'advance':
-            self.engine.advance_month()
-        
-        elif action == 'read':
-            self._action_read_papers()
-        
-        elif action == 'work_idea':
-            self._action_work_on('idea', 'preliminary_result', 0.45)
-        
-        elif action == 'work_preliminary':
-            self._action_work_on('preliminary_result', 'major_result', 0.35)
-        
-        elif action == 'work_figures':
-            self._action_work_figures()
-        
-        elif action == 'write_paper':
-            self._action_write_paper()
-        
-        elif action == 'revise':
-            self._action_revise_paper()
-        
-        elif action == 'slack':
-            self._action_slack_off()
-        
-        elif action == 'quals':
-            self._action_prepare_quals()
-        
-        elif action == 'thesis':
-            self._action_work_on_thesis()
-        
-        # Advance time after action (except thesis which handles its own flow)
-        if action not in ('advance', 'quit', 'thesis'):
-            self.engine.advance_month()
-    
-    def _action_read_papers(self) -> None:
-        """Player reads papers."""
-        vs = self.engine.variable_store
-        
-        vs.add_var('player.readPapers', 1)
-        
-        # Chance to get idea (40%)
-        if self.engine._random() < 0.4:
-            vs.add_item('idea', 1)
-            self.display_message("💡 After reading several papers, you have a new research idea!")
-        else:
-            self.display_message("📚 You read some papers. No ideas yet, but you're learning...")
-        
-        # Lower chance for exhaustion (5%)
-        if self.engine._random() < 0.05:
-            vs.add_status('exhaustion')
-            self.display_message("😫 All that reading has left you exhausted...")
-        
-        self.get_confirmation()
-    
-    def _action_work_on(self, consume: str, produce: str, success_chance: float) -> None:
-        """Generic work action that converts items."""
-        vs = self.engine.variable_store
-        
-        # Apply experiment boost
-        boost = vs.get_var('player.experimentBoost', 0)
-        chance = min(1.0, success_chance + boost)
-        
-        if self.engine._random() < chance:
-            vs.remove_item(consume, 1)
-            vs.add_item(produce, 1)
-            produce_name = produce.replace('_', ' ').title()
-            self.display_message(f"🎉 Success! You've made a {produce_name}!")
-        else:
-            self.display_message("😔 You worked hard but didn't make progress this month...")
-        
-        self.get_confirmation()
-    
-    def _action_work_figures(self) -> None:
-        """Work on figures."""
-        vs = self.engine.variable_store
-        
-        # Figure creation (60%)
-        if self.engine._random() < 0.6:
-            vs.add_item('figure', 1)
-            figure_count = vs.get_item_count('figure')
-            self.display_message(f"📊 You created a figure! ({figure_count}/3 needed for paper)")
-        else:
-            self.display_message("😔 The figures didn't come out right. Try again next month...")
-        
-        # Random equipment breakdown (5%)
-        if self.engine._random() < 0.05:
-            vs.add_status('brokenEquipment')
-            self.display_message("⚠️ Oh no! Your equipment just broke down!")
-        
-        self.get_confirmation()
-    
-    def _action_write_paper(self) -> None:
-        """Write and submit a paper."""
-        vs = self.engine.variable_store
-        
-        # Consume resources
-        vs.remove_item('major_result', 1)
-        vs.remove_item('figure', 3)
-        
-        self.display_message("📝 You've submitted your paper for review...")
-        self.get_confirmation()
-        
-        # Review process (60% accept, 40% reject)
-        if self.engine._random() < 0.6:
-            vs.add_item('paper', 1)
-            paper_count = vs.get_item_count('paper')
-            papers_needed = int(vs.get_var('rule.papersRequired'))
-            
-            self.display_message(
-                f"🎉 ACCEPTED! Your paper has been published! "
-                f"({paper_count}/{papers_needed} complete)"
-            )
-            
-            # Check win condition
-            if paper_count >= papers_needed:
-                if self.engine.event_engine:
-                    self.engine.event_engine.trigger("ThesisReady", 1.0, 100)
-        else:
-            vs.add_item('rejected_paper', 1)
-            self.display_message(
-                "😢 REJECTED. The reviewers were not convinced... "
-                "You can revise and resubmit."
-            )
-        
-        self.get_confirmation()
-    
-    def _action_revise_paper(self) -> None:
-        """Revise and resubmit a rejected paper."""
-        vs = self.engine.variable_store
-        
-        vs.remove_item('rejected_paper', 1)
-        
-        self.display_message("✏️ You've revised your paper and resubmitted...")
-        self.get_confirmation()
-        
-        # Higher chance on revision
-        if self.engine._random() < 0.7:
-            vs.add_item('paper', 1)
-            paper_count = vs.get_item_count('paper')
-            papers_needed = int(vs.get_var('rule.papersRequired'))
-            
-            self.display_message(
-                f"🎉 ACCEPTED on revision! ({paper_count}/{papers_needed} complete)"
-            )
-            
-            if paper_count >= papers_needed:
-                if self.engine.event_engine:
-                    self.engine.event_engine.trigger("ThesisReady", 1.0, 100)
-        else:
-            vs.add_item('rejected_paper', 1)
-            self.display_message("😢 Rejected again... Keep trying!")
-        
-        self.get_confirmation()
-    
-    def _action_slack_off(self) -> None:
-        """Player slacks off."""
-        vs = self.engine.variable_store
-        
-        # Recover morale
-        hope_gain = 5 + int(self.engine._random() * 10)
-        vs.add_var('player.hope', hope_gain)
-        
-        self.display_message(f"😌 You took some time to relax. (+{hope_gain} morale)")
-        
-        # Chance to recover from exhaustion (35%)
-        if vs.has_status('exhaustion') and self.engine._random() < 0.35:
-            vs.remove_status('exhaustion')
-            self.display_message("💆 You're feeling refreshed! Exhaustion has faded.")
-        
-        # Chance to recover advisor relationship (25%)
-        if vs.has_status('unhappyAdvisor') and self.engine._random() < 0.25:
-            vs.remove_status('unhappyAdvisor')
-            self.display_message("🤝 Your advisor seems to have cooled down.")
-        
-        # Smaller chance to anger advisor (10%)
-        if not vs.has_status('unhappyAdvisor') and self.engine._random() < 0.1:
-            vs.add_status('unhappyAdvisor')
-            self.display_message("😠 Your advisor noticed you weren't working...")
-        
-        self.get_confirmation()
-    
-    def _action_prepare_quals(self) -> None:
-        """Prepare for qualifying exam."""
-        vs = self.engine.variable_store
-        # V1.4: Randomize qual prep - adds 0-2 points per session
-        points_gained = int(self.engine._random() * 3)  # 0, 1, or 2
-        vs.add_var('player.qualifyLevel', points_gained)
-        level = int(vs.get_var('player.qualifyLevel'))
-        
-        if points_gained == 0:
-            self.display_message(f"📖 You studied but didn't retain much. (Preparation: {level}/3)")
-        elif points_gained == 1:
-            self.display_message(f"📖 Decent study session! (Preparation: {level}/3)")
-        else:
-            self.display_message(f"📖 Great progress! (Preparation: {level}/3)")
-        self.get_confirmation()
-    
-    def _action_work_on_thesis(self) -> None:
-        """Work on thesis and defend - V1.2 addition."""
-        vs = self.engine.variable_store
-        
-        papers = vs.get_item_count('paper')
-        papers_required = int(vs.get_var('rule.papersRequired'))
-        
-        self.display_message(
-            f"📚 You have {papers} papers published ({papers_required} required).\n"
-            "It's time to write your thesis and defend!"
-        )
-        self.get_confirmation()
-        
-        # Choice: defend or stay
-        choices = [
-            {"text": "Write the thesis and defend"},
-            {"text": "Stay for another year of research"}
-        ]
+        choice = None
+        if action == 'thesis':
+            self.display_message(self.actions.thesis_prompt())
+            self.get_confirmation()
+            choice = self.display_choices(THESIS_CHOICES)
         
-        choice = self.display_choices(choices)
+        messages = self.actions.perform(action, choice)
         
-        if choice == 0:  # Defend
-            self.display_message("📖 After months of writing, you're ready to defend...")
+        # Submitting a paper and defending pause before the outcome
+        if action in self.PAUSED_ACTIONS and len(messages) > 1:
+            self.display_message(messages.pop(0))
             self.get_confirmation()
-            
-            # 90% success rate for defense
-            if self.engine._random() < 0.9:
-                self.display_message(
-                    "🎓🎉 CONGRATULATIONS, DOCTOR! 🎉🎓\n\n"
-                    "You've successfully defended your thesis and earned your PhD!"
-                )
-                self.get_confirmation()
-                
-                # End the game - win!
-                from gradquest.core.game_engine import EndGameState
-                self.engine._ended = True
-                self.engine._running = False
-                self.engine._end_state = EndGameState(True, "graduation", "You are now Dr. You!")
-            else:
-                self.display_message(
-                    "😅 The defense was rough, but you passed with major revisions!"
-                )
-                self.get_confirmation()
-                
-                # Still win, just with a different message
-                from gradquest.core.game_engine import EndGameState
-                self.engine._ended = True
-                self.engine._running = False
-                self.engine._end_state = EndGameState(True, "graduation", "It wasn't easy, but you made it!")
-        else:  # Stay
-            self.display_message(
-                "You decide to stay and do more research. Your advisor is pleased."
-            )
-            vs.add_var('player.hope', 20)
+        
+        for message in messages:
+            self.display_message(message)
+        if messages:
             self.get_confirmation()
-            self.engine.advance_month()
-
@@ -0,0 +1,251 @@
+"""
+Headless - Fast, non-interactive simulation of complete games.
+
+Drives a GameEngine with a policy object that picks the player's monthly
+actions and answers DisplayChoices, with message formatting turned off.
+Player actions follow the shared rules in player_actions, like the CLI
+and web UI. One loaded engine can play any number of seeded games back
+to back.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterable
+import random
+
+from gradquest.core.game_engine import GameEngine, EndGameState
+from gradquest.core.player_actions import PlayerActions, THESIS_CHOICES
+from gradquest.core.ruleset import Ruleset
+
+
+# ==================== Policies ====================
+
+class Policy:
+    """
+    Decides for a simulated player.
+    
+    Subclasses override choose_action and, for rulesets with choices,
+    choose_option. Policies should draw randomness from engine._random()
+    (or their own seeded generator) so games stay reproducible.
+    """
+    
+    def choose_action(self, engine: GameEngine, actions: List[str]) -> str:
+        """
+        Pick this month's action.
+        
+        Args:
+            engine: The running game
+            actions: Keys of the available actions (see available_actions)
+        
+        Returns:
+            One of the given action keys
+        """
+        raise NotImplementedError
+    
+    def choose_option(self, engine: GameEngine, choices: List[Dict[str, Any]]) -> int:
+        """
+        Answer a DisplayChoices prompt (or the thesis decision).
+        
+        Args:
+            engine: The running game
+            choices: The choice dicts, each with a 'text' key
+        
+        Returns:
+            Index of the chosen option (0-based)
+        """
+        return 0
+    
+    def new_game(self, engine: GameEngine, seed: Optional[int]) -> None:
+        """Called before each game with its seed (None if unseeded)."""
+
+
+class RandomPolicy(Policy):
+    """
+    Picks uniformly among the available actions and options.
+    
+    The policy's generator is reseeded from its own seed and the game's
+    seed before each game, so a seeded game plays out the same no matter
+    which games ran before it (or in which process).
+    """
+    
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self._rng = random.Random(seed)
+    
+    def new_game(self, engine: GameEngine, seed: Optional[int]) -> None:
+        if seed is not None:
+            self._rng.seed(f"{self.seed}:{seed}")
+    
+    def choose_action(self, engine: GameEngine, actions: List[str]) -> str:
+        return self._rng.choice(actions)
+    
+    def choose_option(self, engine: GameEngine, choices: List[Dict[str, Any]]) -> int:
+        return self._rng.randrange(len(choices))
+
+
+class GreedyPolicy(Policy):
+    """
+    Pushes research forward, slacking off when morale runs low.
+    
+    Takes the first available action in PRIORITY, always accepts the
+    first option of a choice, and defends the thesis as soon as it can.
+    """
+    
+    PRIORITY = (
+        'thesis', 'write_paper', 'revise', 'work_figures', 'work_preliminary',
+        'work_idea', 'quals', 'read', 'slack',
+    )
+    
+    def __init__(self, min_hope: float = 25):
+        self.min_hope = min_hope
+    
+    def choose_action(self, engine: GameEngine, actions: List[str]) -> str:
+        if engine.variable_store.get_var('player.hope') < self.min_hope and 'slack' in actions:
+            return 'slack'
+        for action in self.PRIORITY:
+            if action in actions:
+                return action
+        return actions[0]
+
+
+# ==================== Simulation ====================
+
+class HeadlessEngine(GameEngine):
+    """
+    GameEngine tuned for playing many games back to back.
+    
+    Expressions compile to closures, and conditions are checked directly:
+    in full games the incremental condition cache costs more to validate
+    than it saves. Games play out exactly as on a plain GameEngine.
+    """
+    
+    EXPRESSION_BACKEND = 'closure'
+    INCREMENTAL_CONDITIONS = False
+
+
+@dataclass
+class GameResult:
+    """Outcome of one simulated game."""
+    seed: Optional[int]
+    won: bool
+    reason: str
+    months: int  # Months played
+    papers: int
+    hope: float
+    actions: Dict[str, int]  # How often each action was taken
+
+
+class HeadlessRunner:
+    """
+    Plays complete games without a frontend.
+    
+    Each month the policy picks an action, the action is applied by
+    PlayerActions, and pending events are drained; DisplayChoices prompts are
+    answered by the policy and messages are discarded.
+    """
+    
+    # Give up on games that have not ended after this many months
+    MAX_MONTHS = 12 * 100
+    
+    def __init__(self, engine: GameEngine, policy: Policy):
+        """
+        Set up a runner.
+        
+        Args:
+            engine: An engine that has loaded its game data
+            policy: Decides actions and choices
+        """
+        self.engine = engine
+        self.policy = policy
+        self.actions = PlayerActions(engine)
+        engine.format_messages = False
+    
+    @classmethod
+    def from_path(cls, data_path: Optional[Path], policy: Policy) -> HeadlessRunner:
+        """Wrap a new HeadlessEngine of a ruleset (the default one if None), loaded once per process."""
+        return cls(Ruleset.shared(data_path, HeadlessEngine).new_game(), policy)
+    
+    def play(self, seed: Optional[int] = None) -> GameResult:
+        """
+        Play one game to its end.
+        
+        Args:
+            seed: Random seed for the game (None for a random one)
+        
+        Returns:
+            The game's outcome
+        """
+        engine = self.engine
+        if seed is not None:
+            engine.set_random_seed(seed)
+        engine.start(new_seed=seed is None)
+        self.policy.new_game(engine, seed)
+        
+        counts: Dict[str, int] = {}
+        months = 0
+        self._drain()
+        while engine.is_running and months < self.MAX_MONTHS:
+            action = self.policy.choose_action(engine, self.available_actions())
+            counts[action] = counts.get(action, 0) + 1
+            self.perform(action)
+            self._drain()
+            months += 1
+        
+        end_state = engine.end_state or EndGameState(False, 'unfinished')
+        vs = engine.variable_store
+        return GameResult(
+            seed=seed if seed is not None else engine._random_seed,
+            won=end_state.won,
+            reason=end_state.reason,
+            months=months,
+            papers=vs.get_item_count('paper'),
+            hope=vs.get_var('player.hope'),
+            actions=counts,
+        )
+    
+    def play_many(self, seeds: Iterable[int]) -> List[GameResult]:
+        """Play one game per seed on this runner's engine."""
+        return [self.play(seed) for seed in seeds]
+    
+    def _drain(self) -> None:
+        """Process pending events, letting the policy answer any choices."""
+        engine = self.engine
+        while True:
+            context = engine.drain().context
+            if context is None:
+                return
+            choices = context.pending_choices
+            engine.event_engine.continue_event(context, self.policy.choose_option(engine, choices))
+    
+    # ==================== Player Actions ====================
+    
+    def available_actions(self) -> List[str]:
+        """Get the keys of the actions available this month."""
+        return self.actions.available()
+    
+    def perform(self, action: str) -> None:
+        """Apply a player action and advance time, letting the policy decide the thesis."""
+        choice = None
+        if action == 'thesis':
+            choice = self.policy.choose_option(self.engine, THESIS_CHOICES)
+        self.actions.perform(action, choice)
+
+
+def simulate(
+    seeds: Iterable[int],
+    policy: Optional[Policy] = None,
+    data_path: Optional[Path] = None,
+) -> List[GameResult]:
+    """
+    Play one headless game per seed.
+    
+    Args:
+        seeds: Random seeds, one per game
+        policy: Player policy (GreedyPolicy by default)
+        data_path: Ruleset directory (the default ruleset if None)
+    
+    Returns:
+        The results in seed order
+    """
+    return HeadlessRunner.from_path(data_path, policy or GreedyPolicy()).play_many(seeds)
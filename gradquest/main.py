@@ -6,12 +6,15 @@ A PhD life simulator game.
 
 from __future__ import annotations
 import argparse
+import os
 import sys
 from pathlib import Path
 
 
 def main():
     """Main entry point for GradQuest."""
+    from gradquest.interface.balance import POLICIES
+    
     parser = argparse.ArgumentParser(
         description="GradQuest - A PhD Life Simulator",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -20,6 +23,8 @@ Examples:
     python -m gradquest.main           # Start the game
     python -m gradquest.main --seed 42 # Start with specific seed
     python -m gradquest.main --ruleset custom  # Use custom ruleset
+    python -m gradquest.main simulate -n 100000  # Balance run of 100k games
+    python -m gradquest.main compile   # Prebuild the ruleset cache
         """
     )
     
@@ -50,6 +55,49 @@ Examples:
         help='Show version and exit'
     )
     
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    simulate = subparsers.add_parser(
+        'simulate',
+        help='Play many seeded games headlessly and report outcomes',
+        description='Play many seeded games across worker processes and '
+                    'report outcome rates, time to graduation and paper counts.',
+    )
+    simulate.add_argument(
+        '--games', '-n',
+        type=int,
+        default=10000,
+        help='Number of games (default: 10000)'
+    )
+    simulate.add_argument(
+        '--workers', '-j',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Worker processes (default: one per CPU)'
+    )
+    simulate.add_argument(
+        '--policy', '-p',
+        choices=sorted(POLICIES),
+        default='greedy',
+        help='Player policy (default: greedy)'
+    )
+    simulate.add_argument(
+        '--first-seed',
+        type=int,
+        default=0,
+        help='Seed of the first game; game i uses first-seed + i (default: 0)'
+    )
+    simulate.add_argument(
+        '--json',
+        action='store_true',
+        help='Print the report as JSON'
+    )
+    subparsers.add_parser(
+        'compile',
+        help='Parse the ruleset and write its cache file',
+        description='Parse the ruleset YAML and write the binary cache that '
+                    'later starts load instead (e.g. when deploying).',
+    )
+    
     args = parser.parse_args()
     
     if args.version:
@@ -69,12 +117,25 @@ Examples:
         print(f"Error: Ruleset not found: {data_path}")
         sys.exit(1)
     
+    if args.command == 'simulate':
+        run_simulation(args, data_path)
+        return
+    if args.command == 'compile':
+        from gradquest.core.ruleset_cache import compile_ruleset, cache_path
+        try:
+            compile_ruleset(data_path, strict=True)
+        except OSError as e:
+            print(f"Error: Could not write {cache_path(data_path)}: {e}")
+            sys.exit(1)
+        print(f"Wrote {cache_path(data_path)}")
+        return
+    
     # Import and run game
     try:
         from gradquest.core.game_engine import GameEngine
         from gradquest.interface.cli import CLI
         
-        # Initialize game engine
+        # Initialize game engine, reusing the parsed ruleset across starts
         engine = GameEngine(data_path)
         
         # Set seed if provided
@@ -82,7 +143,7 @@ Examples:
             engine.set_random_seed(args.seed)
         
         # Load game data
-        engine.load_game_data()
+        engine.load_game_data(use_cache=True)
         
         # Create and run CLI
         cli = CLI(engine)
@@ -98,5 +159,37 @@ Examples:
         sys.exit(1)
 
 
+def run_simulation(args: argparse.Namespace, data_path: Path) -> None:
+    """Run the 'simulate' subcommand."""
+    import json
+    import time
+    from gradquest.interface.balance import run_balance
+    
+    def progress(report, elapsed):
+        if sys.stderr.isatty():
+            rate = report.games / elapsed if elapsed else 0
+            print(f"\r{report.games:,}/{args.games:,} games ({rate:,.0f}/s)", end='', file=sys.stderr)
+    
+    start = time.perf_counter()
+    report = run_balance(
+        args.games,
+        workers=args.workers,
+        policy=args.policy,
+        data_path=data_path,
+        first_seed=args.first_seed,
+        progress=progress,
+    )
+    elapsed = time.perf_counter() - start
+    if sys.stderr.isatty():
+        print(file=sys.stderr)
+    
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(f"Policy: {args.policy}    Workers: {args.workers}    "
+              f"Time: {elapsed:.1f}s ({report.games / elapsed:,.0f} games/s)\n")
+        print(report.format())
+
+
 if __name__ == '__main__':
     main()
@@ -10,7 +10,8 @@ from pathlib import Path
 import secrets
 import json
 
-from gradquest.core.game_engine import GameEngine, EndGameState
+from gradquest.core.player_actions import PlayerActions, DEFEND_THESIS, STAY_FOR_RESEARCH
+from gradquest.core.ruleset import Ruleset
 
 app = Flask(__name__, 
             template_folder='templates',
@@ -28,15 +29,141 @@ def get_engine():
         session_id = secrets.token_hex(8)
         session['session_id'] = session_id
         
-        # Create new engine
+        # Create new engine from the ruleset loaded once per process
         data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
-        engine = GameEngine(data_path)
-        engine.load_game_data()
-        game_engines[session_id] = engine
+        game_engines[session_id] = Ruleset.shared(data_path).new_game()
     
     return game_engines[session_id]
 
 
+class WebActions(PlayerActions):
+    """
+    The shared player actions plus the web UI's additions: conferences,
+    advisor happiness and equipment repair.
+    
+    The web game also keeps its own rules where they differ from the CLI:
+    reading papers is always available, status boosts do not help
+    research work, and publishing the last paper does not queue
+    ThesisReady (the thesis action appears in the menu instead).
+    """
+    
+    def available(self):
+        actions = super().available()
+        if 'read' not in actions:
+            actions.insert(0, 'read')
+        actions.insert(actions.index('slack') + 1, 'conference')
+        return actions
+    
+    def thesis_prompt(self):
+        return "📚 It's time to write your thesis and defend!"
+    
+    def perform(self, action, choice=None):
+        messages = super().perform(action, choice)
+        
+        # V1.5: Handle equipment repair at end of actions
+        vs = self.engine.variable_store
+        if vs.has_status('brokenEquipment'):
+            broken_months = int(vs.get_var('equipment.brokenMonths', 0)) + 1
+            vs.set_var('equipment.brokenMonths', broken_months)
+            if broken_months >= 3:
+                vs.remove_status('brokenEquipment')
+                vs.set_var('equipment.brokenMonths', 0)
+                messages.append("🔧 After 3 months, the equipment has finally been fixed!")
+            elif self.engine._random() < 0.5:
+                vs.remove_status('brokenEquipment')
+                vs.set_var('equipment.brokenMonths', 0)
+                messages.append("🔧 Good news! The equipment has been fixed.")
+        return messages
+    
+    def _action_advance(self):
+        return super()._action_advance() + ["Time passes..."]
+    
+    def _experiment_boost(self):
+        return 0.0
+    
+    def _papers_complete(self):
+        pass
+    
+    def _action_write_paper(self):
+        vs = self.engine.variable_store
+        vs.remove_item('major_result', 1)
+        vs.remove_item('figure', 3)
+        papers = vs.get_item_count('paper')
+        messages = self._publish(
+            0.6,
+            "🎉 ACCEPTED! Paper published!",
+            "😢 REJECTED. The reviewers were not convinced. You can revise.",
+        )
+        if vs.get_item_count('paper') > papers:
+            vs.add_var('advisor.happiness', 15)  # Advisor very happy
+        return messages
+    
+    def _action_revise(self):
+        self.engine.variable_store.remove_item('rejected_paper', 1)
+        return self._publish(0.7, "🎉 ACCEPTED on revision!", "😢 Rejected again... Keep trying!")
+    
+    def _action_slack(self):
+        self.engine.variable_store.add_var('advisor.happiness', -5)  # Advisor not happy about slacking
+        return super()._action_slack()
+    
+    def _stay(self):
+        self.engine.variable_store.add_var('advisor.happiness', 10)  # Advisor pleased
+        return super()._stay()
+    
+    # V1.5: New conference action
+    def _action_conference(self):
+        vs = self.engine.variable_store
+        vs.add_var('player.hope', 8)  # Networking boost
+        messages = ["🎤 You attended a conference and met interesting researchers! (+8 morale)"]
+        if self.engine._random() < 0.35:
+            vs.add_item('idea', 1)
+            messages.append("💡 The talks inspired a new research idea!")
+        if self.engine._random() < 0.1:
+            vs.add_var('advisor.happiness', 10)
+            messages.append("🤝 Your advisor heard good things about your presentation!")
+        return messages
+
+
+# Action menu entries: (name, description)
+ACTION_LABELS = {
+    'read': ('📚 Read Papers', 'Search for new research ideas'),
+    'work_idea': ('💡 Work on Idea', 'Develop your idea into preliminary results'),
+    'work_preliminary': ('🔬 Work on Preliminary', 'Turn preliminary into major results'),
+    'work_figures': ('📊 Work on Figures', 'Create figures for your paper'),
+    'work_figures_blocked': ('📊 Work on Figures', '⚠️ BLOCKED - Equipment broken!'),
+    'write_paper': ('📝 Write Paper', 'Write and submit your paper'),
+    'revise': ('✏️ Revise Paper', 'Revise and resubmit rejected paper'),
+    'thesis': ('🎓 Work on Thesis', 'Defend your thesis and graduate!'),
+    'slack': ('😴 Slack Off', 'Take a break and recover morale'),
+    'conference': ('🎤 Attend Conference', 'Network and get ideas (35% idea chance)'),
+    'quals': ('📖 Prepare for Quals', 'Study for qualifying exam'),
+    'advance': ('⏩ Next Month', 'Advance to the next month'),
+}
+
+# Event processing budget of one request; the rest runs on later polls
+DRAIN_BUDGET_MS = 50
+DRAIN_MAX_TRIGGERS = 100
+
+# The two answers to the thesis prompt, as separate requests
+THESIS_ACTIONS = {'thesis_defend': DEFEND_THESIS, 'thesis_stay': STAY_FOR_RESEARCH}
+
+
+def process_events(engine):
+    """
+    Run queued events within one request's budget and return their messages.
+    
+    Choices are not offered over the web API: an event waiting on
+    DisplayChoices is continued without a choice and resumes on the next
+    call. Events left when the budget runs out are reported as
+    eventsPending in the game state, and the client polls /api/events
+    for them.
+    """
+    drained = engine.drain(max_triggers=DRAIN_MAX_TRIGGERS, max_time_ms=DRAIN_BUDGET_MS)
+    if drained.context is not None:
+        engine.event_engine.continue_event(drained.context)
+    return drained.messages
+
+
 def get_game_state(engine):
     """Get current game state as dict."""
     stats = engine.get_stats()
@@ -97,6 +224,7 @@ def get_game_state(engine):
         'actions': actions,
         'isRunning': engine.is_running,
         'isEnded': engine.is_ended,
+        'eventsPending': engine.is_running and engine.event_engine.has_pending_triggers(),
         'endState': {
             'won': engine.end_state.won,
             'reason': engine.end_state.reason,
@@ -115,49 +243,21 @@ def get_month_name(month):
 def get_available_actions(engine):
     """Get list of available actions based on game state."""
     vs = engine.variable_store
-    actions = []
-    
-    # Read Papers is always available
-    actions.append({'id': 'read', 'name': '📚 Read Papers', 'description': 'Search for new research ideas'})
-    
-    if vs.get_item_count('idea') > 0:
-        actions.append({'id': 'work_idea', 'name': '💡 Work on Idea', 'description': 'Develop your idea into preliminary results'})
-    
-    if vs.get_item_count('preliminary_result') > 0:
-        actions.append({'id': 'work_preliminary', 'name': '🔬 Work on Preliminary', 'description': 'Turn preliminary into major results'})
+    keys = WebActions(engine).available()
     
     # Show figures action but indicate if blocked
-    if vs.get_item_count('major_result') > 0:
-        if vs.has_status('brokenEquipment'):
-            actions.append({'id': 'work_figures_blocked', 'name': '📊 Work on Figures', 'description': '⚠️ BLOCKED - Equipment broken!', 'disabled': True})
-        else:
-            actions.append({'id': 'work_figures', 'name': '📊 Work on Figures', 'description': 'Create figures for your paper'})
-    
-    if vs.get_item_count('major_result') > 0 and vs.get_item_count('figure') >= 3:
-        actions.append({'id': 'write_paper', 'name': '📝 Write Paper', 'description': 'Write and submit your paper'})
-    
-    if vs.get_item_count('rejected_paper') > 0:
-        actions.append({'id': 'revise', 'name': '✏️ Revise Paper', 'description': 'Revise and resubmit rejected paper'})
-    
-    # Thesis
-    papers_required = int(vs.get_var('rule.papersRequired'))
-    if vs.get_item_count('paper') >= papers_required:
-        actions.append({'id': 'thesis', 'name': '🎓 Work on Thesis', 'description': 'Defend your thesis and graduate!'})
-    
-    # Other actions
-    actions.append({'id': 'slack', 'name': '😴 Slack Off', 'description': 'Take a break and recover morale'})
-    actions.append({'id': 'conference', 'name': '🎤 Attend Conference', 'description': 'Network and get ideas (35% idea chance)'})
-    
-    # Qual prep
-    year = vs.get_var('year')
-    month = vs.get_var('month')
-    quals_not_yet = (year == 1) or (year == 2 and month < 9)
-    if quals_not_yet:
-        level = int(vs.get_var('player.qualifyLevel'))
-        actions.append({'id': 'quals', 'name': f'📖 Prepare for Quals ({level}/3)', 'description': 'Study for qualifying exam'})
-    
-    actions.append({'id': 'advance', 'name': '⏩ Next Month', 'description': 'Advance to the next month'})
+    if vs.get_item_count('major_result') > 0 and vs.has_status('brokenEquipment'):
+        keys.insert(sum(key in keys for key in ('read', 'work_idea', 'work_preliminary')), 'work_figures_blocked')
     
+    actions = []
+    for key in keys:
+        name, description = ACTION_LABELS[key]
+        if key == 'quals':
+            name = f"{name} ({int(vs.get_var('player.qualifyLevel'))}/3)"
+        action = {'id': key, 'name': name, 'description': description}
+        if key == 'work_figures_blocked':
+            action['disabled'] = True
+        actions.append(action)
     return actions
 
 
@@ -189,169 +289,37 @@ def perform_action():
     action = request.json.get('action')
     
     result = {'message': '', 'success': True}
-    vs = engine.variable_store
+    actions = WebActions(engine)
     
-    if action == 'read':
-        vs.add_var('player.readPapers', 1)
-        if engine._random() < 0.4:
-            vs.add_item('idea', 1)
-            result['message'] = "💡 After reading several papers, you have a new research idea!"
-        else:
-            result['message'] = "📚 You read some papers. No ideas yet, but you're learning..."
-        if engine._random() < 0.05:
-            vs.add_status('exhaustion')
-            result['message'] += "\n😫 All that reading has left you exhausted..."
-        engine.advance_month()
-    
-    elif action == 'work_idea':
-        if engine._random() < 0.45:
-            vs.remove_item('idea', 1)
-            vs.add_item('preliminary_result', 1)
-            result['message'] = "🎉 Success! You've made a Preliminary Result!"
-        else:
-            result['message'] = "😔 You worked hard but didn't make progress this month..."
-        engine.advance_month()
-    
-    elif action == 'work_preliminary':
-        if engine._random() < 0.35:
-            vs.remove_item('preliminary_result', 1)
-            vs.add_item('major_result', 1)
-            result['message'] = "🎉 Success! You've made a Major Result!"
-        else:
-            result['message'] = "😔 You worked hard but didn't make progress this month..."
-        engine.advance_month()
-    
-    elif action == 'work_figures':
-        if engine._random() < 0.6:
-            vs.add_item('figure', 1)
-            count = vs.get_item_count('figure')
-            result['message'] = f"📊 You created a figure! ({count}/3 needed for paper)"
-        else:
-            result['message'] = "😔 The figures didn't come out right. Try again..."
-        if engine._random() < 0.05:
-            vs.add_status('brokenEquipment')
-            result['message'] += "\n⚠️ Your equipment just broke down!"
-        engine.advance_month()
-    
-    elif action == 'write_paper':
-        vs.remove_item('major_result', 1)
-        vs.remove_item('figure', 3)
-        if engine._random() < 0.6:
-            vs.add_item('paper', 1)
-            count = vs.get_item_count('paper')
-            required = int(vs.get_var('rule.papersRequired'))
-            result['message'] = f"🎉 ACCEPTED! Paper published! ({count}/{required} complete)"
-            vs.add_var('advisor.happiness', 15)  # Advisor very happy
-        else:
-            vs.add_item('rejected_paper', 1)
-            result['message'] = "😢 REJECTED. The reviewers were not convinced. You can revise."
-        engine.advance_month()
-    
-    elif action == 'revise':
-        vs.remove_item('rejected_paper', 1)
-        if engine._random() < 0.7:
-            vs.add_item('paper', 1)
-            count = vs.get_item_count('paper')
-            required = int(vs.get_var('rule.papersRequired'))
-            result['message'] = f"🎉 ACCEPTED on revision! ({count}/{required} complete)"
-        else:
-            vs.add_item('rejected_paper', 1)
-            result['message'] = "😢 Rejected again... Keep trying!"
-        engine.advance_month()
-    
-    elif action == 'slack':
-        hope_gain = 5 + int(engine._random() * 10)
-        vs.add_var('player.hope', hope_gain)
-        vs.add_var('advisor.happiness', -5)  # Advisor not happy about slacking
-        result['message'] = f"😌 You took some time to relax. (+{hope_gain} morale)"
-        if vs.has_status('exhaustion') and engine._random() < 0.35:
-            vs.remove_status('exhaustion')
-            result['message'] += "\n💆 You're feeling refreshed! Exhaustion has faded."
-        if vs.has_status('unhappyAdvisor') and engine._random() < 0.25:
-            vs.remove_status('unhappyAdvisor')
-            result['message'] += "\n🤝 Your advisor seems to have cooled down."
-        if not vs.has_status('unhappyAdvisor') and engine._random() < 0.1:
-            vs.add_status('unhappyAdvisor')
-            result['message'] += "\n😠 Your advisor noticed you weren't working..."
-        engine.advance_month()
-    
-    elif action == 'quals':
-        # V1.4: Randomize qual prep - adds 0-2 points per session
-        points_gained = int(engine._random() * 3)  # 0, 1, or 2
-        vs.add_var('player.qualifyLevel', points_gained)
-        level = int(vs.get_var('player.qualifyLevel'))
-        if points_gained == 0:
-            result['message'] = f"📖 You studied but didn't retain much. (Preparation: {level}/3)"
-        elif points_gained == 1:
-            result['message'] = f"📖 Decent study session! (Preparation: {level}/3)"
-        else:
-            result['message'] = f"📖 Great progress! (Preparation: {level}/3)"
-        engine.advance_month()
-    
-    elif action == 'thesis':
-        result['message'] = "📚 It's time to write your thesis and defend!"
+    if action == 'thesis' and action in actions.available():
+        result['message'] = actions.thesis_prompt()
         result['showThesisChoice'] = True
-    
-    elif action == 'thesis_defend':
-        if engine._random() < 0.9:
-            result['message'] = "🎓🎉 CONGRATULATIONS, DOCTOR! 🎉🎓\n\nYou've successfully defended your thesis!"
-            engine._ended = True
-            engine._running = False
-            engine._end_state = EndGameState(True, "graduation", "You are now Dr. You!")
-        else:
-            result['message'] = "😅 The defense was rough, but you passed with major revisions!"
-            engine._ended = True
-            engine._running = False
-            engine._end_state = EndGameState(True, "graduation", "It wasn't easy, but you made it!")
-    
-    elif action == 'thesis_stay':
-        vs.add_var('player.hope', 20)
-        vs.add_var('advisor.happiness', 10)  # Advisor pleased
-        result['message'] = "You decide to stay and do more research. Your advisor is pleased. (+20 morale)"
-        engine.advance_month()
-    
-    elif action == 'advance':
-        engine.advance_month()
-        result['message'] = "Time passes..."
-    
-    # V1.5: New conference action
-    elif action == 'conference':
-        vs.add_var('player.hope', 8)  # Networking boost
-        result['message'] = "🎤 You attended a conference and met interesting researchers! (+8 morale)"
-        if engine._random() < 0.35:
-            vs.add_item('idea', 1)
-            result['message'] += "\n💡 The talks inspired a new research idea!"
-        if engine._random() < 0.1:
-            vs.add_var('advisor.happiness', 10)
-            result['message'] += "\n🤝 Your advisor heard good things about your presentation!"
-        engine.advance_month()
-    
-    # V1.5: Handle equipment repair at end of actions
-    if vs.has_status('brokenEquipment'):
-        broken_months = int(vs.get_var('equipment.brokenMonths', 0)) + 1
-        vs.set_var('equipment.brokenMonths', broken_months)
-        if broken_months >= 3:
-            vs.remove_status('brokenEquipment')
-            vs.set_var('equipment.brokenMonths', 0)
-            result['message'] += "\n\n🔧 After 3 months, the equipment has finally been fixed!"
-        elif engine._random() < 0.5:
-            vs.remove_status('brokenEquipment')
-            vs.set_var('equipment.brokenMonths', 0)
-            result['message'] += "\n\n🔧 Good news! The equipment has been fixed."
+    elif action in THESIS_ACTIONS and 'thesis' in actions.available():
+        result['message'] = '\n'.join(actions.perform('thesis', THESIS_ACTIONS[action]))
+    elif action in actions.available():
+        result['message'] = '\n'.join(actions.perform(action))
+    else:
+        return jsonify({'error': f'Action not available: {action}'}), 400
     
     # Process events (skip Switch/CoinFlip since we handle them manually)
-    while True:
-        context = engine.tick()
-        if context is None:
-            break
-        if context.pending_message:
-            result['message'] += f"\n\n{context.pending_message}"
+    for message in process_events(engine):
+        result['message'] += f"\n\n{message}"
     
     state = get_game_state(engine)
     state['result'] = result
     return jsonify(state)
 
 
+@app.route('/api/events', methods=['POST'])
+def run_events():
+    """Run events left over from an earlier request (see process_events)."""
+    engine = get_engine()
+    result = {'message': '\n\n'.join(process_events(engine)), 'success': True}
+    state = get_game_state(engine)
+    state['result'] = result
+    return jsonify(state)
+
+
 @app.route('/api/restart', methods=['POST'])
 def restart_game():
     """Restart the game."""
@@ -363,51 +331,75 @@ def restart_game():
 
 @app.route('/api/save', methods=['GET'])
 def save_game():
-    """Return game state for saving to localStorage."""
+    """
+    Return game state for saving to localStorage.
+    
+    With ?since=<storeVersion> from an earlier save, only the state that
+    changed since then is returned, under 'delta'.
+    """
     engine = get_engine()
     vs = engine.variable_store
     
     save_data = {
-        'variables': dict(vs._variables) if hasattr(vs, '_variables') else {},
-        'items': dict(vs.get_all_items()),
-        'statuses': list(vs.get_all_status()),
-        'eventsFired': list(engine.event_engine._fired_events) if hasattr(engine.event_engine, '_fired_events') else [],
+        'eventsFired': sorted(engine.event_engine.get_occurred_events()),
         'isRunning': engine._running,
         'isEnded': engine._ended,
-        'version': '1.6'
+        'storeVersion': vs.version,
+        'version': '1.7'
     }
     
+    since = request.args.get('since', type=int)
+    if since is not None:
+        save_data['delta'] = vs.diff_since(since)
+    else:
+        save_data['state'] = vs.to_dict()
+    
     return jsonify(save_data)
 
 
 @app.route('/api/load', methods=['POST'])
 def load_game():
-    """Load game state from save data."""
+    """
+    Load game state from a full save, or apply an incremental one.
+    
+    A delta is only applied if it was taken against the game's current
+    state; otherwise the request fails with 409 and the full save must be
+    sent.
+    """
     engine = get_engine()
     vs = engine.variable_store
     save_data = request.json
     
-    if not save_data or save_data.get('version') != '1.6':
+    if not save_data or save_data.get('version') not in ('1.6', '1.7'):
         return jsonify({'error': 'Invalid save data'}), 400
     
-    # Restore variables
-    if hasattr(vs, '_variables'):
-        vs._variables.clear()
-        vs._variables.update(save_data.get('variables', {}))
-    
-    # Restore items
-    vs._items = save_data.get('items', {})
-    
-    # Restore statuses
-    vs._active_statuses = set(save_data.get('statuses', []))
+    if 'delta' in save_data:
+        try:
+            vs.apply_delta(save_data['delta'])
+        except ValueError as e:
+            # The game changed since the delta's base; the client has to
+            # send its full save instead
+            return jsonify({'error': str(e), 'fullSaveRequired': True}), 409
+    elif 'state' in save_data:
+        vs.from_dict(save_data['state'])
+    else:
+        # 1.6 saves list variables, items and statuses separately
+        vs.from_dict({
+            'vars': save_data.get('variables', {}),
+            'items': save_data.get('items', {}),
+            'status': save_data.get('statuses', []),
+            'limits': vs.to_dict()['limits'],
+        })
     
     # Restore engine state
     engine._running = save_data.get('isRunning', True)
     engine._ended = save_data.get('isEnded', False)
     
-    # Restore fired events
-    if hasattr(engine.event_engine, '_fired_events'):
-        engine.event_engine._fired_events = set(save_data.get('eventsFired', []))
+    # Restore fired events (a full save replaces them)
+    if 'delta' not in save_data:
+        engine.event_engine.reset()
+    for event_id in save_data.get('eventsFired', []):
+        engine.event_engine.mark_occurred(event_id)
     
     return jsonify({'success': True, **get_game_state(engine)})
 
@@ -12,6 +12,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from gradquest.core.variable_store import VariableStore
+from gradquest.core.slot_store import SlotLayout, SlotVariableStore
 
 
 class TestVariableStore:
@@ -77,6 +78,1174 @@ class TestVariableStore:
         statuses = vs.get_all_status()
         assert 'exhaustion' in statuses
         assert 'firstYear' in statuses
+    
+    def test_change_versions(self):
+        """Test per-key dirty checking against a version."""
+        vs = VariableStore()
+        vs.set_var('year', 1)
+        version = vs.version
+        assert not vs.changed_since(version, variables=['year'])
+        vs.set_var('year', 1)  # Unchanged value
+        vs.add_item('idea', 1)
+        assert not vs.changed_since(version, variables=['year'], statuses=['exhaustion'])
+        assert vs.changed_since(version, items=['idea'])
+        vs.reset()
+        assert vs.changed_since(version, variables=['year'])
+
+
+class TestSlotVariableStore:
+    """Tests for the slot-indexed, array-backed store."""
+    
+    def apply_moves(self, vs):
+        vs.set_var_limits('player.hope', 0, 100)
+        vs.set_var('player.hope', 150)
+        vs.add_var('year', 2)
+        vs.add_item('idea', 3)
+        vs.remove_item('idea', 1)
+        vs.remove_item('paper', 1)
+        vs.add_status('exhaustion')
+        vs.add_status('firstYear')
+        vs.remove_status('firstYear')
+    
+    def test_matches_dict_store(self):
+        """Test that the facade behaves like VariableStore."""
+        expected, vs = VariableStore(), SlotVariableStore(SlotLayout(variables=['year']))
+        self.apply_moves(expected)
+        self.apply_moves(vs)
+        assert vs.get_all_vars() == expected.get_all_vars()
+        assert vs.get_all_items() == expected.get_all_items()
+        assert vs.get_all_status() == expected.get_all_status()
+        assert vs.get_var('missing', 7) == 7 and not vs.has_var('missing')
+        assert vs.version == expected.version
+    
+    def test_snapshot_restore(self):
+        """Test that restore returns to the snapshotted state."""
+        vs = SlotVariableStore()
+        self.apply_moves(vs)
+        snapshot = vs.snapshot()
+        vs.set_var('player.hope', 10)
+        vs.add_item('paper', 2)
+        vs.clear_status()
+        vs.restore(snapshot)
+        assert vs.get_var('player.hope') == 100
+        assert vs.get_all_items() == {'idea': 2}
+        assert vs.get_all_status() == {'exhaustion'}
+    
+    def test_shared_layout_and_json(self):
+        """Test stores sharing a layout, and a JSON round trip."""
+        layout = SlotLayout()
+        first, second = SlotVariableStore(layout), SlotVariableStore(layout)
+        self.apply_moves(first)
+        assert second.get_var('player.hope') == 0.0 and second.get_item_count('idea') == 0
+        second.from_json(first.to_json())
+        second.set_var('player.hope', 500)
+        assert second.get_var('player.hope') == 100
+        assert second.get_all_items() == first.get_all_items()
+
+
+class TestBatchVariableStore:
+    """Tests for the structure-of-arrays batch store."""
+    
+    @pytest.fixture
+    def stores(self):
+        pytest.importorskip('numpy')
+        stores = []
+        for i in range(4):
+            vs = VariableStore()
+            vs.set_var_limits('player.hope', 0, 100)
+            vs.set_var('player.hope', 30 * i)
+            vs.add_item('paper', i)
+            if i % 2:
+                vs.add_status('exhaustion')
+            stores.append(vs)
+        return stores
+    
+    def test_matches_scalar_store(self, stores):
+        """Test that vectorized updates clamp and mask like VariableStore."""
+        import numpy as np
+        from gradquest.core.batch import BatchVariableStore
+        
+        batch = BatchVariableStore.from_stores(stores)
+        mask = np.array([True, False, True, True])
+        batch.add_var('player.hope', 25, mask)
+        removed = batch.remove_item('paper', 2)
+        batch.add_status('burnout', mask)
+        batch.remove_status('exhaustion')
+        
+        for lane, vs in enumerate(stores):
+            if mask[lane]:
+                vs.add_var('player.hope', 25)
+                vs.add_status('burnout')
+            assert removed[lane] == vs.remove_item('paper', 2)
+            vs.remove_status('exhaustion')
+            lane_store = batch.to_store(lane)
+            assert lane_store.get_all_vars() == vs.get_all_vars()
+            assert lane_store.get_all_items() == vs.get_all_items()
+            assert lane_store.get_all_status() == vs.get_all_status()
+        assert list(batch.get_var_column('player.hope')) == [25, 30, 85, 100]
+    
+    def test_statuses_are_matrix_rows(self, stores):
+        """Test that status columns are views of one boolean matrix."""
+        from gradquest.core.batch import BatchVariableStore
+        
+        batch = BatchVariableStore.from_stores(stores)
+        batch.add_status('burnout')
+        assert batch._status_matrix.shape == (2, 4)
+        assert list(batch.has_status('exhaustion')) == [False, True, False, True]
+        assert set(batch.statuses) == {'exhaustion', 'burnout'}
+
+
+class TestIncrementalConditions:
+    """Tests for dependency-driven condition re-evaluation."""
+    
+    def make_engine(self, expression):
+        from gradquest.core.expression_parser import create_parser
+        from gradquest.core.event_engine import EventEngine, GameEvent, EventCondition
+        
+        vs = VariableStore()
+        parser = create_parser(variable_store=vs)
+        engine = EventEngine(vs, parser)
+        engine.set_incremental(True)
+        
+        # Count evaluations of the compiled condition
+        evaluated = []
+        compile_expression = parser.compile
+        
+        def compile(expr):
+            evaluator = compile_expression(expr)
+            return lambda: evaluated.append(expr) or evaluator()
+        parser.compile = compile
+        
+        condition = EventCondition('Expression', expression, parser.read_set(expression))
+        engine.register_event(GameEvent(id='Test', trigger='MonthBegin', conditions=[condition]))
+        return vs, engine, evaluated
+    
+    def run_trigger(self, engine):
+        engine.trigger('MonthBegin')
+        engine.process_next_trigger()
+    
+    def test_skips_unchanged_conditions(self):
+        """Test that conditions are only re-evaluated when a read key changes."""
+        vs, engine, evaluated = self.make_engine("hasStatus('exhaustion')")
+        self.run_trigger(engine)
+        vs.add_var('player.hope', -1)  # Not read by the condition
+        self.run_trigger(engine)
+        assert len(evaluated) == 1
+        vs.add_status('exhaustion')
+        self.run_trigger(engine)
+        assert len(evaluated) == 2
+        assert engine.has_event_occurred('Test')
+    
+    def test_impure_conditions_always_evaluated(self):
+        """Test that random conditions bypass the cache."""
+        vs, engine, evaluated = self.make_engine("randi(10) < 0")
+        self.run_trigger(engine)
+        self.run_trigger(engine)
+        assert len(evaluated) == 2
+
+
+class TestCompiledActions:
+    """Tests for load-time action compilation."""
+    
+    def test_actions_compiled_once(self):
+        """Test that compilers run once per action, not per execution."""
+        from gradquest.core.expression_parser import create_parser
+        from gradquest.core.event_engine import EventEngine, GameEvent, EventAction
+        
+        vs = VariableStore()
+        engine = EventEngine(vs, create_parser(variable_store=vs))
+        compiled = []
+        
+        def compile_add(params):
+            compiled.append(params)
+            return lambda context: vs.add_var(params['variable'], params['delta'])
+        
+        engine.register_action_compiler('Add', compile_add)
+        engine.register_event(GameEvent(
+            id='Tick', trigger='MonthBegin',
+            actions=[EventAction('Add', {'variable': 'elapsedMonth', 'delta': 1})],
+        ))
+        for _ in range(3):
+            engine.trigger('MonthBegin')
+            engine.process_next_trigger()
+        
+        assert len(compiled) == 1
+        assert vs.get_var('elapsedMonth') == 3
+    
+    def test_nested_switch_actions(self):
+        """Test compiled Switch cases from the default ruleset."""
+        from gradquest.core.game_engine import GameEngine
+        
+        data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+        engine = GameEngine(data_path)
+        engine.load_game_data()
+        engine.start()
+        
+        # Run the event alone, under a trigger of its own
+        import dataclasses
+        event = engine.event_engine.get_event('EquipmentFixed')
+        engine.event_engine.register_event(dataclasses.replace(event, trigger='Test'))
+        engine.event_engine._trigger_queue = []
+        
+        vs = engine.variable_store
+        vs.add_status('brokenEquipment')
+        vs.set_var('equipment.brokenMonths', 3)
+        engine.event_engine.trigger('Test')
+        assert engine.drain().messages == ["🔧 After 3 months, the equipment has finally been fixed!"]
+        assert not vs.has_status('brokenEquipment')
+        assert vs.get_var('equipment.brokenMonths') == 0
+    
+    def test_constants_folded_into_actions(self):
+        """Test that load-time compiled actions fold the rule constants."""
+        from gradquest.core.game_engine import GameEngine
+        
+        data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+        engine = GameEngine(data_path)
+        engine.load_game_data()
+        engine._load_events([{
+            'id': 'Target', 'trigger': 'Manual',
+            'actions': [{'id': 'UpdateVariable', 'variable': 'player.readPapers',
+                         'value': 'rule.papersRequired * 2'}],
+        }])
+        assert engine.parser.dump('rule.papersRequired * 2') == '6'
+        
+        def run_target():
+            engine.event_engine._trigger_queue = []
+            engine.event_engine.trigger('Manual')
+            engine.drain()
+        
+        engine.start()
+        
+        # The compiled step holds the folded value, not a variable read
+        engine.variable_store.set_var('rule.papersRequired', 99)
+        run_target()
+        assert engine.variable_store.get_var('player.readPapers') == 6
+        
+        # Other rule values recompile the steps
+        engine.DEFAULT_PAPERS_REQUIRED = 5
+        engine.start()
+        run_target()
+        assert engine.variable_store.get_var('player.readPapers') == 10
+    
+    def test_compile_errors_name_the_action(self):
+        """Test that a broken action fails the load with the event and action path."""
+        from gradquest.core.event_engine import ActionCompileError
+        from gradquest.core.game_engine import GameEngine
+        
+        data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+        engine = GameEngine(data_path)
+        engine.load_game_data()
+        with pytest.raises(ActionCompileError) as error:
+            engine._load_events([{
+                'id': 'Broken', 'trigger': 'Manual',
+                'actions': [
+                    {'id': 'GiveItem', 'item': 'idea'},
+                    {'id': 'Switch', 'cases': [{
+                        'condition': 'true',
+                        'actions': [{'id': 'UpdateVariable', 'variable': 'year', 'value': '1 +'}],
+                    }]},
+                ],
+            }])
+        assert error.value.event_id == 'Broken'
+        assert str(error.value).startswith(
+            "Cannot compile event 'Broken', action 2 (Switch) > action 1 (UpdateVariable): ")
+        assert isinstance(error.value, ValueError)
+
+
+class TestDispatch:
+    """Tests for priority-sorted trigger dispatch."""
+    
+    def make_engine(self):
+        from gradquest.core.expression_parser import create_parser
+        from gradquest.core.event_engine import EventEngine
+        
+        vs = VariableStore()
+        engine = EventEngine(vs, create_parser(variable_store=vs))
+        fired = []
+        engine.register_action_handler('Record', lambda action, context: fired.append(context.event.id))
+        return engine, fired
+    
+    def fire(self, engine, fired):
+        del fired[:]
+        engine.trigger('MonthBegin')
+        engine.process_next_trigger()
+        return list(fired)
+    
+    def test_priority_order(self):
+        """Test that higher priority events fire first, ties in registration order."""
+        from gradquest.core.event_engine import GameEvent, EventAction
+        
+        engine, fired = self.make_engine()
+        for event_id, priority in [('Low', 0), ('High', 10), ('AlsoLow', 0), ('Mid', 5)]:
+            engine.register_event(GameEvent(
+                id=event_id, trigger='MonthBegin', priority=priority, actions=[EventAction('Record')],
+            ))
+        assert self.fire(engine, fired) == ['High', 'Mid', 'Low', 'AlsoLow']
+    
+    def test_enable_disable_and_once(self):
+        """Test that disabled and spent 'once' events are skipped, including mid-trigger changes."""
+        from gradquest.core.event_engine import GameEvent, EventAction
+        
+        engine, fired = self.make_engine()
+        engine.register_event(GameEvent(
+            id='First', trigger='MonthBegin', priority=2, once=True, exclusions=['Second'],
+            actions=[EventAction('Record')],
+        ))
+        engine.register_event(GameEvent(id='Second', trigger='MonthBegin', priority=1,
+                                        actions=[EventAction('Record')]))
+        engine.register_event(GameEvent(id='Third', trigger='MonthBegin', enabled=False,
+                                        actions=[EventAction('Record')]))
+        
+        assert self.fire(engine, fired) == ['First']
+        engine.enable_event('Second')
+        engine.enable_event('Third')
+        assert self.fire(engine, fired) == ['Second', 'Third']
+        
+        # 'once' events stay spent even if re-enabled
+        engine.enable_event('First')
+        assert self.fire(engine, fired) == ['Second', 'Third']
+        engine.reset()
+        assert self.fire(engine, fired) == ['First', 'Third']
+
+
+class TestResumableEvents:
+    """Tests for events that pause for the player and resume."""
+    
+    def make_engine(self, *events):
+        from gradquest.core.game_engine import GameEngine
+        
+        data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+        engine = GameEngine(data_path)
+        engine.load_game_data()
+        engine.start()
+        while engine.tick() or engine.event_engine.has_pending_triggers():
+            pass
+        for event in events:
+            engine.event_engine.register_event(event)
+        engine.event_engine.trigger('Test')
+        return engine
+    
+    def test_resumes_after_message(self):
+        """Test that actions after a message run only once the game resumes."""
+        from gradquest.core.event_engine import GameEvent, EventAction
+        
+        engine = self.make_engine(
+            GameEvent(id='Long', trigger='Test', priority=1, actions=[
+                EventAction('DisplayMessage', {'message': 'first'}),
+                EventAction('UpdateVariable', {'variable': 'test.step', 'value': '1'}),
+                EventAction('DisplayMessage', {'message': 'second'}),
+            ]),
+            GameEvent(id='Next', trigger='Test', actions=[
+                EventAction('UpdateVariable', {'variable': 'test.next', 'value': '1'}),
+            ]),
+        )
+        vs = engine.variable_store
+        
+        context = engine.tick()
+        assert context.pending_message == 'first'
+        assert vs.get_var('test.step') == 0
+        
+        engine.event_engine.continue_event(context)
+        context = engine.tick()
+        assert context.pending_message == 'second'
+        assert vs.get_var('test.step') == 1
+        assert not engine.event_engine.has_event_occurred('Long')
+        
+        # The trigger's remaining events run after the paused one
+        assert engine.tick() is None
+        assert vs.get_var('test.next') == 1
+        assert engine.event_engine.has_event_occurred('Long')
+        assert not engine.event_engine.has_pending_triggers()
+    
+    def test_runs_chosen_option(self):
+        """Test that the chosen option's actions run, including nested waits."""
+        from gradquest.core.event_engine import GameEvent, EventAction
+        
+        choices = [
+            {'text': 'A', 'actions': [{'id': 'UpdateVariable', 'variable': 'test.choice', 'value': '1'}]},
+            {'text': 'B', 'actions': [
+                {'id': 'Switch', 'cases': [{'condition': 'true', 'actions': [
+                    {'id': 'DisplayMessage', 'message': 'chose B'},
+                    {'id': 'UpdateVariable', 'variable': 'test.choice', 'value': '2'},
+                ]}]},
+            ]},
+        ]
+        engine = self.make_engine(GameEvent(id='Choice', trigger='Test', actions=[
+            EventAction('DisplayChoices', {'choices': choices}),
+        ]))
+        
+        context = engine.tick()
+        assert [choice['text'] for choice in context.pending_choices] == ['A', 'B']
+        engine.event_engine.continue_event(context, 1)
+        
+        context = engine.tick()
+        assert context.pending_message == 'chose B'
+        assert engine.variable_store.get_var('test.choice') == 0
+        assert engine.tick() is None
+        assert engine.variable_store.get_var('test.choice') == 2
+
+
+class TestDrain:
+    """Tests for bulk trigger draining."""
+    
+    def make_engine(self):
+        from gradquest.core.game_engine import GameEngine
+        from gradquest.core.event_engine import GameEvent, EventAction
+        
+        data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+        engine = GameEngine(data_path)
+        engine.load_game_data()
+        engine.start()
+        engine.event_engine._trigger_queue = []
+        for index in range(3):
+            engine.event_engine.register_event(GameEvent(id=f'Note{index}', trigger=f'Test{index}', actions=[
+                EventAction('DisplayMessage', {'message': f'note {index}'}),
+            ]))
+            engine.event_engine.trigger(f'Test{index}')
+        return engine
+    
+    def test_collects_messages(self):
+        """Test that draining runs every trigger and collects their messages."""
+        engine = self.make_engine()
+        result = engine.drain()
+        assert result.messages == ['note 0', 'note 1', 'note 2']
+        assert result.context is None and not result.exhausted
+        assert not engine.event_engine.has_pending_triggers()
+    
+    def test_budget_and_waits(self):
+        """Test that draining stops at the trigger budget and, if asked, at messages."""
+        engine = self.make_engine()
+        result = engine.drain(max_triggers=2)
+        assert result.exhausted and result.triggers == 2
+        assert result.messages == ['note 0']
+        
+        result = engine.drain(wait_on_messages=True)
+        assert result.context.pending_message == 'note 1'
+        assert engine.drain(max_time_ms=0).exhausted
+        assert engine.drain().messages == ['note 2']
+    
+    def test_time_budget_pauses_between_actions(self):
+        """Test that a slow event is paused once the time budget has passed."""
+        import time
+        from gradquest.core.event_engine import GameEvent, EventAction
+        
+        engine = self.make_engine()
+        events = engine.event_engine
+        ran = []
+        
+        def slow(action, context):
+            ran.append(action.params['step'])
+            time.sleep(0.02)
+        
+        events.register_action_handler('Slow', slow)
+        events.register_event(GameEvent(id='Slow', trigger='Slow', actions=[
+            EventAction('Slow', {'step': step}) for step in range(4)
+        ]))
+        events._trigger_queue = []
+        events.trigger('Slow')
+        
+        result = engine.drain(max_time_ms=30)
+        assert result.exhausted and result.context is None
+        assert ran == [0, 1]
+        assert events.has_pending_triggers()
+        
+        assert not engine.drain().exhausted
+        assert ran == [0, 1, 2, 3]
+        assert not events.has_pending_triggers()
+
+
+class TestHeadless:
+    """Tests for headless simulation."""
+    
+    def test_games_are_reproducible(self):
+        """Test that a reused engine replays a seed identically."""
+        from gradquest.interface.headless import HeadlessRunner, GreedyPolicy
+        
+        runner = HeadlessRunner.from_path(None, GreedyPolicy())
+        first, _, again = runner.play_many([5, 6, 5])
+        assert first == again
+        assert first.months > 0
+    
+    def test_policies_play_to_the_end(self):
+        """Test that games end, and the greedy policy usually graduates."""
+        from gradquest.interface.headless import RandomPolicy, simulate
+        
+        results = simulate(range(10))
+        assert sum(result.won for result in results) >= 8
+        assert all(result.papers >= 3 for result in results if result.reason == 'graduation')
+        
+        results = simulate(range(10), policy=RandomPolicy(seed=1))
+        assert all(result.reason != 'unfinished' for result in results)
+
+
+class TestBalance:
+    """Tests for parallel balance runs."""
+    
+    def test_parallel_matches_serial(self):
+        """Test that results do not depend on the number of workers."""
+        from gradquest.interface.balance import iter_results
+        
+        serial = sorted(iter_results(12, workers=1, policy='random', chunk_size=5), key=lambda r: r.seed)
+        parallel = sorted(iter_results(12, workers=2, policy='random', chunk_size=5), key=lambda r: r.seed)
+        assert serial == parallel
+        assert [result.seed for result in serial] == list(range(12))
+    
+    def test_report(self):
+        """Test aggregation into outcome rates and distributions."""
+        from gradquest.interface.balance import run_balance
+        
+        report = run_balance(20, first_seed=100)
+        data = report.to_dict()
+        assert report.games == 20
+        assert sum(report.reasons.values()) == 20
+        assert abs(sum(data['reasons'].values()) - 1) < 1e-9
+        assert sum(report.graduation_months.values()) == report.reasons['graduation']
+        assert data['graduationMonths']['p10'] <= data['graduationMonths']['p90']
+        assert 'Win rate' in report.format()
+
+
+class TestRandomStreams:
+    """Tests for the splittable random service."""
+    
+    def test_skip_ahead_matches_drawing(self):
+        """Test that skipping a stream lands on the same draw as drawing."""
+        from gradquest.core.rng import RandomService
+        
+        drawn = RandomService(5).stream('events')
+        for _ in range(1000):
+            drawn.random()
+        skipped = RandomService(5).stream('events')
+        skipped.skip(1000)
+        assert skipped.random() == drawn.random()
+    
+    def test_matches_batch_lanes(self):
+        """Test that a stream with a lane's key draws what the lane draws."""
+        pytest.importorskip('numpy')
+        from gradquest.core.batch import BatchState
+        from gradquest.core.rng import RandomStream, mix64, GOLDEN_GAMMA
+        
+        batch = BatchState(3, seed=9)
+        lanes = [batch.random() for _ in range(4)]
+        stream = RandomStream(mix64(9 + 2 * GOLDEN_GAMMA))
+        assert [stream.random() for _ in range(4)] == [float(draws[2]) for draws in lanes]
+    
+    def test_streams_are_independent(self):
+        """Test that drawing from one stream leaves the others unchanged."""
+        from gradquest.core.rng import RandomService
+        
+        quiet, busy = RandomService(5), RandomService(5)
+        for _ in range(10):
+            busy.random('randi')
+        assert [quiet.random('events') for _ in range(5)] == [busy.random('events') for _ in range(5)]
+        assert quiet.random('events') != quiet.random('actions')
+    
+    def test_state_and_split(self):
+        """Test replaying from (seed, offsets) and deriving child services."""
+        from gradquest.core.rng import RandomService
+        
+        rng = RandomService(5)
+        for _ in range(7):
+            rng.random('actions')
+        state = rng.getstate()
+        expected = [rng.random('actions') for _ in range(3)]
+        
+        other = RandomService()
+        other.setstate(state)
+        assert [other.random('actions') for _ in range(3)] == expected
+        
+        assert rng.split(1).random('events') == RandomService(5).split(1).random('events')
+        assert rng.split(1).random('events') != rng.split(2).random('events')
+    
+    def test_randi_does_not_shift_events(self):
+        """Test that consulting randi leaves event rolls and action outcomes alone."""
+        from gradquest.core.game_engine import GameEngine
+        
+        data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+        engines = []
+        for _ in range(2):
+            engine = GameEngine(data_path)
+            engine.set_random_seed(11)
+            engine.load_game_data()
+            engine.start(new_seed=False)
+            engines.append(engine)
+        
+        engines[1].parser.evaluate('randi(6)')
+        events = [engine.rng.stream('events') for engine in engines]
+        assert events[0].random() == events[1].random()
+        assert engines[0]._random() == engines[1]._random()
+
+
+class TestRuleset:
+    """Tests for the shared ruleset template."""
+    
+    def test_new_game_matches_loaded_engine(self):
+        """Test that a game from a ruleset plays like a freshly loaded engine."""
+        from gradquest.core.game_engine import GameEngine
+        from gradquest.core.ruleset import Ruleset
+        from gradquest.interface.headless import HeadlessRunner, GreedyPolicy
+        
+        data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+        engine = GameEngine(data_path)
+        engine.load_game_data()
+        expected = HeadlessRunner(engine, GreedyPolicy()).play(seed=3)
+        
+        ruleset = Ruleset.load(data_path)
+        first = ruleset.new_game(seed=3)
+        second = ruleset.new_game(seed=3)
+        assert HeadlessRunner(first, GreedyPolicy()).play(seed=3) == expected
+        assert HeadlessRunner(second, GreedyPolicy()).play(seed=3) == expected
+    
+    def test_games_share_definitions_not_state(self):
+        """Test that games share registries and events but not their state."""
+        from gradquest.core.registries import ItemDefinition
+        from gradquest.core.ruleset import Ruleset
+        
+        data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+        ruleset = Ruleset.shared(data_path)
+        assert Ruleset.shared(data_path) is ruleset
+        
+        first, second = ruleset.new_game(), ruleset.new_game()
+        assert first.item_registry is second.item_registry
+        assert first.event_engine.get_event('GameStart') is second.event_engine.get_event('GameStart')
+        
+        first.start()
+        first.variable_store.add_item('paper', 2)
+        first.event_engine.mark_occurred('GameStart')
+        assert second.variable_store.get_item_count('paper') == 0
+        assert not second.event_engine.has_event_occurred('GameStart')
+        
+        with pytest.raises(RuntimeError):
+            ruleset.item_registry.register(ItemDefinition(id='grant', name='Grant'))
+    
+    def test_shared_loads_once_across_threads(self):
+        """Test that concurrent first calls to shared() load the ruleset once."""
+        import threading
+        import time
+        from gradquest.core.game_engine import GameEngine
+        from gradquest.core.ruleset import Ruleset
+        
+        class ThreadedEngine(GameEngine):
+            pass
+        
+        loads = []
+        
+        class SlowRuleset(Ruleset):
+            @classmethod
+            def load(cls, data_path=None, engine_class=GameEngine, use_cache=True):
+                loads.append(engine_class)
+                time.sleep(0.05)
+                return super().load(data_path, engine_class, use_cache)
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(SlowRuleset.shared(None, ThreadedEngine)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(loads) == 1
+        assert all(result is results[0] for result in results)
+
+
+class TestRulesetCache:
+    """Tests for the on-disk ruleset cache."""
+    
+    def copy_ruleset(self, tmp_path):
+        import shutil
+        
+        data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+        return Path(shutil.copytree(data_path, tmp_path / 'rules'))
+    
+    def test_cache_is_used_and_matches_sources(self, tmp_path, monkeypatch):
+        """Test that a current cache is loaded without parsing any YAML."""
+        import os
+        from gradquest.core import ruleset_cache
+        
+        data_path = self.copy_ruleset(tmp_path)
+        parsed = ruleset_cache.load_ruleset_data(data_path, use_cache=False)
+        assert ruleset_cache.load_ruleset_data(data_path) == parsed
+        assert ruleset_cache.cache_path(data_path).exists()
+        
+        def fail(source):
+            raise AssertionError("parsed YAML despite a current cache")
+        monkeypatch.setattr(ruleset_cache, 'parse_yaml', fail)
+        assert ruleset_cache.load_ruleset_data(data_path) == parsed
+        
+        # A touched file with the same content is checked by hash
+        items = data_path / 'items.yaml'
+        os.utime(items, ns=(items.stat().st_atime_ns, items.stat().st_mtime_ns + 10**9))
+        assert ruleset_cache.load_ruleset_data(data_path) == parsed
+    
+    def test_edited_source_rebuilds(self, tmp_path):
+        """Test that changing a ruleset file invalidates the cache."""
+        from gradquest.core import ruleset_cache
+        from gradquest.core.game_engine import GameEngine
+        
+        data_path = self.copy_ruleset(tmp_path)
+        GameEngine(data_path).load_game_data(use_cache=True)
+        assert ruleset_cache.cache_path(data_path).exists()
+        
+        with open(data_path / 'items.yaml', 'a', encoding='utf-8') as f:
+            f.write('\n- id: grant\n  name: Grant\n')
+        engine = GameEngine(data_path)
+        engine.load_game_data(use_cache=True)
+        assert engine.item_registry.has('grant')
+    
+    def test_off_by_default(self, tmp_path):
+        """Test that bare engines do not write a cache unless asked to."""
+        from gradquest.core import ruleset_cache
+        from gradquest.core.game_engine import GameEngine
+        
+        data_path = self.copy_ruleset(tmp_path)
+        GameEngine(data_path).load_game_data()
+        assert not ruleset_cache.cache_path(data_path).exists()
+    
+    def test_rulesets_use_cache(self, tmp_path):
+        """Test that loading a Ruleset (web, headless workers) goes through the cache."""
+        from gradquest.core import ruleset_cache
+        from gradquest.core.ruleset import Ruleset
+        
+        data_path = self.copy_ruleset(tmp_path)
+        Ruleset.load(data_path, use_cache=False)
+        assert not ruleset_cache.cache_path(data_path).exists()
+        Ruleset.load(data_path)
+        assert ruleset_cache.cache_path(data_path).exists()
+    
+    def test_corrupt_cache_rebuilds(self, tmp_path):
+        """Test that a cache that fails to unpickle in any way is rebuilt."""
+        from gradquest.core import ruleset_cache
+        
+        data_path = self.copy_ruleset(tmp_path)
+        parsed = ruleset_cache.load_ruleset_data(data_path, use_cache=False)
+        # A global from a missing module (ModuleNotFoundError) and a call on
+        # a non-callable (TypeError)
+        for corrupt in (b'cno_such_module\nthing\n.', b'K\x01)R.'):
+            ruleset_cache.cache_path(data_path).write_bytes(corrupt)
+            assert ruleset_cache.load_ruleset_data(data_path) == parsed
+    
+    def test_unwritable_cache_warns(self, tmp_path, monkeypatch):
+        """Test that a failed cache write is reported, and raised when strict."""
+        from gradquest.core import ruleset_cache
+        
+        data_path = self.copy_ruleset(tmp_path)
+        
+        def fail(*args, **kwargs):
+            raise PermissionError("read-only")
+        monkeypatch.setattr(ruleset_cache.os, 'replace', fail)
+        with pytest.warns(RuntimeWarning, match="Could not write ruleset cache"):
+            ruleset_cache.load_ruleset_data(data_path)
+        with pytest.raises(OSError):
+            ruleset_cache.compile_ruleset(data_path, strict=True)
+        assert list(tmp_path.iterdir()) == [data_path]
+
+
+class TestPlayerActions:
+    """Tests for the shared player action rules."""
+    
+    def test_actions_follow_state(self):
+        """Test availability, month advance and the thesis choice."""
+        from gradquest.core.ruleset import Ruleset
+        from gradquest.core.player_actions import PlayerActions, STAY_FOR_RESEARCH
+        
+        data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+        engine = Ruleset.shared(data_path).new_game(seed=1)
+        engine.start()
+        engine.drain()
+        actions = PlayerActions(engine)
+        vs = engine.variable_store
+        assert actions.available() == ['read', 'slack', 'quals', 'advance']
+        
+        month = vs.get_var('month')
+        messages = actions.perform('read')
+        assert messages and vs.get_var('player.readPapers') == 1
+        assert vs.get_var('month') == month % 12 + 1
+        
+        vs.add_item('paper', int(vs.get_var('rule.papersRequired')))
+        assert 'thesis' in actions.available()
+        with pytest.raises(ValueError):
+            actions.perform('thesis')
+        hope = vs.get_var('player.hope')
+        actions.perform('thesis', STAY_FOR_RESEARCH)
+        assert vs.get_var('player.hope') == min(100, hope + 20)
+        assert not engine.is_ended
+        
+        with pytest.raises(ValueError, match="Unknown action"):
+            actions.perform('sleep')
+    
+    def test_frontend_hooks(self):
+        """Test that subclasses can change the boost and what a full set of papers queues."""
+        from gradquest.core.ruleset import Ruleset
+        from gradquest.core.player_actions import PlayerActions
+        
+        class SureActions(PlayerActions):
+            def _experiment_boost(self):
+                return 1.0
+            
+            def _papers_complete(self):
+                self.completed = True
+        
+        data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+        engine = Ruleset.shared(data_path).new_game(seed=3)
+        engine.start()
+        engine.drain()
+        vs = engine.variable_store
+        actions = SureActions(engine)
+        for _ in range(5):
+            vs.add_item('idea', 1)
+            actions.perform('work_idea')
+        assert vs.get_item_count('preliminary_result') == 5
+        
+        vs.add_item('paper', int(vs.get_var('rule.papersRequired')) - 1)
+        vs.add_item('rejected_paper', 1)
+        while vs.get_item_count('rejected_paper'):
+            actions.perform('revise')
+        assert actions.completed
+        assert all(entry.trigger_id != 'ThesisReady' for entry in engine.event_engine._trigger_queue)
+        
+        PlayerActions(engine)._papers_complete()
+        assert any(entry.trigger_id == 'ThesisReady' for entry in engine.event_engine._trigger_queue)
+
+
+class TestTransactions:
+    """Tests for journaled transactions on the stores."""
+    
+    @pytest.mark.parametrize('store_class', [VariableStore, SlotVariableStore])
+    def test_rollback_restores_state(self, store_class):
+        """Test that rollback undoes variables, items and statuses."""
+        vs = store_class()
+        vs.set_var_limits('player.hope', 0, 100)
+        vs.set_var('player.hope', 50)
+        vs.add_item('idea', 1)
+        vs.add_status('exhaustion')
+        saved = vs.to_json()
+        
+        vs.begin()
+        vs.set_var('player.hope', 0)
+        vs.set_var('year', 3)
+        vs.add_item('idea', 2)
+        vs.add_item('paper', 1)
+        vs.remove_status('exhaustion')
+        vs.add_status('firstYear')
+        version = vs.version
+        vs.rollback()
+        
+        assert vs.to_json() == saved
+        assert not vs.has_var('year')
+        assert vs.changed_since(version, variables=['player.hope'])
+        assert not vs.in_transaction
+    
+    @pytest.mark.parametrize('store_class', [VariableStore, SlotVariableStore])
+    def test_nested_transactions(self, store_class):
+        """Test that inner rollbacks and commits only affect their own changes."""
+        vs = store_class()
+        vs.begin()
+        vs.set_var('year', 1)
+        vs.begin()
+        vs.set_var('year', 2)
+        vs.rollback()
+        assert vs.get_var('year') == 1
+        vs.begin()
+        vs.reset()
+        vs.commit()
+        assert not vs.has_var('year')
+        vs.rollback()
+        assert not vs.has_var('year')
+        with pytest.raises(RuntimeError):
+            vs.commit()
+    
+    def test_transaction_context_manager(self):
+        """Test that an exception inside transaction() rolls back."""
+        vs = VariableStore()
+        vs.set_var('year', 1)
+        with pytest.raises(ValueError):
+            with vs.transaction():
+                vs.set_var('year', 5)
+                raise ValueError("preview failed")
+        assert vs.get_var('year') == 1
+        with vs.transaction():
+            vs.set_var('year', 2)
+        assert vs.get_var('year') == 2
+
+
+class TestChangeBus:
+    """Tests for batched, filtered change notifications."""
+    
+    def test_subscribers_and_filters(self):
+        """Test that each subscriber gets only the keys it asked for."""
+        from gradquest.core.change_bus import ChangeBus
+        
+        vs = VariableStore()
+        vs.bus = ChangeBus()
+        everything, hope_only = [], []
+        vs.bus.subscribe(everything.append)
+        vs.bus.subscribe(hope_only.append, variables=['player.hope'], items=(), statuses=())
+        
+        vs.set_var('player.hope', 40)
+        vs.add_item('idea')
+        assert len(everything) == 2
+        assert [batch.variables for batch in hope_only] == [{'player.hope': (0.0, 40)}]
+    
+    def test_batches_coalesce_net_deltas(self):
+        """Test that a batch is delivered once with net changes."""
+        from gradquest.core.change_bus import ChangeBus
+        
+        vs = VariableStore()
+        vs.bus = ChangeBus()
+        batches = []
+        subscription = vs.bus.subscribe(batches.append)
+        vs.set_var('year', 1)
+        batches.clear()
+        
+        with vs.bus.batch():
+            vs.set_var('year', 2)
+            with vs.bus.batch():
+                vs.set_var('year', 3)
+                vs.add_status('exhaustion')
+                vs.add_item('idea', 2)
+                vs.remove_item('idea', 2)
+            assert batches == []
+        
+        assert len(batches) == 1
+        assert batches[0].variables == {'year': (1, 3)}
+        assert batches[0].statuses == {'exhaustion': (False, True)}
+        assert batches[0].items == {}
+        
+        vs.bus.unsubscribe(subscription)
+        vs.set_var('year', 4)
+        assert len(batches) == 1
+    
+    def test_batch_keeps_subscribers_from_its_start(self):
+        """Test that subscribing mid-batch starts with the next batch."""
+        from gradquest.core.change_bus import ChangeBus
+        
+        vs = VariableStore()
+        vs.bus = ChangeBus()
+        early, late, leaving = [], [], []
+        vs.bus.subscribe(early.append)
+        gone = vs.bus.subscribe(leaving.append)
+        
+        with vs.bus.batch():
+            vs.set_var('year', 1)
+            vs.bus.subscribe(late.append)
+            vs.bus.unsubscribe(gone)
+            vs.set_var('month', 9)
+        assert [batch.variables for batch in early] == [{'year': (0.0, 1), 'month': (0.0, 9)}]
+        assert late == [] and leaving == []
+        
+        vs.set_var('year', 2)
+        assert [batch.variables for batch in late] == [{'year': (1, 2)}]
+        
+        # Nobody listened when the batch began, so nothing is carried over
+        bus = ChangeBus()
+        vs.bus = bus
+        with bus.batch():
+            vs.set_var('year', 3)
+            bus.subscribe(late.append)
+        vs.set_var('month', 10)
+        assert [batch.variables for batch in late[1:]] == [{'month': (9, 10)}]
+    
+    def test_engine_batches_per_month(self):
+        """Test that GameEngine notifies once per month advance."""
+        from gradquest.core.game_engine import GameEngine
+        
+        data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+        engine = GameEngine(data_path)
+        engine.load_game_data()
+        engine.start()
+        batches = []
+        engine.change_bus.subscribe(batches.append, variables=['month', 'elapsedMonth'])
+        engine.advance_month()
+        assert len(batches) == 1
+        assert set(batches[0].variables) == {'month', 'elapsedMonth'}
+
+
+class TestDeltas:
+    """Tests for incremental state deltas."""
+    
+    @pytest.mark.parametrize('store_class', [VariableStore, SlotVariableStore])
+    def test_delta_round_trip(self, store_class):
+        """Test that applying a delta brings a copy up to date."""
+        source, copy = store_class(), store_class()
+        source.set_var_limits('player.hope', 0, 100)
+        source.set_var('player.hope', 50)
+        source.add_item('idea', 2)
+        source.add_status('exhaustion')
+        copy.apply_delta(source.diff_since(0))
+        version = source.version
+        
+        source.add_var('player.hope', 10)
+        source.remove_item('idea', 2)
+        source.remove_status('exhaustion')
+        source.add_status('firstYear')
+        delta = source.diff_since(version)
+        assert delta['full'] is False
+        assert delta['vars'] == {'player.hope': 60}
+        assert delta['removed_status'] == ['exhaustion']
+        
+        copy.apply_delta(delta)
+        assert copy.to_dict() == source.to_dict()
+        assert source.diff_since(source.version)['vars'] == {}
+    
+    def test_reset_gives_full_snapshot(self):
+        """Test that a delta across a reset is a full snapshot."""
+        vs = VariableStore()
+        vs.set_var('year', 3)
+        version = vs.version
+        vs.reset()
+        vs.set_var('month', 9)
+        delta = vs.diff_since(version)
+        assert delta['full'] is True
+        assert delta['vars'] == {'month': 9}
+        
+        other = VariableStore()
+        other.set_var('year', 3)
+        other.apply_delta(delta)
+        assert other.get_all_vars() == {'month': 9}
+    
+    def test_mismatched_delta_rejected(self):
+        """Test that a delta only applies to the state it was taken against."""
+        source, copy = VariableStore(), VariableStore()
+        source.set_var('year', 1)
+        copy.apply_delta(source.diff_since(0))
+        stale = source.version
+        source.set_var('year', 2)
+        version = source.version
+        source.set_var('month', 9)
+        
+        # Skips the change to year
+        with pytest.raises(ValueError):
+            copy.apply_delta(source.diff_since(version))
+        
+        # Based on the mirrored version, but the copy changed since
+        copy.set_var('month', 1)
+        with pytest.raises(ValueError):
+            copy.apply_delta(source.diff_since(stale))
+        assert copy.get_all_vars() == {'year': 1, 'month': 1}
+    
+    def test_compact_json(self):
+        """Test that to_json can skip indentation."""
+        vs = VariableStore()
+        vs.set_var('year', 1)
+        assert '\n' not in vs.to_json(indent=None)
+        assert len(vs.to_json(indent=None)) < len(vs.to_json())
+
+
+class TestForking:
+    """Tests for copy-on-write forks of stores and engines."""
+    
+    @pytest.mark.parametrize('store_class', [VariableStore, SlotVariableStore])
+    def test_store_fork_isolated(self, store_class):
+        """Test that a fork and its parent do not see each other's writes."""
+        vs = store_class()
+        vs.set_var('year', 1)
+        vs.add_item('idea', 2)
+        vs.add_status('exhaustion')
+        fork = vs.fork()
+        fork.set_var('year', 2)
+        fork.remove_item('idea', 1)
+        vs.remove_status('exhaustion')
+        assert vs.get_var('year') == 1 and fork.get_var('year') == 2
+        assert vs.get_item_count('idea') == 2 and fork.get_item_count('idea') == 1
+        assert not vs.has_status('exhaustion') and fork.has_status('exhaustion')
+        assert fork.changed_since(1, variables=['year'])
+    
+    def play(self, engine, months):
+        messages = []
+        for _ in range(months):
+            while True:
+                context = engine.tick()
+                if context is None:
+                    break
+                messages.append(context.pending_message)
+            if engine.is_ended:
+                break
+            engine.advance_month()
+        return messages
+    
+    def test_engine_fork_replays_parent(self):
+        """Test that a forked game plays out exactly like its parent."""
+        from gradquest.core.game_engine import GameEngine
+        
+        data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+        engine = GameEngine(data_path)
+        engine.set_random_seed(7)
+        engine.load_game_data()
+        engine.start(new_seed=False)
+        self.play(engine, 6)
+        
+        saved = engine.variable_store.to_json()
+        fork = engine.fork()
+        fork_messages = self.play(fork, 24)
+        assert engine.variable_store.to_json() == saved
+        
+        assert self.play(engine, 24) == fork_messages
+        assert engine.get_stats() == fork.get_stats()
+        assert engine.event_engine._occurred == fork.event_engine._occurred
+
+
+class TestBinarySave:
+    """Tests for the binary save format."""
+    
+    def make_engine(self, months=0):
+        from gradquest.core.game_engine import GameEngine
+        
+        data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+        engine = GameEngine(data_path)
+        engine.set_random_seed(7)
+        engine.load_game_data()
+        engine.start(new_seed=False)
+        for _ in range(months):
+            while engine.tick():
+                pass
+            engine.advance_month()
+        return engine
+    
+    def play(self, engine, months):
+        """Play some months and return the resulting state."""
+        for _ in range(months):
+            while engine.tick():
+                pass
+            engine.advance_month()
+        return engine.variable_store.to_dict(), sorted(engine.event_engine.get_occurred_events())
+    
+    def test_round_trip(self):
+        """Test that a loaded game matches the saved one."""
+        from gradquest.core import save_format
+        
+        engine = self.make_engine(months=6)
+        data = save_format.dumps(engine)
+        
+        other = self.make_engine()
+        save_format.loads(other, data)
+        
+        assert other.variable_store.to_dict() == engine.variable_store.to_dict()
+        assert other.event_engine.get_occurred_events() == engine.event_engine.get_occurred_events()
+        assert other.event_engine._disabled == engine.event_engine._disabled
+        assert {name: active.remaining_duration for name, active in other._active_status.items()} == \
+            {name: active.remaining_duration for name, active in engine._active_status.items()}
+        assert other.rng.getstate() == engine.rng.getstate()
+    
+    def test_loaded_game_continues_identically(self):
+        """Test that play after a load matches play after the save."""
+        from gradquest.core import save_format
+        
+        engine = self.make_engine(months=4)
+        other = self.make_engine()
+        save_format.loads(other, save_format.dumps(engine, compress=True))
+        
+        assert self.play(other, 6) == self.play(engine, 6)
+    
+    def test_rejects_bad_data(self):
+        """Test that foreign or truncated data is rejected."""
+        from gradquest.core import save_format
+        
+        engine = self.make_engine()
+        with pytest.raises(ValueError):
+            save_format.loads(engine, b'{"version": "1.7"}')
+        with pytest.raises(ValueError):
+            save_format.loads(engine, b'GQ')
+        with pytest.raises(ValueError):
+            save_format.loads(engine, save_format.dumps(engine)[:-3])
 
 
 class TestIntegration:
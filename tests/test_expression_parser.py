@@ -0,0 +1,449 @@
+"""
+Unit tests for the GradQuest expression parser.
+
+Run with: pytest tests/
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gradquest.core.variable_store import VariableStore
+from gradquest.core.expression_parser import (
+    BinaryOp,
+    FunctionCall,
+    FunctionSpec,
+    ReadSet,
+    TokenType,
+    compile_expression,
+    create_parser,
+    dump_expression,
+    optimize,
+    tokenize,
+)
+
+
+class TestTokenizer:
+    """Tests for the master-regex tokenizer."""
+    
+    def test_token_stream(self):
+        """Test token types, values and positions."""
+        tokens = tokenize("itemCount('paper') >= 3")
+        assert [t.type for t in tokens] == [
+            TokenType.IDENTIFIER, TokenType.LPAREN, TokenType.STRING,
+            TokenType.RPAREN, TokenType.OPERATOR, TokenType.NUMBER, TokenType.EOF,
+        ]
+        assert tokens[2].value == 'paper'
+        assert tokens[4].value == '>=' and tokens[4].position == 19
+        assert tokens[5].value == 3.0
+    
+    def test_longest_operator_wins(self):
+        """Test that multi-character operators are not split."""
+        values = [t.value for t in tokenize("a !== b && !c")[:-1]]
+        assert values == ['a', '!==', 'b', '&&', '!', 'c']
+    
+    def test_unexpected_character(self):
+        """Test that unknown characters raise ValueError."""
+        with pytest.raises(ValueError):
+            tokenize("player.hope # 1")
+
+
+class TestCompiledExpressions:
+    """Tests for the compile-once expression cache."""
+    
+    def test_compile_builds_ast(self):
+        """Test that expressions compile into AST nodes."""
+        node = compile_expression("player.hope - 1")
+        assert isinstance(node, BinaryOp)
+        assert node.op == '-'
+        assert isinstance(compile_expression("hasStatus('x')"), FunctionCall)
+        # As before compilation, an empty expression is an error
+        with pytest.raises(ValueError):
+            compile_expression("")
+        with pytest.raises(ValueError):
+            create_parser().evaluate("  ")
+    
+    def test_compile_is_cached(self):
+        """Test that the same source text returns the same tree."""
+        assert compile_expression("year === 2 && month === 9") is \
+            compile_expression("year === 2 && month === 9")
+    
+    def test_evaluate_uses_current_state(self):
+        """Test that cached trees read live variable values."""
+        vs = VariableStore()
+        parser = create_parser(variable_store=vs)
+        vs.set_var('player.hope', 10)
+        assert parser.evaluate("player.hope - 1") == 9
+        vs.set_var('player.hope', 20)
+        assert parser.evaluate("player.hope - 1") == 19
+    
+    def test_evaluate_operators_and_functions(self):
+        """Test precedence, unary operators and built-in functions."""
+        vs = VariableStore()
+        vs.add_item('paper', 2)
+        vs.add_status('exhaustion')
+        parser = create_parser(variable_store=vs)
+        assert parser.evaluate("1 + 2 * 3") == 7
+        assert parser.evaluate("-(1 + 2)") == -3
+        assert parser.evaluate("!hasStatus('exhaustion')") is False
+        assert parser.evaluate("itemCount('paper') >= 2 && true") is True
+        assert parser.evaluate("clip(150, 0, 100)") == 100
+
+
+
+class TestClosureBackend:
+    """Tests for the closure evaluation backend."""
+    
+    EXPRESSIONS = [
+        "player.hope - 1",
+        "year === 2 && month === 9",
+        "!hasStatus('brokenEquipment')",
+        "itemCount('paper') * 2 + 1 >= 3",
+        "min(player.hope, 10) / 0",
+        "max(year, 3) % 2 !== 1 || false",
+        "getAttributeValue('player.hope') < 50",
+        "floor(7.9) === 7",
+        "'abc' === 'abc'",
+    ]
+    
+    def test_matches_tree_backend(self):
+        """Test that both backends agree on every expression."""
+        vs = VariableStore()
+        vs.set_var('player.hope', 42)
+        vs.set_var('year', 2)
+        vs.set_var('month', 9)
+        vs.add_item('paper', 1)
+        tree = create_parser(variable_store=vs)
+        closure = create_parser(variable_store=vs, backend='closure')
+        for expression in self.EXPRESSIONS:
+            assert closure.evaluate(expression) == tree.evaluate(expression), expression
+    
+    def test_closure_reads_live_state(self):
+        """Test that pre-bound lookups see later state changes."""
+        vs = VariableStore()
+        parser = create_parser(variable_store=vs, backend='closure')
+        check = parser.compile("hasStatus('exhaustion') && player.hope > 5")
+        assert check() is False
+        vs.add_status('exhaustion')
+        vs.set_var('player.hope', 10)
+        assert check() is True
+    
+    def test_unknown_backend(self):
+        """Test that an unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            create_parser(backend='eval')
+
+
+
+class TestOptimizer:
+    """Tests for constant folding and boolean simplification."""
+    
+    def fold(self, expression, constants=None):
+        return dump_expression(optimize(compile_expression(expression), constants))
+    
+    def test_folds_literal_arithmetic(self):
+        """Test that operators and pure functions over literals are folded."""
+        assert self.fold("1 + 2 * 3") == "7"
+        assert self.fold("player.hope - (2 + 3)") == "(player.hope - 5)"
+        assert self.fold("clip(150, 0, 100) >= max(1, 2)") == "true"
+    
+    def test_folds_declared_constants(self):
+        """Test that declared constants become literals."""
+        constants = {'rule.papersRequired': 3}
+        assert self.fold("itemCount('paper') >= rule.papersRequired", constants) == \
+            "(itemCount('paper') >= 3)"
+    
+    def test_folds_reads_of_constants(self):
+        """Test that functions returning a constant variable they read are folded."""
+        from gradquest.core.expression_parser import FunctionSpec, get_function
+        
+        constants = {'rule.maxYear': 8}
+        assert self.fold("year > getAttributeValue('rule.maxYear')", constants) == "(year > 8)"
+        assert self.fold("getAttributeValue('year')", constants) == "getAttributeValue('year')"
+        
+        # Reading the variable is not enough; the function must return it as is
+        functions = {
+            'twice': FunctionSpec('twice', lambda context, name: 2, reads='variables'),
+            'attr': FunctionSpec('attr', get_function('getAttributeValue').func,
+                                 reads='variables', returns_read=True),
+        }
+        node = optimize(compile_expression("twice('rule.maxYear') + attr('rule.maxYear')"),
+                        constants, functions=functions)
+        assert dump_expression(node) == "(twice('rule.maxYear') + 8)"
+    
+    def test_boolean_identities(self):
+        """Test && / || simplification with literal operands."""
+        assert self.fold("true && hasStatus('x')") == "hasStatus('x')"
+        assert self.fold("false && year > 2") == "false"
+        assert self.fold("year > 2 || true") == "true"
+        # bool(x) is not x for non-boolean operands
+        assert self.fold("true && year") == "(true && year)"
+        # randi() must still consume the random stream
+        assert self.fold("false && randi(10) > 5") == "(false && (randi(10) > 5))"
+        # ...unless short-circuiting skips it anyway
+        node = optimize(compile_expression("false && randi(10) > 5"), short_circuit=True)
+        assert dump_expression(node) == "false"
+        node = optimize(compile_expression("!(false && randi(10) > 5)"), short_circuit=True)
+        assert dump_expression(node) == "true"
+    
+    def test_keeps_operands_that_may_raise(self):
+        """Test that a dropped operand could not have raised."""
+        assert self.fold("2 || (b * 'x')") == "(2 || (b * 'x'))"
+        assert self.fold("(b * 'x') || true") == "((b * 'x') || true)"
+        assert self.fold("b * 2 > 1 || true") == "true"
+        with pytest.raises(ValueError):
+            create_parser(short_circuit=False).evaluate("false && (b * 'x')")
+    
+    def test_parser_constants_and_dump(self):
+        """Test declare_constants through the parser."""
+        vs = VariableStore()
+        vs.set_var('rule.maxYear', 8)
+        vs.set_var('year', 9)
+        parser = create_parser(variable_store=vs)
+        assert parser.evaluate("year > rule.maxYear") is True
+        parser.declare_constants({'rule.maxYear': 10})
+        assert parser.dump("year > rule.maxYear") == "(year > 10)"
+        assert parser.evaluate("year > rule.maxYear") is False
+
+
+
+class TestShortCircuit:
+    """Tests for short-circuit evaluation of && and ||."""
+    
+    def counting_parser(self, backend, short_circuit=True):
+        calls = []
+        
+        def random_func():
+            calls.append(1)
+            return 0.5
+        
+        parser = create_parser(variable_store=VariableStore(), backend=backend,
+                               short_circuit=short_circuit)
+        parser.context['random_func'] = random_func
+        return parser, calls
+    
+    @pytest.mark.parametrize('backend', ['tree', 'closure'])
+    def test_right_operand_skipped(self, backend):
+        """Test that randi() on the right side is not drawn when decided."""
+        parser, calls = self.counting_parser(backend)
+        assert parser.evaluate("hasStatus('x') && randi(10) >= 0") is False
+        assert parser.evaluate("!hasStatus('x') || randi(10) >= 0") is True
+        assert calls == []
+        assert parser.evaluate("!hasStatus('x') && randi(10) >= 0") is True
+        assert len(calls) == 1
+    
+    @pytest.mark.parametrize('backend', ['tree', 'closure'])
+    def test_legacy_mode_evaluates_both(self, backend):
+        """Test that short_circuit=False keeps eager evaluation."""
+        parser, calls = self.counting_parser(backend, short_circuit=False)
+        assert parser.evaluate("hasStatus('x') && randi(10) >= 0") is False
+        assert len(calls) == 1
+
+
+
+class TestReadSets:
+    """Tests for static read-set analysis."""
+    
+    def test_collects_reads(self):
+        """Test variables, items, statuses and events are collected."""
+        parser = create_parser()
+        reads = parser.read_set(
+            "year === 2 && month === 9 || hasStatus('exhaustion') "
+            "&& itemCount('paper') > getAttributeValue('rule.papersRequired') "
+            "&& !eventOccurred('QualifyingExam')"
+        )
+        assert reads.variables == {'year', 'month', 'rule.papersRequired'}
+        assert reads.items == {'paper'}
+        assert reads.statuses == {'exhaustion'}
+        assert reads.events == {'QualifyingExam'}
+        assert reads.impure is False
+    
+    def test_impure_expressions(self):
+        """Test that random and dynamic reads are flagged."""
+        parser = create_parser()
+        assert parser.read_set("randi(10) < 3").impure is True
+        assert parser.read_set("itemCount(year) > 0").impure is True
+        assert parser.read_set("min(year, 3) > 0").impure is False
+    
+    def test_declared_constants_are_not_reads(self):
+        """Test that folded constants drop out of the read set."""
+        parser = create_parser()
+        parser.declare_constants({'rule.maxYear': 8})
+        assert parser.read_set("year > rule.maxYear") == ReadSet(variables=frozenset({'year'}))
+    
+    def test_events_analyzed_at_load(self):
+        """Test that GameEngine attaches read sets to loaded conditions."""
+        from gradquest.core.game_engine import GameEngine
+        
+        data_path = Path(__file__).parent.parent / 'data' / 'rulesets' / 'default'
+        engine = GameEngine(data_path)
+        engine.load_game_data()
+        
+        event = engine.event_engine.get_event('FirstYearEnds')
+        assert event.condition_reads().variables == {'year', 'month'}
+        event = engine.event_engine.get_event('ExhaustionEffect')
+        assert event.condition_reads().statuses == {'exhaustion'}
+
+
+
+class TestFunctionRegistry:
+    """Tests for registering expression functions."""
+    
+    @pytest.mark.parametrize('backend', ['tree', 'closure'])
+    def test_custom_function(self, backend):
+        """Test that a parser-local function is callable and folded."""
+        parser = create_parser(variable_store=VariableStore(), backend=backend)
+        parser.register_function(FunctionSpec('double', lambda context, x: float(x) * 2, 1, 1))
+        assert parser.evaluate("double(year + 2) === 4") is True
+        assert parser.dump("double(3) + 1") == '7'
+        assert 'double' not in create_parser().functions
+    
+    @pytest.mark.parametrize('backend', ['tree', 'closure'])
+    def test_arity_checked(self, backend):
+        """Test that calls with the wrong number of arguments fail."""
+        parser = create_parser(backend=backend)
+        parser.register_function(FunctionSpec('double', lambda context, x: float(x) * 2, 1, 1))
+        with pytest.raises(ValueError, match="takes 1 arguments"):
+            parser.evaluate("double(1, 2)")
+        with pytest.raises(ValueError, match="Unknown function"):
+            parser.evaluate("triple(1)")
+    
+    @pytest.mark.parametrize('backend', ['tree', 'closure'])
+    def test_costly_pure_calls_memoized(self, backend):
+        """Test that costly pure calls are reused until state changes."""
+        calls = []
+        
+        def papers(context, name):
+            calls.append(name)
+            return context['variable_store'].get_item_count(name)
+        
+        vs = VariableStore()
+        parser = create_parser(variable_store=vs, backend=backend)
+        parser.register_function(FunctionSpec('papers', papers, 1, 1, reads='items', cost=50))
+        assert parser.evaluate("papers('paper') + papers('paper')") == 0
+        assert calls == ['paper']
+        
+        vs.add_item('paper', 2)
+        assert parser.evaluate("papers('paper')") == 2
+        assert len(calls) == 2
+    
+    def test_memo_tracks_occurred_events(self):
+        """Test that memoized calls are recomputed when events occur."""
+        from gradquest.core.event_engine import EventEngine
+        
+        vs = VariableStore()
+        parser = create_parser(variable_store=vs)
+        events = EventEngine(vs, parser)
+        parser.context['event_engine'] = events
+        parser.register_function(FunctionSpec(
+            'passed', lambda context: float(context['event_engine'].has_event_occurred('Qualify')),
+            reads_state=True, cost=50,
+        ))
+        assert parser.evaluate("passed()") == 0
+        events.mark_occurred('Qualify')
+        assert parser.evaluate("passed()") == 1
+    
+    def test_memo_needs_store_version(self):
+        """Test that calls are not memoized when state changes cannot be seen."""
+        calls = []
+        
+        def costly(context):
+            calls.append(1)
+            return len(calls)
+        
+        parser = create_parser(variable_store=None)
+        parser.register_function(FunctionSpec('costly', costly, reads_state=True, cost=50))
+        assert parser.evaluate("costly()") == 1
+        assert parser.evaluate("costly()") == 2
+    
+    def test_metadata_drives_read_sets(self):
+        """Test that purity and read annotations reach the read set."""
+        parser = create_parser()
+        parser.register_function(FunctionSpec('papers', lambda context, name: 0, 1, 1, reads='items'))
+        parser.register_function(FunctionSpec('roll', lambda context: 0, pure=False))
+        assert parser.read_set("papers('paper') > 2").items == {'paper'}
+        assert parser.read_set("papers('paper') > 2").impure is False
+        assert parser.read_set("roll() > 2").impure is True
+        assert parser.dump("roll() > 2") == '(roll() > 2)'
+
+
+
+class TestBatchEvaluation:
+    """Tests for vectorized evaluation over a batch of game states."""
+    
+    @pytest.fixture
+    def stores(self):
+        pytest.importorskip('numpy')
+        stores = []
+        for i in range(6):
+            vs = VariableStore()
+            vs.set_var('player.hope', 10 * i)
+            vs.set_var('year', 1 + i % 3)
+            vs.set_var('month', 9)
+            if i % 2:
+                vs.add_item('paper', i)
+                vs.add_status('exhaustion')
+            stores.append(vs)
+        return stores
+    
+    def test_matches_scalar_evaluation(self, stores):
+        """Test that every lane agrees with the scalar parser."""
+        from gradquest.core.batch import BatchState
+        
+        state = BatchState.from_stores(stores)
+        batch_parser = create_parser()
+        for expression in TestClosureBackend.EXPRESSIONS:
+            results = batch_parser.evaluate_batch(expression, state)
+            for vs, result in zip(stores, results):
+                expected = create_parser(variable_store=vs).evaluate(expression)
+                assert result == expected, expression
+    
+    def test_per_lane_random_streams(self, stores):
+        """Test that randi() draws are per lane and respect short-circuiting."""
+        from gradquest.core.batch import BatchState
+        
+        parser = create_parser()
+        small = BatchState.from_stores(stores[:2], seed=7)
+        large = BatchState.from_stores(stores, seed=7)
+        assert list(parser.evaluate_batch("randi(100)", small)) == \
+            list(parser.evaluate_batch("randi(100)", large)[:2])
+        
+        # Only lanes with exhaustion reach randi(), so only they advance
+        parser.evaluate_batch("hasStatus('exhaustion') && randi(10) >= 0", large)
+        assert list(large._rng_counters) == [1, 2, 1, 2, 1, 2]
+    
+    def test_event_conditions_batch(self, stores):
+        """Test checking an event's conditions for a whole batch."""
+        from gradquest.core.batch import BatchState
+        from gradquest.core.event_engine import GameEvent, EventCondition
+        
+        event = GameEvent(id='Test', trigger='MonthBegin', conditions=[
+            EventCondition('Expression', "hasStatus('exhaustion')"),
+            EventCondition('Expression', "player.hope >= 30"),
+        ])
+        met = event.check_conditions_batch(create_parser(), BatchState.from_stores(stores))
+        assert list(met) == [False, False, False, True, False, True]
+    
+    def test_parser_functions_batch(self, stores):
+        """Test that batch mode calls the parser's own functions through their batch hook."""
+        from gradquest.core.batch import BatchState
+        
+        state = BatchState.from_stores(stores)
+        parser = create_parser()
+        parser.register_function(FunctionSpec(
+            'double', lambda context, x: float(x) * 2, 1, 1,
+            batch=lambda state, mask, x: x * 2,
+        ))
+        assert list(parser.evaluate_batch("double(year)", state)) == [2, 4, 6, 2, 4, 6]
+        
+        # A replaced built-in without a batch hook is not silently vectorized
+        parser.register_function(FunctionSpec('min', lambda context, a, b: 0.0, 2, 2))
+        with pytest.raises(ValueError, match="no batch implementation"):
+            parser.evaluate_batch("min(year, 2)", state)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])